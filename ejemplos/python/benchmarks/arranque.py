@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Prueba de Arranque de una Cotización
+
+Este script mide, con `python -X importtime`, el costo de importación de una
+sola cotización en un proceso nuevo (el caso de una línea de comandos o de un
+manejador sin servidor en arranque en frío) para cada producto y para el
+subcomando `cotizar`. Termina con código 1 si la mediana del tiempo de
+importación de algún escenario excede el presupuesto, o si la ruta escalar
+importa un módulo pesado como NumPy.
+
+Uso (desde ejemplos/python):
+    python benchmarks/arranque.py
+    python benchmarks/arranque.py --presupuesto-ms 75 --repeticiones 10 --detalle 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+DIRECTORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Presupuesto de la mediana del tiempo de importación, en milisegundos
+PRESUPUESTO_MS = 75.0
+
+# Paquetes que la ruta escalar no debe importar
+MODULOS_PROHIBIDOS = ("numpy", "pyarrow")
+
+# Argumentos del intérprete para cada escenario de una sola cotización
+ESCENARIOS = {
+    "personal": ["-c", "from prestamo_personal_basico import calcular_cat; "
+                       "calcular_cat(50000, 24, 0.24, 1000, 50, 200)"],
+    "automotriz": ["-c", "from credito_automotriz import calcular_cat; "
+                         "calcular_cat(350000, 70000, 48, 0.13, 5000, 0, 1200, 150, 200)"],
+    "revolvente": ["-c", "from credito_revolvente import calcular_cat_tarjeta_credito; "
+                         "calcular_cat_tarjeta_credito('oro', 0.30, 1200, 0.08)"],
+    "cli/cotizar": ["-m", "calculo_cat", "cotizar", "personal",
+                    json.dumps({"monto_credito": 50000, "plazo_meses": 24, "tasa_interes_anual": 0.24})],
+}
+
+
+def medir(argumentos):
+    """
+    Ejecuta un escenario en un proceso nuevo con `-X importtime`.
+
+    Args:
+        argumentos (list): Argumentos del intérprete
+
+    Returns:
+        tuple: (milisegundos de importación, segundos del proceso, dict con el
+        tiempo propio en microsegundos de cada módulo importado)
+    """
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, "-X", "importtime", *argumentos], cwd=DIRECTORIO,
+                             capture_output=True, text=True)
+    segundos = time.perf_counter() - inicio
+    if proceso.returncode != 0:
+        raise RuntimeError(f"El escenario falló:\n{proceso.stderr}")
+
+    modulos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        propio, _, nombre = linea[len("import time:"):].split("|")
+        if not propio.strip().isdigit():
+            continue  # encabezado
+        modulos[nombre.strip()] = int(propio)
+    return sum(modulos.values()) / 1000, segundos, modulos
+
+
+def main(argumentos=None):
+    analizador = argparse.ArgumentParser(description="Prueba de arranque de una sola cotización")
+    analizador.add_argument("--presupuesto-ms", type=float, default=PRESUPUESTO_MS,
+                            help=f"Mediana máxima del tiempo de importación (por omisión {PRESUPUESTO_MS:g} ms)")
+    analizador.add_argument("--repeticiones", type=int, default=5, help="Procesos por escenario")
+    analizador.add_argument("--detalle", type=int, default=0,
+                            help="Módulos más lentos a listar por escenario")
+    opciones = analizador.parse_args(argumentos)
+
+    fallas = []
+    for nombre, escenario in ESCENARIOS.items():
+        mediciones = [medir(escenario) for _ in range(opciones.repeticiones)]
+        importacion = statistics.median(milisegundos for milisegundos, _, _ in mediciones)
+        proceso = statistics.median(segundos for _, segundos, _ in mediciones) * 1000
+        modulos = mediciones[-1][2]
+
+        prohibidos = sorted(modulo for modulo in modulos if modulo.split(".")[0] in MODULOS_PROHIBIDOS)
+        estado = "ok"
+        if prohibidos:
+            estado = "IMPORTA " + ", ".join(sorted({modulo.split(".")[0] for modulo in prohibidos}))
+            fallas.append(nombre)
+        elif importacion > opciones.presupuesto_ms:
+            estado = "EXCEDE EL PRESUPUESTO"
+            fallas.append(nombre)
+
+        print(f"{nombre:<14} importación {importacion:7.2f} ms   proceso {proceso:7.1f} ms   "
+              f"{len(modulos):4d} módulos   {estado}")
+        for modulo, propio in sorted(modulos.items(), key=lambda par: -par[1])[:opciones.detalle]:
+            print(f"    {propio / 1000:7.2f} ms  {modulo}")
+
+    if fallas:
+        print(f"\nFuera del presupuesto de {opciones.presupuesto_ms:g} ms o con módulos prohibidos: "
+              + ", ".join(fallas))
+        return 1
+    print(f"\nTodos los escenarios dentro del presupuesto de {opciones.presupuesto_ms:g} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Prueba de Carga del Servicio de Cotización
+
+Este script envía cotizaciones concurrentes al servicio local
+(`python -m calculo_cat servir`) desde varias conexiones persistentes y reporta
+el rendimiento, las latencias p50/p99 observadas por los clientes y las métricas
+de agrupación del servicio.
+
+Uso (desde ejemplos/python):
+    python benchmarks/carga_servicio.py --iniciar --conexiones 64 --solicitudes 20000
+    python benchmarks/carga_servicio.py --puerto 8080   # contra un servicio ya iniciado
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+
+def _cotizacion_aleatoria(aleatorio):
+    """Genera un producto y los parámetros de una cotización aleatoria."""
+    producto = aleatorio.choice(("personal", "automotriz", "revolvente"))
+    if producto == "personal":
+        parametros = {
+            "monto_credito": aleatorio.randrange(10_000, 200_000, 1_000),
+            "plazo_meses": aleatorio.choice((12, 18, 24, 36, 48, 60)),
+            "tasa_interes_anual": round(aleatorio.uniform(0.12, 0.60), 4),
+            "comision_apertura": aleatorio.randrange(0, 3_000, 100),
+            "seguro": aleatorio.randrange(0, 300, 10),
+        }
+    elif producto == "automotriz":
+        precio = aleatorio.randrange(200_000, 800_000, 5_000)
+        parametros = {
+            "precio_vehiculo": precio,
+            "enganche": round(precio * aleatorio.uniform(0.1, 0.4), 2),
+            "plazo_meses": aleatorio.choice((24, 36, 48, 60, 72)),
+            "tasa_interes_anual": round(aleatorio.uniform(0.10, 0.25), 4),
+            "comision_apertura": aleatorio.randrange(0, 10_000, 500),
+            "seguro_auto": aleatorio.randrange(500, 1_500, 50),
+            "gps": 200,
+        }
+    else:
+        parametros = {
+            "monto_linea_credito": aleatorio.choice((22_500, 52_500, 97_500)),
+            "tasa_interes_anual": round(aleatorio.uniform(0.25, 0.70), 4),
+            "comision_anual": aleatorio.choice((0, 450, 900, 1_500)),
+        }
+    return producto, parametros
+
+
+async def _cliente(host, puerto, solicitudes, latencias, semilla):
+    """Envía cotizaciones por una conexión persistente y registra su latencia."""
+    aleatorio = random.Random(semilla)
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        for _ in range(solicitudes):
+            producto, parametros = _cotizacion_aleatoria(aleatorio)
+            cuerpo = json.dumps(parametros).encode("utf-8")
+            inicio = time.perf_counter()
+            escritor.write(
+                f"POST /cotizar/{producto} HTTP/1.1\r\n"
+                f"Host: {host}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo)
+            await escritor.drain()
+
+            estado = await lector.readline()
+            longitud = 0
+            while True:
+                linea = await lector.readline()
+                if linea in (b"\r\n", b""):
+                    break
+                nombre, _, valor = linea.decode("latin-1").partition(":")
+                if nombre.strip().lower() == "content-length":
+                    longitud = int(valor)
+            respuesta = await lector.readexactly(longitud)
+            latencias.append(time.perf_counter() - inicio)
+
+            if b" 200 " not in estado:
+                raise RuntimeError(f"Respuesta inesperada: {estado!r} {respuesta!r}")
+    finally:
+        escritor.close()
+
+
+async def _metricas_servicio(host, puerto):
+    """Consulta la ruta /metricas del servicio."""
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    escritor.write(f"GET /metricas HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    await escritor.drain()
+    respuesta = await lector.read()
+    escritor.close()
+    return json.loads(respuesta.split(b"\r\n\r\n", 1)[1])
+
+
+async def prueba_carga(host, puerto, conexiones, solicitudes):
+    """
+    Ejecuta la prueba de carga.
+
+    Args:
+        host (str): Dirección del servicio
+        puerto (int): Puerto del servicio
+        conexiones (int): Número de clientes concurrentes
+        solicitudes (int): Total de cotizaciones a enviar
+
+    Returns:
+        dict: Rendimiento y latencias de los clientes, y métricas del servicio
+    """
+    latencias = []
+    por_conexion = [solicitudes // conexiones + (i < solicitudes % conexiones) for i in range(conexiones)]
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(host, puerto, n, latencias, semilla)
+                           for semilla, n in enumerate(por_conexion) if n))
+    segundos = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "solicitudes": len(latencias),
+        "segundos": segundos,
+        "solicitudes_por_segundo": len(latencias) / segundos if segundos > 0 else 0.0,
+        "latencia_p50_ms": latencias[max(int(len(latencias) * 0.50 + 0.5) - 1, 0)] * 1000,
+        "latencia_p99_ms": latencias[max(int(len(latencias) * 0.99 + 0.5) - 1, 0)] * 1000,
+        "servicio": await _metricas_servicio(host, puerto),
+    }
+
+
+def _esperar_servicio(host, puerto, segundos=10.0):
+    """Espera a que el servicio acepte conexiones."""
+    limite = time.monotonic() + segundos
+    while True:
+        try:
+            asyncio.run(_metricas_servicio(host, puerto))
+            return
+        except OSError:
+            if time.monotonic() > limite:
+                raise
+            time.sleep(0.1)
+
+
+def main():
+    analizador = argparse.ArgumentParser(description="Prueba de carga del servicio de cotización del CAT")
+    analizador.add_argument("--host", default="127.0.0.1")
+    analizador.add_argument("--puerto", type=int, default=8080)
+    analizador.add_argument("--conexiones", type=int, default=64, help="Clientes concurrentes")
+    analizador.add_argument("--solicitudes", type=int, default=20_000, help="Total de cotizaciones")
+    analizador.add_argument("--iniciar", action="store_true",
+                            help="Inicia el servicio en un subproceso durante la prueba")
+    analizador.add_argument("--tamano-lote", type=int, default=256,
+                            help="Tamaño máximo de lote del servicio iniciado con --iniciar")
+    analizador.add_argument("--espera-ms", type=float, default=2.0,
+                            help="Espera máxima de lote del servicio iniciado con --iniciar")
+    opciones = analizador.parse_args()
+
+    servicio = None
+    if opciones.iniciar:
+        directorio = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        servicio = subprocess.Popen(
+            [sys.executable, "-m", "calculo_cat", "servir", "--host", opciones.host,
+             "--puerto", str(opciones.puerto), "--tamano-lote", str(opciones.tamano_lote),
+             "--espera-ms", str(opciones.espera_ms)],
+            cwd=directorio)
+    try:
+        if servicio is not None:
+            _esperar_servicio(opciones.host, opciones.puerto)
+        resultado = asyncio.run(prueba_carga(opciones.host, opciones.puerto,
+                                             opciones.conexiones, opciones.solicitudes))
+    finally:
+        if servicio is not None:
+            servicio.terminate()
+            servicio.wait()
+
+    metricas = resultado["servicio"]
+    print(f"Cotizaciones: {resultado['solicitudes']:,} en {resultado['segundos']:.2f} s "
+          f"({resultado['solicitudes_por_segundo']:,.0f}/s) con {opciones.conexiones} conexiones")
+    print(f"Latencia del cliente: p50 {resultado['latencia_p50_ms']:.2f} ms, "
+          f"p99 {resultado['latencia_p99_ms']:.2f} ms")
+    print(f"Latencia del servicio: p50 {metricas['latencia_p50_ms']:.2f} ms, "
+          f"p99 {metricas['latencia_p99_ms']:.2f} ms")
+    print(f"Lotes: {metricas['lotes']:,} (promedio {metricas['tamano_lote_promedio']:.1f}, "
+          f"máximo {metricas['tamano_lote_maximo']})")
+
+
+if __name__ == "__main__":
+    main()
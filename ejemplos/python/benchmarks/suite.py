@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+Suite de Rendimiento del Cálculo del CAT
+
+Este script mide el tiempo, las iteraciones por solución y la memoria pico de
+los tres ejemplos de productos (préstamo personal, crédito automotriz y
+crédito revolvente), del modo de precisión, de las rutas por lotes y en
+paralelo y de los escenarios de tasa variable del paquete `calculo_cat`,
+variando el plazo (12 a 360 meses), el tamaño de la cartera (1 a 1,000,000 de
+créditos) y el tipo de tarjeta.
+
+Los resultados se guardan en un archivo JSON; el subcomando `comparar` contrasta
+dos archivos y termina con código 1 si algún caso es más lento (o usa más
+iteraciones) que la referencia por encima del umbral.
+
+Uso (desde ejemplos/python):
+    python benchmarks/suite.py ejecutar --salida base.json
+    python benchmarks/suite.py ejecutar --salida nuevo.json --rapido --filtro lote
+    python benchmarks/suite.py comparar base.json nuevo.json --umbral 0.10
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import credito_automotriz  # noqa: E402
+import credito_revolvente  # noqa: E402
+import prestamo_personal_basico  # noqa: E402
+from calculo_cat.escenarios import ModeloVasicek, simular_cat_tasa_variable  # noqa: E402
+from calculo_cat.fechas import CalendarioFlujos, fechas_mensuales  # noqa: E402
+from calculo_cat.flujos import FlujosSegmentados  # noqa: E402
+from calculo_cat.lote import calcular_cat_lote  # noqa: E402
+from calculo_cat.paralelo import calcular_cat_paralelo  # noqa: E402
+from calculo_cat.precision import calcular_cat_preciso  # noqa: E402
+from calculo_cat.productos import calcular_cat_productos  # noqa: E402
+from calculo_cat.revolvente import calcular_cat_revolvente_lote  # noqa: E402
+from calculo_cat.telemetria import activar_telemetria, desactivar_telemetria  # noqa: E402
+
+
+PLAZOS = (12, 24, 36, 60, 120, 240, 360)
+PLAZOS_AUTOMOTRIZ = (12, 24, 36, 48, 60, 72, 84)
+TAMANOS_CARTERA = (1, 1_000, 100_000, 1_000_000)
+TIPOS_TARJETA = ("clasica", "oro", "platino")
+TRAYECTORIAS_TASA_VARIABLE = (1_000, 10_000)
+
+# Con --rapido se omiten las carteras mayores a este tamaño
+TAMANO_MAXIMO_RAPIDO = 100_000
+
+# Cada caso se repite hasta acumular este tiempo (con un mínimo y un máximo de repeticiones)
+TIEMPO_MINIMO = 0.5
+REPETICIONES_MINIMAS = 3
+REPETICIONES_MAXIMAS = 1000
+
+
+class Caso:
+    """
+    Caso de la suite.
+
+    `preparar` construye los datos fuera de la medición y devuelve una función
+    sin argumentos que ejecuta el caso y devuelve (elementos, iteraciones), donde
+    `iteraciones` es un arreglo con las iteraciones por solución.
+    """
+
+    def __init__(self, nombre, preparar, tamano=1):
+        self.nombre = nombre
+        self.preparar = preparar
+        self.tamano = tamano
+
+
+def casos():
+    """
+    Genera los casos de la suite.
+
+    Returns:
+        list: Casos en el orden de ejecución
+    """
+    lista = []
+
+    for plazo in PLAZOS:
+        lista.append(Caso(f"escalar/personal/plazo={plazo}",
+                          lambda plazo=plazo: _escalar(prestamo_personal_basico.calcular_cat,
+                                                       50000, plazo, 0.24, 1000, 50, 200)))
+    for plazo in PLAZOS_AUTOMOTRIZ:
+        lista.append(Caso(f"escalar/automotriz/plazo={plazo}",
+                          lambda plazo=plazo: _escalar(credito_automotriz.calcular_cat,
+                                                       350000, 70000, plazo, 0.13, 5000, 0, 1200, 150, 200)))
+    for plazo in PLAZOS:
+        lista.append(Caso(f"escalar/preciso/plazo={plazo}",
+                          lambda plazo=plazo: _escalar(_cat_preciso_personal, 50000, plazo, 0.24, 1000, 50, 200)))
+    for tipo in TIPOS_TARJETA:
+        lista.append(Caso(f"escalar/revolvente/{tipo}",
+                          lambda tipo=tipo: _escalar(credito_revolvente.calcular_cat_tarjeta_credito,
+                                                     tipo, 0.36, 600)))
+
+    for tamano in TAMANOS_CARTERA:
+        lista.append(Caso(f"lote/personal/n={tamano}", lambda tamano=tamano: _lote_personal(tamano), tamano))
+    for tamano in TAMANOS_CARTERA:
+        lista.append(Caso(f"lote/revolvente/n={tamano}", lambda tamano=tamano: _lote_revolvente(tamano), tamano))
+    for tamano in TAMANOS_CARTERA:
+        lista.append(Caso(f"lote/productos/n={tamano}", lambda tamano=tamano: _lote_productos(tamano), tamano))
+    for tamano in TAMANOS_CARTERA[1:]:
+        lista.append(Caso(f"lote/fechas/n={tamano}", lambda tamano=tamano: _lote_fechas(tamano), tamano))
+    for tamano in TAMANOS_CARTERA[2:]:
+        lista.append(Caso(f"paralelo/productos/n={tamano}", lambda tamano=tamano: _paralelo(tamano), tamano))
+    for tamano in TRAYECTORIAS_TASA_VARIABLE:
+        lista.append(Caso(f"escenarios/tasa_variable/n={tamano}",
+                          lambda tamano=tamano: _tasa_variable(tamano), tamano))
+
+    return lista
+
+
+def _escalar(funcion, *argumentos):
+    """Caso de una llamada escalar; las iteraciones se cuentan en una llamada aparte."""
+    iteraciones = np.array([_contar_iteraciones(funcion, *argumentos)])
+
+    def ejecutar():
+        funcion(*argumentos)
+        return 1, iteraciones
+
+    return ejecutar
+
+
+def _cat_preciso_personal(monto_credito, plazo_meses, tasa_interes_anual, comision_apertura,
+                          comisiones_mensuales, seguro):
+    """CAT del préstamo personal en modo de precisión, con los mismos flujos que `calcular_cat`."""
+    tasa_mensual = tasa_interes_anual / 12
+    pago_mensual = monto_credito * tasa_mensual / (1 - (1 + tasa_mensual) ** -plazo_meses)
+    flujos = FlujosSegmentados([(0, 1, -(monto_credito - comision_apertura)),
+                                (1, plazo_meses, pago_mensual + comisiones_mensuales + seguro)])
+    return calcular_cat_preciso(flujos, tasa_inicial=tasa_mensual)
+
+
+def _contar_iteraciones(funcion, *argumentos):
+    """Cuenta las iteraciones de `calcular_tir` durante una llamada con la telemetría activa."""
+    telemetria = activar_telemetria()
+    try:
+        funcion(*argumentos)
+    finally:
+        desactivar_telemetria()
+    return int(telemetria.iteraciones.suma)
+
+
+def _cartera_personal(tamano, semilla=0):
+    """Cartera aleatoria de préstamos personales con plazos de 12 a 360 meses."""
+    aleatorio = np.random.default_rng(semilla)
+    monto = aleatorio.uniform(10_000, 2_000_000, tamano).round(2)
+    return {
+        "monto_credito": monto,
+        "plazo_meses": aleatorio.choice(PLAZOS, tamano).astype(float),
+        "tasa_interes_anual": aleatorio.uniform(0.08, 0.60, tamano).round(4),
+        "comision_apertura": (monto * aleatorio.uniform(0, 0.03, tamano)).round(2),
+        "comisiones_mensuales": aleatorio.choice((0.0, 50.0, 100.0), tamano),
+        "seguro": aleatorio.uniform(0, 500, tamano).round(2),
+    }
+
+
+def _cartera_revolvente(tamano, semilla=1):
+    """Cartera aleatoria de tarjetas de crédito de los tres tipos."""
+    aleatorio = np.random.default_rng(semilla)
+    montos = np.array([credito_revolvente._monto_udis(tipo) for tipo in TIPOS_TARJETA])
+    return {
+        "monto_linea_credito": aleatorio.choice(montos, tamano),
+        "tasa_interes_anual": aleatorio.uniform(0.20, 0.80, tamano).round(4),
+        "comision_anual": aleatorio.choice((0.0, 450.0, 900.0, 1500.0), tamano),
+        "pago_minimo_porcentaje": aleatorio.choice((0.05, 0.08, 0.10), tamano),
+    }
+
+
+def _cartera_productos(tamano):
+    """Cartera con los tres productos mezclados."""
+    aleatorio = np.random.default_rng(2)
+    producto = aleatorio.choice(("personal", "automotriz", "revolvente"), tamano)
+    columnas = {**_cartera_personal(tamano), **_cartera_revolvente(tamano)}
+    columnas["precio_vehiculo"] = aleatorio.uniform(150_000, 1_200_000, tamano).round(2)
+    columnas["enganche"] = (columnas["precio_vehiculo"] * aleatorio.uniform(0.1, 0.4, tamano)).round(2)
+    columnas["seguro_auto"] = aleatorio.uniform(500, 2_000, tamano).round(2)
+    return producto, columnas
+
+
+def _lote_personal(tamano):
+    """Cartera de préstamos personales resuelta con `calcular_cat_lote`."""
+    columnas = _cartera_personal(tamano)
+
+    def ejecutar():
+        resultado = calcular_cat_lote(**columnas)
+        return tamano, resultado.iteraciones
+
+    return ejecutar
+
+
+def _lote_revolvente(tamano):
+    """Cartera de tarjetas resuelta con `calcular_cat_revolvente_lote`."""
+    columnas = _cartera_revolvente(tamano)
+
+    def ejecutar():
+        resultado = calcular_cat_revolvente_lote(**columnas)
+        return tamano, resultado.iteraciones
+
+    return ejecutar
+
+
+def _lote_productos(tamano):
+    """Cartera mixta resuelta en un solo proceso con `calcular_cat_productos`."""
+    producto, columnas = _cartera_productos(tamano)
+
+    def ejecutar():
+        resultado = calcular_cat_productos(producto, columnas)
+        return tamano, resultado.iteraciones
+
+    return ejecutar
+
+
+def _lote_fechas(tamano):
+    """Préstamos a 60 meses que comparten un calendario de fechas exactas."""
+    columnas = _cartera_personal(tamano)
+    plazo = 60
+    calendario = CalendarioFlujos(fechas_mensuales("2024-01-31", plazo))
+    tasa_mensual = columnas["tasa_interes_anual"] / 12
+    pago = columnas["monto_credito"] * tasa_mensual / (1 - (1 + tasa_mensual) ** -plazo)
+    flujos = np.repeat(pago[:, None], plazo + 1, axis=1)
+    flujos[:, 0] = -(columnas["monto_credito"] - columnas["comision_apertura"])
+
+    def ejecutar():
+        resultado = calendario.calcular_cat(flujos)
+        return tamano, resultado.iteraciones
+
+    return ejecutar
+
+
+def _paralelo(tamano):
+    """Cartera mixta resuelta con `calcular_cat_paralelo` y un proceso por CPU."""
+    producto, columnas = _cartera_productos(tamano)
+
+    def ejecutar():
+        resultado = calcular_cat_paralelo(producto, columnas)
+        return tamano, resultado.iteraciones
+
+    return ejecutar
+
+
+def _tasa_variable(tamano):
+    """Distribución del CAT de una hipoteca a 360 meses sobre trayectorias de Vasicek."""
+    modelo = ModeloVasicek(tasa_inicial=0.11, media=0.09, velocidad=0.3, volatilidad=0.015)
+
+    def ejecutar():
+        distribucion = simular_cat_tasa_variable(2_000_000, 360, modelo, n_trayectorias=tamano,
+                                                 comision_apertura=20_000, seguro=600, semilla=7)
+        return tamano, distribucion.iteraciones
+
+    return ejecutar
+
+
+def medir(caso):
+    """
+    Mide un caso: tiempo de varias repeticiones y memoria pico de una ejecución.
+
+    La memoria se mide con `tracemalloc` en una ejecución aparte, porque el
+    rastreo hace más lento el código; no incluye la memoria de los procesos hijos.
+
+    Returns:
+        dict: Resultado del caso
+    """
+    tracemalloc.start()
+    ejecutar = caso.preparar()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    elementos, iteraciones = ejecutar()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tiempos = []
+    inicio = time.perf_counter()
+    while (len(tiempos) < REPETICIONES_MINIMAS
+           or (time.perf_counter() - inicio < TIEMPO_MINIMO and len(tiempos) < REPETICIONES_MAXIMAS)):
+        marca = time.perf_counter()
+        ejecutar()
+        tiempos.append(time.perf_counter() - marca)
+
+    mediana = statistics.median(tiempos)
+    iteraciones = np.asarray(iteraciones)
+    return {
+        "elementos": int(elementos),
+        "repeticiones": len(tiempos),
+        "segundos_mediana": mediana,
+        "segundos_minimo": min(tiempos),
+        "microsegundos_por_elemento": mediana / elementos * 1e6,
+        "iteraciones_promedio": float(iteraciones.mean()) if iteraciones.size else 0.0,
+        "iteraciones_maximo": int(iteraciones.max()) if iteraciones.size else 0,
+        "memoria_pico_mb": (pico - base) / 2**20,
+    }
+
+
+def ejecutar_suite(salida, filtro="*", rapido=False):
+    """
+    Ejecuta los casos seleccionados y guarda los resultados en JSON.
+
+    Args:
+        salida (str): Archivo JSON de resultados
+        filtro (str, opcional): Patrón (estilo shell) de los nombres de los casos
+        rapido (bool, opcional): Omite las carteras de más de 100,000 créditos
+    """
+    resultados = {}
+    for caso in casos():
+        if not fnmatch.fnmatch(caso.nombre, filtro) and filtro not in caso.nombre:
+            continue
+        if rapido and caso.tamano > TAMANO_MAXIMO_RAPIDO:
+            continue
+        resultado = medir(caso)
+        resultados[caso.nombre] = resultado
+        print(f"{caso.nombre:<34} {resultado['segundos_mediana'] * 1000:>11.3f} ms "
+              f"{resultado['microsegundos_por_elemento']:>10.3f} µs/elem "
+              f"{resultado['iteraciones_promedio']:>6.2f} it "
+              f"{resultado['memoria_pico_mb']:>9.1f} MB", flush=True)
+
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump({
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "resultados": resultados,
+        }, archivo, indent=2, ensure_ascii=False)
+
+
+def comparar(referencia, nuevo, umbral=0.10):
+    """
+    Compara dos archivos de resultados.
+
+    Un caso es una regresión si su tiempo mediano o sus iteraciones promedio
+    crecen más que el umbral relativo respecto a la referencia.
+
+    Args:
+        referencia (str): Archivo JSON de referencia
+        nuevo (str): Archivo JSON a evaluar
+        umbral (float, opcional): Aumento relativo permitido
+
+    Returns:
+        list: Nombres de los casos con regresión
+    """
+    with open(referencia, encoding="utf-8") as archivo:
+        base = json.load(archivo)["resultados"]
+    with open(nuevo, encoding="utf-8") as archivo:
+        actual = json.load(archivo)["resultados"]
+
+    regresiones = []
+    for nombre in sorted(base.keys() & actual.keys()):
+        antes, despues = base[nombre], actual[nombre]
+        razon_tiempo = despues["segundos_mediana"] / antes["segundos_mediana"]
+        razon_iteraciones = (despues["iteraciones_promedio"] / antes["iteraciones_promedio"]
+                             if antes["iteraciones_promedio"] else 1.0)
+        regresion = razon_tiempo > 1 + umbral or razon_iteraciones > 1 + umbral
+        if regresion:
+            regresiones.append(nombre)
+        print(f"{nombre:<34} tiempo {razon_tiempo:>6.2f}x  iteraciones {razon_iteraciones:>6.2f}x"
+              f"{'  REGRESIÓN' if regresion else ''}")
+
+    for nombre in sorted(base.keys() - actual.keys()):
+        print(f"{nombre:<34} sólo en la referencia")
+    for nombre in sorted(actual.keys() - base.keys()):
+        print(f"{nombre:<34} caso nuevo")
+
+    return regresiones
+
+
+def main(argumentos=None):
+    analizador = argparse.ArgumentParser(description="Suite de rendimiento del cálculo del CAT")
+    subcomandos = analizador.add_subparsers(dest="comando", required=True)
+
+    ejecutar = subcomandos.add_parser("ejecutar", help="Ejecuta la suite y guarda los resultados en JSON")
+    ejecutar.add_argument("--salida", default="rendimiento.json", help="Archivo JSON de resultados")
+    ejecutar.add_argument("--filtro", default="*", help="Patrón de los casos a ejecutar (p. ej. 'lote/*')")
+    ejecutar.add_argument("--rapido", action="store_true",
+                          help=f"Omite las carteras de más de {TAMANO_MAXIMO_RAPIDO:,} créditos")
+
+    comparacion = subcomandos.add_parser("comparar", help="Compara dos archivos de resultados")
+    comparacion.add_argument("referencia", help="Archivo JSON de referencia")
+    comparacion.add_argument("nuevo", help="Archivo JSON a evaluar")
+    comparacion.add_argument("--umbral", type=float, default=0.10,
+                             help="Aumento relativo permitido (por omisión 0.10)")
+
+    opciones = analizador.parse_args(argumentos)
+    if opciones.comando == "ejecutar":
+        ejecutar_suite(opciones.salida, opciones.filtro, opciones.rapido)
+        return 0
+
+    regresiones = comparar(opciones.referencia, opciones.nuevo, opciones.umbral)
+    if regresiones:
+        print(f"{len(regresiones)} caso(s) con regresión por encima de {opciones.umbral:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Paquete calculo_cat
+
+Funciones compartidas por los ejemplos de Python para el cálculo del
+Costo Anual Total (CAT), incluyendo el cálculo por lotes de carteras completas.
+
+La ruta escalar (`solver`, `flujos`, `garantias`, `precision`) sólo usa la
+biblioteca estándar. Las funciones por lotes usan NumPy, que se importa la
+primera vez que se accede a ellas, por lo que importar el paquete para una
+sola cotización no paga el costo de importar NumPy.
+"""
+
+import importlib
+
+# Nombres exportados y el módulo que los define, importado al primer acceso
+_EXPORTACIONES = {
+    "ResultadoLote": "calculo_cat.lote",
+    "calcular_cat_lote": "calculo_cat.lote",
+    "calcular_tir_lote": "calculo_cat.lote",
+}
+
+__all__ = [
+    "ResultadoLote",
+    "calcular_cat_lote",
+    "calcular_tir_lote",
+]
+
+
+def __getattr__(nombre):
+    modulo = _EXPORTACIONES.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(modulo), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Línea de comandos del paquete calculo_cat
+
+Uso:
+    python -m calculo_cat cotizar personal '{"monto_credito": 50000, "plazo_meses": 24, "tasa_interes_anual": 0.24}'
+    python -m calculo_cat lote cartera.csv resultados.csv --tamano-bloque 100000
+    python -m calculo_cat servir --puerto 8080 --tamano-lote 256 --espera-ms 2
+    python -m calculo_cat recalcular cartera.db --entrada cartera.csv --serie-udi udis.serie
+
+Los módulos de cada subcomando se importan al ejecutarlo: `cotizar` resuelve
+una sola cotización con la ruta escalar, sin importar NumPy.
+"""
+
+import argparse
+import importlib
+import json
+import sys
+
+
+# Función escalar de cada producto: (módulo, función)
+FUNCIONES_PRODUCTO = {
+    "personal": ("prestamo_personal_basico", "calcular_cat"),
+    "automotriz": ("credito_automotriz", "calcular_cat"),
+    "revolvente": ("credito_revolvente", "calcular_cat_revolvente"),
+}
+
+
+def main(argumentos=None):
+    """
+    Punto de entrada de la línea de comandos.
+
+    Args:
+        argumentos (list, opcional): Argumentos de la línea de comandos; por
+                      omisión, `sys.argv[1:]`
+
+    Returns:
+        int: Código de salida (en `lote` y `recalcular`, 0 si todas las filas
+        convergieron y 1 si no)
+    """
+    analizador = argparse.ArgumentParser(prog="python -m calculo_cat",
+                                         description="Cálculo del CAT (Costo Anual Total)")
+    subcomandos = analizador.add_subparsers(dest="comando", required=True)
+
+    cotizar = subcomandos.add_parser(
+        "cotizar", help="Calcula el CAT de una sola cotización e imprime el resultado en JSON")
+    cotizar.add_argument("producto", choices=sorted(FUNCIONES_PRODUCTO), help="Producto")
+    cotizar.add_argument("parametros",
+                         help="Objeto JSON con los parámetros de la función calcular_cat del producto")
+
+    lote = subcomandos.add_parser(
+        "lote", help="Recalcula el CAT de una cartera leída de un archivo CSV o Parquet")
+    lote.add_argument("entrada", help="Archivo de cartera (.csv o .parquet) con columna 'producto'")
+    lote.add_argument("salida", help="Archivo de resultados (.csv o .parquet)")
+    lote.add_argument("--tamano-bloque", type=int,
+                      help="Filas por bloque (por omisión, calculo_cat.archivos.TAMANO_BLOQUE)")
+    lote.add_argument("--max-ejemplos", type=int, default=20,
+                      help="Filas no convergidas a listar en el resumen")
+
+    servicio = subcomandos.add_parser(
+        "servir", help="Inicia el servicio local de cotización HTTP/JSON con agrupación de solicitudes")
+    servicio.add_argument("--host", default="127.0.0.1", help="Dirección (por omisión 127.0.0.1)")
+    servicio.add_argument("--puerto", type=int, default=8080, help="Puerto TCP (por omisión 8080)")
+    servicio.add_argument("--tamano-lote", type=int,
+                        help="Máximo de cotizaciones por lote (por omisión, calculo_cat.servicio.TAMANO_LOTE)")
+    servicio.add_argument("--espera-ms", type=float,
+                        help="Espera máxima de un lote en milisegundos (por omisión, "
+                             "calculo_cat.servicio.ESPERA_MAXIMA)")
+
+    recalcular = subcomandos.add_parser(
+        "recalcular", help="Recalcula el CAT de los créditos de una cartera SQLite que cambiaron")
+    recalcular.add_argument("cartera", help="Archivo SQLite de la cartera (se crea si no existe)")
+    recalcular.add_argument("--entrada",
+                            help="Archivo de cartera (.csv o .parquet) con columnas 'id' y 'producto' "
+                                 "a cargar antes de recalcular")
+    recalcular.add_argument("--fecha", help="Fecha de cálculo (aaaa-mm-dd); por omisión, hoy")
+    recalcular.add_argument("--serie-udi", help="Archivo de la serie de la UDI (calculo_cat.udi.SerieUDI)")
+    recalcular.add_argument("--valor-udi", type=float,
+                            help="Valor de la UDI para las tarjetas registradas por tipo")
+    recalcular.add_argument("--tamano-bloque", type=int,
+                            help="Créditos por bloque (por omisión, calculo_cat.cartera.TAMANO_BLOQUE)")
+
+    opciones = analizador.parse_args(argumentos)
+    if opciones.comando == "cotizar":
+        return _comando_cotizar(opciones, analizador)
+    if opciones.comando == "servir":
+        return _comando_servir(opciones)
+    if opciones.comando == "recalcular":
+        return _comando_recalcular(opciones, analizador)
+    return _comando_lote(opciones, analizador)
+
+
+def _comando_cotizar(opciones, analizador):
+    """Ejecuta el subcomando `cotizar` con la función escalar del producto."""
+    try:
+        parametros = json.loads(opciones.parametros)
+    except ValueError as error:
+        analizador.error(f"parámetros JSON inválidos: {error}")
+    if not isinstance(parametros, dict):
+        analizador.error("los parámetros deben ser un objeto JSON")
+
+    modulo, funcion = FUNCIONES_PRODUCTO[opciones.producto]
+    calcular_cat = getattr(importlib.import_module(modulo), funcion)
+    try:
+        cat = calcular_cat(**parametros)
+    except TypeError as error:
+        analizador.error(str(error))
+
+    print(json.dumps({"producto": opciones.producto, "cat": cat}))
+    return 0
+
+
+def _comando_lote(opciones, analizador):
+    """Ejecuta el subcomando `lote` e imprime el avance y el resumen."""
+    from calculo_cat.archivos import TAMANO_BLOQUE, procesar_archivo
+
+    def progreso(filas, segundos):
+        print(f"{filas:,} filas procesadas ({filas / segundos:,.0f} filas/s)", file=sys.stderr)
+
+    try:
+        resumen = procesar_archivo(opciones.entrada, opciones.salida,
+                                   tamano_bloque=opciones.tamano_bloque or TAMANO_BLOQUE,
+                                   max_ejemplos=opciones.max_ejemplos, progreso=progreso)
+    except ValueError as error:
+        # Producto desconocido, valor no numérico o columna faltante en la entrada
+        analizador.error(f"{opciones.entrada}: {error}")
+
+    velocidad = resumen.filas / resumen.segundos if resumen.segundos > 0 else 0.0
+    print(f"Filas procesadas: {resumen.filas:,}")
+    print(f"Tiempo: {resumen.segundos:.2f} s ({velocidad:,.0f} filas/s)")
+    print(f"Filas no convergidas: {resumen.no_convergidas:,}")
+    if resumen.ejemplos_no_convergidos:
+        print("Primeras filas no convergidas: " + ", ".join(resumen.ejemplos_no_convergidos))
+
+    return 1 if resumen.no_convergidas else 0
+
+
+def _comando_recalcular(opciones, analizador):
+    """Ejecuta el subcomando `recalcular` e imprime los créditos revisados y recalculados."""
+    from calculo_cat.cartera import TAMANO_BLOQUE, CarteraCAT
+    from calculo_cat.udi import usar_serie_udi
+
+    if opciones.serie_udi:
+        usar_serie_udi(opciones.serie_udi)
+    tamano_bloque = opciones.tamano_bloque or TAMANO_BLOQUE
+
+    def progreso(creditos, segundos):
+        print(f"{creditos:,} créditos recalculados ({creditos / segundos:,.0f} créditos/s)", file=sys.stderr)
+
+    with CarteraCAT(opciones.cartera) as cartera:
+        try:
+            if opciones.entrada:
+                cambiados = cartera.importar(opciones.entrada, tamano_bloque)
+                print(f"Créditos nuevos o modificados: {cambiados:,}")
+            resumen = cartera.recalcular(opciones.fecha, opciones.valor_udi, tamano_bloque, progreso)
+        except (KeyError, ValueError) as error:
+            analizador.error(error.args[0] if error.args else str(error))
+
+    print(f"Créditos revisados: {resumen.revisados:,}")
+    print(f"Créditos recalculados: {resumen.recalculados:,}")
+    print(f"Tiempo: {resumen.segundos:.2f} s")
+    print(f"Créditos no convergidos: {resumen.no_convergidos:,}")
+    return 1 if resumen.no_convergidos else 0
+
+
+def _comando_servir(opciones):
+    """Ejecuta el subcomando `servir` hasta que se interrumpe con Ctrl+C."""
+    from calculo_cat.servicio import ESPERA_MAXIMA, TAMANO_LOTE, servir
+
+    tamano_lote = opciones.tamano_lote or TAMANO_LOTE
+    espera_maxima = opciones.espera_ms / 1000 if opciones.espera_ms is not None else ESPERA_MAXIMA
+    print(f"Servicio de cotización en http://{opciones.host}:{opciones.puerto}", file=sys.stderr)
+    try:
+        servir(opciones.host, opciones.puerto, tamano_lote, espera_maxima)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Tablas de Amortización
+
+Este módulo genera la tabla de amortización detrás de cada CAT: saldo,
+disposición, interés, capital, pago, comisiones, seguro, otros cargos y el
+flujo neto de cada periodo, con la misma semántica que las funciones
+`calcular_cat` de cada producto. La columna `flujo` es, periodo por periodo, el
+flujo que recibe el solucionador (desde la perspectiva de la institución).
+
+Las tablas se calculan por bloques de créditos con NumPy, sin diccionarios por
+fila, y se obtienen de tres formas:
+
+    - `tabla_amortizacion`: un arreglo estructurado con todas las filas
+    - `filas_amortizacion`: un generador de filas que calcula un bloque a la vez
+    - `exportar_amortizacion`: escribe la tabla de una cartera completa en CSV o
+      en un archivo binario que `leer_amortizacion` abre con `numpy.memmap`
+
+Las filas de todos los créditos van seguidas: la columna `credito` es la
+posición del crédito en la entrada y el periodo 0 es la disposición inicial.
+
+Formato del archivo binario:
+    - 8 bytes: identificador `CATAMORT`
+    - 4 bytes: longitud del encabezado (entero sin signo, little-endian)
+    - encabezado JSON con las columnas y sus tipos, rellenado con espacios
+      hasta un múltiplo de 64 bytes
+    - filas con el tipo `DTYPE_AMORTIZACION`, hasta el final del archivo
+"""
+
+import csv
+import json
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from calculo_cat.productos import COLUMNAS_PRODUCTO
+from calculo_cat.revolvente import PLAZO_MESES, simular_revolvente_lote
+
+
+# Créditos por bloque al generar o exportar (el préstamo a 360 meses tiene 361 filas)
+TAMANO_BLOQUE = 2_000
+
+_IDENTIFICADOR = b"CATAMORT"
+_ALINEACION = 64
+
+DTYPE_AMORTIZACION = np.dtype([
+    ("credito", "<i8"),
+    ("periodo", "<i4"),
+    ("saldo_inicial", "<f8"),
+    ("disposicion", "<f8"),
+    ("interes", "<f8"),
+    ("capital", "<f8"),
+    ("pago", "<f8"),
+    ("comisiones", "<f8"),
+    ("seguro", "<f8"),
+    ("otros", "<f8"),
+    ("saldo_final", "<f8"),
+    ("flujo", "<f8"),
+])
+
+FilaAmortizacion = namedtuple("FilaAmortizacion", DTYPE_AMORTIZACION.names)
+FilaAmortizacion.__doc__ = """
+Fila de una tabla de amortización.
+
+Atributos:
+    credito (int): Posición del crédito en la entrada
+    periodo (int): Periodo (0 es la disposición inicial)
+    saldo_inicial (float): Saldo al inicio del periodo
+    disposicion (float): Monto dispuesto al final del periodo
+    interes (float): Intereses del periodo
+    capital (float): Pago de capital (pago menos interés)
+    pago (float): Pago de capital e intereses (en revolventes, el pago mínimo y,
+                  en el último mes, la liquidación del saldo)
+    comisiones (float): Comisión por apertura en el periodo 0, comisiones
+                  mensuales o anualidad después
+    seguro (float): Seguros del periodo
+    otros (float): Otros costos iniciales en el periodo 0 y otros cargos
+                  mensuales (como el GPS del crédito automotriz) después
+    saldo_final (float): Saldo al final del periodo
+    flujo (float): Flujo neto para la institución: pago + comisiones + seguro +
+                  otros - disposición
+"""
+
+
+def tabla_amortizacion(producto, columnas, primer_credito=0):
+    """
+    Calcula la tabla de amortización de un lote de créditos de un producto.
+
+    Args:
+        producto (str): "personal", "automotriz" o "revolvente"
+        columnas (dict): Parámetros de la función `calcular_cat` del producto;
+                      cada uno puede ser un escalar o un arreglo con un valor por crédito
+        primer_credito (int, opcional): Número del primer crédito en la columna `credito`
+
+    Returns:
+        numpy.ndarray: Arreglo estructurado de tipo `DTYPE_AMORTIZACION` con
+        las filas de todos los créditos, en orden de crédito y periodo
+    """
+    columnas = _completar(producto, columnas)
+    if producto == "revolvente":
+        return _tabla_revolvente(columnas, primer_credito)
+
+    if producto == "personal":
+        monto_credito, seguro = columnas["monto_credito"], columnas["seguro"]
+        otros_cargos = np.zeros_like(monto_credito)
+        periodicidad = columnas["periodicidad"]
+    else:
+        # Mismos cargos que credito_automotriz.calcular_cat
+        monto_credito = columnas["precio_vehiculo"] - columnas["enganche"]
+        seguro = columnas["seguro_auto"] + columnas["seguro_vida"]
+        otros_cargos = columnas["gps"]
+        periodicidad = np.full_like(monto_credito, 12.0)
+
+    return _tabla_pagos_fijos(monto_credito, columnas["plazo_meses"], columnas["tasa_interes_anual"],
+                              columnas["comision_apertura"], columnas["comisiones_mensuales"], seguro,
+                              columnas["otros_costos"], otros_cargos, periodicidad, primer_credito)
+
+
+def filas_amortizacion(producto, columnas, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera las filas de la tabla de amortización de un lote de créditos.
+
+    Sólo un bloque de `tamano_bloque` créditos se calcula a la vez, por lo que
+    el generador sirve para exportar carteras de cualquier tamaño.
+
+    Ejemplo:
+        >>> for fila in filas_amortizacion("personal", {"monto_credito": 50000, "plazo_meses": 24,
+        ...                                             "tasa_interes_anual": 0.24}):
+        ...     print(fila.periodo, fila.saldo_final)
+
+    Args:
+        producto (str): "personal", "automotriz" o "revolvente"
+        columnas (dict): Parámetros de la función `calcular_cat` del producto
+        tamano_bloque (int, opcional): Créditos por bloque
+
+    Yields:
+        FilaAmortizacion: Filas en orden de crédito y periodo
+    """
+    for tabla in _bloques(producto, columnas, tamano_bloque):
+        for fila in tabla.tolist():
+            yield FilaAmortizacion._make(fila)
+
+
+def exportar_amortizacion(ruta, producto, columnas, tamano_bloque=TAMANO_BLOQUE, decimales=6):
+    """
+    Escribe la tabla de amortización de un lote de créditos en un archivo.
+
+    El formato se elige por la extensión: `.csv` para texto y cualquier otra
+    para el formato binario de este módulo. Los bloques se escriben a medida
+    que se calculan.
+
+    Args:
+        ruta (str): Archivo de salida
+        producto (str): "personal", "automotriz" o "revolvente"
+        columnas (dict): Parámetros de la función `calcular_cat` del producto
+        tamano_bloque (int, opcional): Créditos por bloque
+        decimales (int, opcional): Decimales a los que se redondean los montos en CSV
+
+    Returns:
+        int: Número de filas escritas
+    """
+    filas = 0
+    if os.path.splitext(str(ruta))[1].lower() == ".csv":
+        montos = DTYPE_AMORTIZACION.names[2:]
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(DTYPE_AMORTIZACION.names)
+            for tabla in _bloques(producto, columnas, tamano_bloque):
+                for nombre in montos:
+                    tabla[nombre] = np.round(tabla[nombre], decimales)
+                escritor.writerows(tabla.tolist())
+                filas += tabla.size
+        return filas
+
+    encabezado = json.dumps({"columnas": DTYPE_AMORTIZACION.descr}).encode("utf-8")
+    encabezado += b" " * (-(len(_IDENTIFICADOR) + 4 + len(encabezado)) % _ALINEACION)
+    with open(ruta, "wb") as archivo:
+        archivo.write(_IDENTIFICADOR)
+        archivo.write(struct.pack("<I", len(encabezado)))
+        archivo.write(encabezado)
+        for tabla in _bloques(producto, columnas, tamano_bloque):
+            archivo.write(tabla.tobytes())
+            filas += tabla.size
+    return filas
+
+
+def leer_amortizacion(ruta):
+    """
+    Abre una tabla de amortización escrita en formato binario.
+
+    Args:
+        ruta (str): Archivo creado con `exportar_amortizacion`
+
+    Returns:
+        numpy.ndarray: Arreglo estructurado de sólo lectura mapeado en memoria
+    """
+    with open(ruta, "rb") as archivo:
+        if archivo.read(len(_IDENTIFICADOR)) != _IDENTIFICADOR:
+            raise ValueError(f"{ruta} no es un archivo de tabla de amortización")
+        (longitud,) = struct.unpack("<I", archivo.read(4))
+        encabezado = json.loads(archivo.read(longitud).decode("utf-8"))
+
+    dtype = np.dtype([tuple(columna) for columna in encabezado["columnas"]])
+    desplazamiento = len(_IDENTIFICADOR) + 4 + longitud
+    filas = (os.path.getsize(ruta) - desplazamiento) // dtype.itemsize
+    if filas == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(ruta, dtype=dtype, mode="r", offset=desplazamiento, shape=(filas,))
+
+
+def _completar(producto, columnas):
+    """Valida las columnas de un producto y agrega las opcionales con su valor por omisión."""
+    if producto not in COLUMNAS_PRODUCTO:
+        raise ValueError(f"Producto desconocido: {producto}")
+    obligatorias, opcionales = COLUMNAS_PRODUCTO[producto]
+    faltantes = [nombre for nombre in obligatorias if nombre not in columnas]
+    if faltantes:
+        raise ValueError(f"Faltan columnas para '{producto}': {', '.join(faltantes)}")
+
+    completas = {nombre: columnas[nombre] for nombre in obligatorias}
+    for nombre, valor in opcionales.items():
+        completas[nombre] = columnas.get(nombre, valor)
+    arreglos = np.broadcast_arrays(*(np.asarray(valor, dtype=float) for valor in completas.values()))
+    return {nombre: np.ravel(arreglo) for nombre, arreglo in zip(completas, arreglos)}
+
+
+def _bloques(producto, columnas, tamano_bloque):
+    """Genera las tablas de bloques consecutivos de `tamano_bloque` créditos."""
+    columnas = _completar(producto, columnas)
+    creditos = next(iter(columnas.values())).size
+    for inicio in range(0, creditos, tamano_bloque):
+        bloque = {nombre: valores[inicio:inicio + tamano_bloque] for nombre, valores in columnas.items()}
+        yield tabla_amortizacion(producto, bloque, primer_credito=inicio)
+
+
+def _tabla_pagos_fijos(monto_credito, plazo_meses, tasa_interes_anual, comision_apertura,
+                       comisiones_mensuales, seguro, otros_costos, otros_cargos, periodicidad,
+                       primer_credito):
+    """
+    Tabla de préstamos con pagos fijos semanales, catorcenales, quincenales o
+    mensuales.
+
+    El número de pagos, la tasa por periodo y el pago se calculan con las
+    mismas expresiones que `calcular_cat`, y los cargos mensuales se prorratean
+    por periodo. El saldo al final de cada periodo k se obtiene en forma cerrada,
+
+        saldo_k = monto · ((1 + i)^n - (1 + i)^k) / ((1 + i)^n - 1),
+
+    que es exactamente cero al final del plazo; el capital es la diferencia de
+    saldos, por lo que interés + capital coincide con el pago salvo redondeo.
+    """
+    plazo = np.rint(plazo_meses * periodicidad / 12).astype(np.int64)
+    if np.any(plazo < 1):
+        raise ValueError("El plazo debe ser de al menos un periodo")
+    filas_por_credito = plazo + 1
+    inicio = np.cumsum(filas_por_credito) - filas_por_credito
+    total = int(filas_por_credito.sum())
+
+    tabla = np.zeros(total, dtype=DTYPE_AMORTIZACION)
+    indice = np.repeat(np.arange(plazo.size), filas_por_credito)
+    periodo = np.arange(total) - inicio[indice]
+    tabla["credito"] = indice + primer_credito
+    tabla["periodo"] = periodo
+
+    # Pago periódico (amortización + intereses), como en calcular_cat
+    tasa_periodo = tasa_interes_anual / periodicidad
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crecimiento_plazo = (1 + tasa_periodo) ** plazo
+        pago_periodo = np.where(tasa_periodo == 0, monto_credito / plazo,
+                                monto_credito * (tasa_periodo * crecimiento_plazo) / (crecimiento_plazo - 1))
+
+        # Saldo al final de cada periodo por fila
+        tasa = tasa_periodo[indice]
+        crecimiento = (1 + tasa) ** periodo
+        saldo = np.where(tasa == 0, monto_credito[indice] * (plazo[indice] - periodo) / plazo[indice],
+                         monto_credito[indice] * (crecimiento_plazo[indice] - crecimiento)
+                         / (crecimiento_plazo[indice] - 1))
+
+    pagos = periodo > 0
+    saldo_inicial = np.zeros(total)
+    saldo_inicial[pagos] = saldo[np.flatnonzero(pagos) - 1]
+    tabla["saldo_inicial"] = saldo_inicial
+    tabla["saldo_final"] = saldo
+    tabla["interes"] = np.where(pagos, saldo_inicial * tasa, 0.0)
+    tabla["capital"] = saldo_inicial - np.where(pagos, saldo, 0.0)
+    tabla["pago"] = np.where(pagos, pago_periodo[indice], 0.0)
+
+    # Periodo 0: disposición, comisión por apertura y otros costos; después,
+    # los cargos mensuales prorrateados por periodo
+    prorrateo = (12 / periodicidad)[indice]
+    tabla["disposicion"][inicio] = monto_credito
+    tabla["comisiones"] = np.where(pagos, comisiones_mensuales[indice] * prorrateo, 0.0)
+    tabla["comisiones"][inicio] = comision_apertura
+    tabla["seguro"] = np.where(pagos, seguro[indice] * prorrateo, 0.0)
+    tabla["otros"] = np.where(pagos, otros_cargos[indice] * prorrateo, 0.0)
+    tabla["otros"][inicio] = otros_costos
+
+    # Flujos con las mismas operaciones que calcular_cat
+    tabla["flujo"] = tabla["pago"] + tabla["comisiones"] + tabla["seguro"] + tabla["otros"]
+    tabla["flujo"][inicio] = -(monto_credito - comision_apertura - otros_costos)
+    return tabla
+
+
+def _tabla_revolvente(columnas, primer_credito):
+    """Tabla de créditos revolventes a partir de `simular_revolvente_lote`."""
+    flujos, saldo, interes, pago, disposicion = simular_revolvente_lote(
+        columnas["monto_linea_credito"], columnas["tasa_interes_anual"], columnas["comision_anual"],
+        columnas["pago_minimo_porcentaje"], columnas["otros_cargos_mensuales"])
+    creditos, periodos = flujos.shape
+
+    tabla = np.zeros((creditos, periodos), dtype=DTYPE_AMORTIZACION)
+    tabla["credito"] = (np.arange(creditos) + primer_credito)[:, np.newaxis]
+    tabla["periodo"] = np.arange(periodos)
+    tabla["saldo_inicial"][:, 1:] = saldo[:, :-1]
+    tabla["saldo_final"] = saldo
+    tabla["interes"] = interes
+    tabla["disposicion"] = disposicion
+    tabla["disposicion"][:, 0] = columnas["monto_linea_credito"]
+
+    # Anualidad al final de cada 12 meses y otros cargos cada mes
+    meses = np.arange(1, PLAZO_MESES + 1)
+    tabla["comisiones"][:, 1:] = np.where(meses % 12 == 0, columnas["comision_anual"][:, np.newaxis], 0.0)
+    tabla["otros"][:, 1:] = columnas["otros_cargos_mensuales"][:, np.newaxis]
+    tabla["pago"][:, 1:] = pago[:, 1:] - tabla["comisiones"][:, 1:] - tabla["otros"][:, 1:]
+    tabla["capital"][:, 1:] = tabla["pago"][:, 1:] - interes[:, 1:]
+    tabla["flujo"] = flujos
+    return tabla.ravel()
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Procesamiento por Bloques de Archivos de Cartera
+
+Este módulo recalcula el CAT de una cartera completa leída de un archivo CSV o
+Parquet. El archivo se lee en bloques de tamaño fijo, cada bloque se resuelve
+con `calcular_cat_productos` y los resultados se escriben de inmediato, de modo
+que la memoria usada no depende del tamaño del archivo.
+
+La lectura y escritura de Parquet requiere `pyarrow`, que sólo se importa
+cuando se usa ese formato.
+"""
+
+import csv
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from calculo_cat.productos import calcular_cat_productos, validar_productos
+
+
+TAMANO_BLOQUE = 100_000
+
+_NAN = float("nan")
+
+# Columnas del archivo de salida
+COLUMNAS_SALIDA = ("id", "producto", "cat", "iteraciones", "convergido")
+
+# Columnas de entrada que se leen como texto
+COLUMNAS_TEXTO = ("id", "producto", "tipo_tarjeta")
+
+ResumenLote = namedtuple("ResumenLote", ["filas", "no_convergidas", "segundos", "ejemplos_no_convergidos"])
+ResumenLote.__doc__ = """
+Resumen del procesamiento de un archivo de cartera.
+
+Atributos:
+    filas (int): Filas procesadas
+    no_convergidas (int): Filas cuyo CAT no convergió
+    segundos (float): Tiempo total de procesamiento
+    ejemplos_no_convergidos (list): Identificadores de las primeras filas que no convergieron
+"""
+
+
+def procesar_archivo(entrada, salida, tamano_bloque=TAMANO_BLOQUE, max_ejemplos=20, progreso=None):
+    """
+    Recalcula el CAT de cada fila de un archivo de cartera.
+
+    El archivo de entrada debe tener una columna `producto` ("personal",
+    "automotriz" o "revolvente") y las columnas de parámetros del producto; la
+    columna `id` es opcional y, si falta, se usa el número de fila.
+
+    Las filas se numeran desde 1 sin contar el encabezado; un producto
+    desconocido o un valor no numérico detiene el proceso con un `ValueError`
+    que indica su fila (y su columna).
+
+    Args:
+        entrada (str): Archivo CSV o Parquet de entrada
+        salida (str): Archivo CSV o Parquet de salida
+        tamano_bloque (int, opcional): Filas por bloque
+        max_ejemplos (int, opcional): Número de filas no convergidas a reportar
+        progreso (callable, opcional): Función llamada después de cada bloque con
+                      (filas procesadas, segundos transcurridos)
+
+    Returns:
+        ResumenLote: Resumen del procesamiento
+
+    Raises:
+        ValueError: Si una fila tiene un producto desconocido, un valor no
+        numérico o un número de valores distinto al del encabezado, o si
+        falta una columna obligatoria
+    """
+    inicio = time.perf_counter()
+    filas = 0
+    no_convergidas = 0
+    ejemplos = []
+
+    with _EscritorResultados(salida) as escribir:
+        for columnas in leer_bloques(entrada, tamano_bloque):
+            producto = validar_productos(columnas.pop("producto"), primera_fila=filas + 1)
+            n = len(producto)
+            ids = columnas.pop("id", None)
+            if ids is None:
+                ids = np.arange(filas, filas + n).astype(str)
+
+            resultado = calcular_cat_productos(producto, columnas)
+            escribir(ids, producto, resultado)
+
+            fallidas = np.flatnonzero(~resultado.convergido)
+            no_convergidas += fallidas.size
+            faltantes = max_ejemplos - len(ejemplos)
+            if faltantes > 0:
+                ejemplos.extend(str(ids[i]) for i in fallidas[:faltantes])
+
+            filas += n
+            if progreso is not None:
+                progreso(filas, time.perf_counter() - inicio)
+
+    return ResumenLote(filas, no_convergidas, time.perf_counter() - inicio, ejemplos)
+
+
+def leer_bloques(ruta, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Lee un archivo CSV o Parquet en bloques.
+
+    Las columnas de `COLUMNAS_TEXTO` se devuelven como texto; las demás como
+    arreglos float64, con NaN para los valores vacíos. Un valor no numérico, o
+    una fila de CSV con más o menos valores que el encabezado, produce un
+    `ValueError` con su fila (contando desde 1 sin el encabezado).
+
+    Args:
+        ruta (str): Archivo de entrada
+        tamano_bloque (int, opcional): Filas por bloque
+
+    Yields:
+        dict: Arreglos de NumPy por nombre de columna
+    """
+    if _es_parquet(ruta):
+        yield from _leer_bloques_parquet(ruta, tamano_bloque)
+    else:
+        yield from _leer_bloques_csv(ruta, tamano_bloque)
+
+
+def _leer_bloques_csv(ruta, tamano_bloque):
+    """Lee un archivo CSV en bloques con el módulo `csv` de la biblioteca estándar."""
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        lector = csv.reader(archivo)
+        encabezado = [columna.strip() for columna in next(lector)]
+        primera_fila = 1
+        while True:
+            renglones = [renglon for _, renglon in zip(range(tamano_bloque), lector)]
+            if not renglones:
+                return
+            for indice, renglon in enumerate(renglones):
+                if len(renglon) != len(encabezado):
+                    raise ValueError(f"La fila {primera_fila + indice} tiene {len(renglon)} valores; "
+                                     f"el encabezado tiene {len(encabezado)} columnas")
+            yield {
+                nombre: _columna(nombre, valores, primera_fila)
+                for nombre, valores in zip(encabezado, zip(*renglones))
+            }
+            primera_fila += len(renglones)
+
+
+def _leer_bloques_parquet(ruta, tamano_bloque):
+    """Lee un archivo Parquet en bloques con `pyarrow`."""
+    _, pq = _importar_parquet()
+    primera_fila = 1
+    for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_bloque):
+        yield {
+            nombre: _columna(nombre, columna.to_numpy(zero_copy_only=False), primera_fila)
+            for nombre, columna in zip(lote.schema.names, lote.columns)
+        }
+        primera_fila += lote.num_rows
+
+
+def _columna(nombre, valores, primera_fila=1):
+    """
+    Convierte los valores de una columna al tipo que le corresponde.
+
+    Args:
+        nombre (str): Nombre de la columna
+        valores (tuple o numpy.ndarray): Valores de la columna en el bloque
+        primera_fila (int, opcional): Número de fila del primer valor, para el
+                      mensaje de error
+
+    Returns:
+        numpy.ndarray: Texto para `COLUMNAS_TEXTO`, float64 para las demás
+
+    Raises:
+        ValueError: Con la fila y la columna del primer valor no numérico
+    """
+    if nombre in COLUMNAS_TEXTO:
+        return np.asarray(valores).astype(str)
+    try:
+        if isinstance(valores, tuple):
+            # Valores de texto leídos del CSV: los vacíos se convierten en NaN
+            return np.fromiter((float(valor) if valor.strip() else _NAN for valor in valores),
+                               dtype=float, count=len(valores))
+        return np.asarray(valores, dtype=float)
+    except (TypeError, ValueError):
+        pass
+
+    # Localizar el primer valor que no se puede convertir
+    for indice, valor in enumerate(valores):
+        try:
+            if not (isinstance(valor, str) and not valor.strip()):
+                float(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"Valor no numérico '{valor}' en la fila {primera_fila + indice}, "
+                             f"columna '{nombre}'") from None
+    raise ValueError(f"La columna '{nombre}' no es numérica")
+
+
+class _EscritorResultados:
+    """
+    Administrador de contexto que escribe los resultados en CSV o Parquet a
+    medida que se calculan.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = None
+        self._escritor_parquet = None
+
+    def __enter__(self):
+        if not _es_parquet(self.ruta):
+            self._archivo = open(self.ruta, "w", newline="", encoding="utf-8")
+            self._csv = csv.writer(self._archivo)
+            self._csv.writerow(COLUMNAS_SALIDA)
+        return self.escribir
+
+    def escribir(self, ids, producto, resultado):
+        """Escribe un bloque de resultados."""
+        if self._archivo is not None:
+            self._csv.writerows(zip(
+                ids, producto, np.char.mod("%.10f", resultado.cat),
+                resultado.iteraciones, resultado.convergido.astype(np.int8)))
+            return
+
+        pa, pq = _importar_parquet()
+        tabla = pa.table({
+            "id": pa.array(ids, type=pa.string()),
+            "producto": pa.array(producto, type=pa.string()),
+            "cat": pa.array(resultado.cat, type=pa.float64()),
+            "iteraciones": pa.array(resultado.iteraciones, type=pa.int64()),
+            "convergido": pa.array(resultado.convergido, type=pa.bool_()),
+        })
+        if self._escritor_parquet is None:
+            self._escritor_parquet = pq.ParquetWriter(self.ruta, tabla.schema)
+        self._escritor_parquet.write_table(tabla)
+
+    def __exit__(self, *excinfo):
+        if self._archivo is not None:
+            self._archivo.close()
+        elif self._escritor_parquet is None and excinfo[0] is None:
+            # Archivo de entrada vacío: escribir un Parquet sin filas
+            vacio = np.empty(0)
+            self.escribir(vacio.astype(str), vacio.astype(str),
+                          calcular_cat_productos(vacio.astype(str), {}))
+        if self._escritor_parquet is not None:
+            self._escritor_parquet.close()
+
+
+def _es_parquet(ruta):
+    """Indica si la ruta corresponde a un archivo Parquet por su extensión."""
+    return os.path.splitext(str(ruta))[1].lower() in (".parquet", ".pq")
+
+
+def _importar_parquet():
+    """
+    Importa `pyarrow` sólo cuando se usa el formato Parquet.
+
+    Returns:
+        tuple: Módulos (`pyarrow`, `pyarrow.parquet`)
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("El formato Parquet requiere el paquete 'pyarrow'") from error
+    return pa, pq
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+Memorización de Cotizaciones del CAT
+
+Este módulo implementa una capa de caché alrededor de las funciones públicas
+`calcular_cat*` de los ejemplos. Las cotizaciones de un mismo producto se
+repiten constantemente (mismo plazo, tasa y comisiones para distintos clientes),
+así que cada combinación de parámetros se resuelve una sola vez.
+
+- Los parámetros se normalizan en una clave canónica: los montos se redondean
+  a la unidad monetaria, las tasas a un número fijo de decimales, las fechas se
+  representan en formato ISO y las garantías en efectivo por sus campos. Una
+  llamada con un parámetro que la clave no puede representar se calcula
+  directamente, sin pasar por la caché.
+- Si el resultado depende además de un estado global, la función lo declara
+  con un atributo `contexto_cache`: una función que recibe los argumentos de
+  la llamada y devuelve los valores de ese estado que se agregan a la clave
+  (por ejemplo, el valor de la UDI de la serie activa en las tarjetas).
+- La caché en memoria tiene capacidad acotada y desaloja la entrada usada
+  menos recientemente (LRU), llevando estadísticas de aciertos, fallos y
+  desalojos.
+- Opcionalmente, una segunda capa en un archivo SQLite conserva los resultados
+  entre reinicios.
+- En un fallo, el CAT del vecino más cercano ya calculado (mismo plazo y
+  parámetros de texto, tasa más parecida) se usa como estimación inicial del
+  solucionador, a través del parámetro `tasa_inicial` de la función envuelta.
+"""
+
+import bisect
+import inspect
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from calculo_cat.garantias import GarantiaEfectivo
+from calculo_cat.solver import VERSION_CAT, tasa_periodica
+
+
+# Número de escrituras a la capa persistente que se agrupan en una transacción
+_ESCRITURAS_POR_TRANSACCION = 64
+
+
+class _SinClave(Exception):
+    """Un parámetro de la llamada no tiene representación en la clave canónica."""
+
+
+class CacheCAT:
+    """
+    Caché LRU para una función de cálculo del CAT.
+
+    Ejemplo:
+        >>> from prestamo_personal_basico import calcular_cat
+        >>> cotizar = CacheCAT(calcular_cat, capacidad=10000)
+        >>> cotizar(50000, 24, 0.24, comision_apertura=1000)
+    """
+
+    def __init__(self, funcion, capacidad=4096, ruta_persistente=None,
+                 unidad_monetaria=0.01, decimales_tasa=8):
+        """
+        Args:
+            funcion (callable): Función que calcula el CAT (ej: `calcular_cat`)
+            capacidad (int, opcional): Número máximo de entradas en memoria
+            ruta_persistente (str, opcional): Archivo SQLite para conservar los
+                      resultados entre reinicios
+            unidad_monetaria (float, opcional): Unidad a la que se redondean los montos
+            decimales_tasa (int, opcional): Decimales a los que se redondean las tasas
+        """
+        self.funcion = funcion
+        self.capacidad = capacidad
+        self.unidad_monetaria = unidad_monetaria
+        self.decimales_tasa = decimales_tasa
+
+        self._firma = inspect.signature(funcion)
+        self._acepta_tasa_inicial = "tasa_inicial" in self._firma.parameters
+        self._contexto = getattr(funcion, "contexto_cache", None)
+        self._nombre = f"{funcion.__module__}.{funcion.__qualname__}@{VERSION_CAT}"
+
+        self._entradas = OrderedDict()
+        self._vecinos = {}
+        self._candado = threading.Lock()
+
+        self.aciertos = 0
+        self.aciertos_persistentes = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.omitidos = 0
+
+        self._conexion = None
+        self._escrituras_pendientes = 0
+        if ruta_persistente is not None:
+            self._conexion = sqlite3.connect(ruta_persistente, check_same_thread=False)
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute("PRAGMA synchronous=NORMAL")
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS cache_cat ("
+                "funcion TEXT NOT NULL, clave TEXT NOT NULL, cat REAL NOT NULL, "
+                "PRIMARY KEY (funcion, clave))"
+            )
+            self._conexion.commit()
+
+    def __call__(self, *args, **kwargs):
+        """
+        Calcula el CAT con los mismos argumentos que la función envuelta,
+        reutilizando el resultado si la combinación ya fue calculada.
+
+        Returns:
+            float: CAT expresado como porcentaje anual
+        """
+        try:
+            clave, argumentos = self.clave(*args, **kwargs)
+        except _SinClave:
+            with self._candado:
+                self.omitidos += 1
+            return self.funcion(*args, **kwargs)
+
+        with self._candado:
+            cat = self._entradas.get(clave)
+            if cat is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return cat
+
+            cat = self._leer_persistente(clave)
+            if cat is not None:
+                self.aciertos_persistentes += 1
+                self._guardar(clave, cat)
+                return cat
+
+            self.fallos += 1
+            vecino = self._vecino_cercano(clave)
+
+        # Usar el CAT del vecino más cercano como estimación inicial
+        if vecino is not None and self._acepta_tasa_inicial and "tasa_inicial" not in argumentos:
+            argumentos["tasa_inicial"] = tasa_periodica(vecino, argumentos.get("periodicidad", 12))
+
+        cat = self.funcion(**argumentos)
+
+        with self._candado:
+            self._guardar(clave, cat)
+            self._escribir_persistente(clave, cat)
+
+        return cat
+
+    def clave(self, *args, **kwargs):
+        """
+        Construye la clave canónica de una llamada.
+
+        Returns:
+            tuple: (clave, argumentos) donde la clave es una tupla de pares
+            (parámetro, valor normalizado), seguidos de los del contexto de
+            la función si lo declara, y los argumentos son los valores
+            originales por nombre, incluyendo los valores por omisión
+
+        Raises:
+            _SinClave: Si algún parámetro no se puede representar en la clave
+        """
+        ligados = self._firma.bind(*args, **kwargs)
+        ligados.apply_defaults()
+        argumentos = dict(ligados.arguments)
+
+        clave = tuple(
+            (nombre, self._normalizar(nombre, valor))
+            for nombre, valor in argumentos.items()
+            if nombre != "tasa_inicial"
+        )
+        if self._contexto is not None:
+            # Estado global del que depende el resultado (ej: el valor de la UDI)
+            clave += tuple(sorted(self._contexto(argumentos).items()))
+        return clave, argumentos
+
+    def estadisticas(self):
+        """
+        Returns:
+            dict: Aciertos, aciertos en la capa persistente, fallos, desalojos,
+            llamadas calculadas sin caché, tamaño actual y capacidad de la
+            caché en memoria
+        """
+        with self._candado:
+            return {
+                "aciertos": self.aciertos,
+                "aciertos_persistentes": self.aciertos_persistentes,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "omitidos": self.omitidos,
+                "tamano": len(self._entradas),
+                "capacidad": self.capacidad,
+            }
+
+    def limpiar(self):
+        """
+        Vacía la caché en memoria y reinicia las estadísticas. La capa
+        persistente no se modifica.
+        """
+        with self._candado:
+            self._entradas.clear()
+            self._vecinos.clear()
+            self.aciertos = self.aciertos_persistentes = self.fallos = self.desalojos = self.omitidos = 0
+
+    def cerrar(self):
+        """
+        Confirma las escrituras pendientes y cierra la capa persistente.
+        """
+        with self._candado:
+            if self._conexion is not None:
+                self._conexion.commit()
+                self._conexion.close()
+                self._conexion = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excinfo):
+        self.cerrar()
+
+    def _normalizar(self, nombre, valor):
+        """
+        Normaliza un parámetro según su nombre: plazos y periodicidad como
+        enteros, tasas y porcentajes a `decimales_tasa`, textos en minúsculas y
+        el resto de los números como montos redondeados a la unidad monetaria.
+        Las fechas se representan en formato ISO y las garantías en efectivo
+        como una tupla de sus campos normalizados.
+
+        Raises:
+            _SinClave: Si el valor no es de un tipo que la clave pueda representar
+        """
+        if isinstance(valor, str):
+            return valor.lower()
+        if isinstance(valor, bool) or valor is None:
+            return valor
+        if isinstance(valor, date):
+            return valor.isoformat()
+        if isinstance(valor, GarantiaEfectivo):
+            return self._normalizar_garantia(valor)
+        try:
+            if "plazo" in nombre or nombre == "periodicidad":
+                return int(valor)
+            if "tasa" in nombre or "porcentaje" in nombre:
+                return round(float(valor), self.decimales_tasa)
+            return round(round(float(valor) / self.unidad_monetaria) * self.unidad_monetaria, 10)
+        except (TypeError, ValueError):
+            raise _SinClave(nombre) from None
+
+    def _normalizar_garantia(self, garantia):
+        """Tupla (monto, rendimientos, liberaciones, mes de constitución) de una garantía."""
+        if isinstance(garantia.tasa_rendimiento, (list, tuple)):
+            rendimientos = tuple(self._normalizar("tasa", tasa) for tasa in garantia.tasa_rendimiento)
+        else:
+            rendimientos = self._normalizar("tasa", garantia.tasa_rendimiento)
+        liberaciones = tuple((int(mes), self._normalizar("tasa", fraccion))
+                             for mes, fraccion in garantia.liberaciones)
+        return ("garantia", self._normalizar("monto", garantia.monto), rendimientos, liberaciones,
+                int(garantia.mes_constitucion))
+
+    def _grupo_y_tasa(self, clave):
+        """
+        Separa la clave en su grupo de vecindad (plazos y parámetros que no son
+        numéricos) y el valor de la primera tasa.
+        """
+        grupo = tuple(par for par in clave if not isinstance(par[1], float))
+        tasa = next((valor for nombre, valor in clave if "tasa" in nombre), None)
+        return grupo, tasa
+
+    def _guardar(self, clave, cat):
+        """Inserta una entrada en memoria, desalojando la menos usada si hace falta."""
+        if clave in self._entradas:
+            self._entradas.move_to_end(clave)
+            return
+        self._entradas[clave] = cat
+        grupo, tasa = self._grupo_y_tasa(clave)
+        if tasa is not None:
+            bisect.insort(self._vecinos.setdefault(grupo, []), (tasa, clave))
+
+        while len(self._entradas) > self.capacidad:
+            clave_antigua, _ = self._entradas.popitem(last=False)
+            self.desalojos += 1
+            grupo, tasa = self._grupo_y_tasa(clave_antigua)
+            if tasa is not None:
+                vecinos = self._vecinos[grupo]
+                vecinos.pop(bisect.bisect_left(vecinos, (tasa, clave_antigua)))
+                if not vecinos:
+                    del self._vecinos[grupo]
+
+    def _vecino_cercano(self, clave):
+        """
+        Busca el CAT calculado más cercano: mismo grupo y tasa más parecida.
+
+        Returns:
+            float: CAT del vecino, o None si no hay ninguno
+        """
+        grupo, tasa = self._grupo_y_tasa(clave)
+        vecinos = self._vecinos.get(grupo)
+        if tasa is None or not vecinos:
+            return None
+
+        posicion = bisect.bisect_left(vecinos, (tasa,))
+        candidatos = vecinos[max(posicion - 1, 0):posicion + 1]
+        _, clave_vecina = min(candidatos, key=lambda candidato: abs(candidato[0] - tasa))
+        return self._entradas[clave_vecina]
+
+    def _leer_persistente(self, clave):
+        """Busca una clave en la capa persistente."""
+        if self._conexion is None:
+            return None
+        fila = self._conexion.execute(
+            "SELECT cat FROM cache_cat WHERE funcion = ? AND clave = ?",
+            (self._nombre, json.dumps(clave)),
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def _escribir_persistente(self, clave, cat):
+        """Guarda una entrada en la capa persistente, agrupando las transacciones."""
+        if self._conexion is None:
+            return
+        self._conexion.execute(
+            "INSERT OR REPLACE INTO cache_cat (funcion, clave, cat) VALUES (?, ?, ?)",
+            (self._nombre, json.dumps(clave), cat),
+        )
+        self._escrituras_pendientes += 1
+        if self._escrituras_pendientes >= _ESCRITURAS_POR_TRANSACCION:
+            self._conexion.commit()
+            self._escrituras_pendientes = 0
+
+
+def memorizar_cat(capacidad=4096, ruta_persistente=None, unidad_monetaria=0.01, decimales_tasa=8):
+    """
+    Decorador que envuelve una función `calcular_cat*` en una `CacheCAT`.
+
+    Args:
+        capacidad (int, opcional): Número máximo de entradas en memoria
+        ruta_persistente (str, opcional): Archivo SQLite para la capa persistente
+        unidad_monetaria (float, opcional): Unidad a la que se redondean los montos
+        decimales_tasa (int, opcional): Decimales a los que se redondean las tasas
+
+    Returns:
+        callable: Decorador
+    """
+    def decorador(funcion):
+        return CacheCAT(funcion, capacidad=capacidad, ruta_persistente=ruta_persistente,
+                        unidad_monetaria=unidad_monetaria, decimales_tasa=decimales_tasa)
+    return decorador
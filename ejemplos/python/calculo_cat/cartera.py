@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+Cartera de Créditos en SQLite con Recálculo Incremental
+
+Como en los scripts de `ejemplos/sqlserver`, el CAT se guarda junto a los
+datos de cada crédito. Este módulo mantiene la cartera en un archivo SQLite
+indexado por identificador de crédito, con una huella (hash) de los parámetros
+que determinan su CAT. Al volver a cargar la cartera sólo se reescriben los
+créditos cuya huella cambió, y `recalcular` resuelve únicamente los créditos:
+
+    - cuya huella cambió desde su último cálculo, o
+    - cuyos parámetros regulatorios se movieron: la versión del cálculo, el
+      plazo de la Circular 9/2015 y, para las tarjetas registradas por tipo,
+      los montos en UDIS y el valor de la UDI.
+
+Los créditos pendientes se resuelven por bloques con `calcular_cat_productos`
+y los resultados de cada bloque se guardan en una sola transacción.
+
+Las tarjetas de crédito pueden registrarse con `tipo_tarjeta` (clasica, oro,
+platino) en lugar de `monto_linea_credito`; su línea es el monto en UDIS de
+`MONTOS_UDIS` por el valor de la UDI, tomado de la serie activa
+(`calculo_cat.udi.usar_serie_udi`) o indicado al recalcular.
+
+Ejemplo:
+    >>> with CarteraCAT("cartera.db") as cartera:
+    ...     cartera.importar("cartera.csv")
+    ...     resumen = cartera.recalcular(fecha="2024-03-01")
+    >>> resumen.revisados, resumen.recalculados
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from calculo_cat.archivos import leer_bloques
+from calculo_cat.productos import COLUMNAS_PRODUCTO, calcular_cat_productos, validar_productos
+from calculo_cat.revolvente import PLAZO_MESES
+from calculo_cat.udi import MONTOS_UDIS, serie_udi_activa
+
+
+# Créditos por bloque al cargar y al recalcular
+TAMANO_BLOQUE = 100_000
+
+# Versión de la metodología del cálculo; al cambiarla se recalcula toda la cartera
+VERSION_CALCULO = 2
+
+# Régimen de las tarjetas registradas por tipo, cuya línea depende de la UDI
+REGIMEN_UDIS = "revolvente/udis"
+
+# Valores de `tipo_tarjeta` que indican que la tarjeta no se registra por tipo
+_TIPOS_VACIOS = ("", "nan", "none")
+
+# Parámetros de todos los productos, en el orden de sus columnas en la tabla
+PARAMETROS = tuple(dict.fromkeys(
+    nombre
+    for obligatorias, opcionales in COLUMNAS_PRODUCTO.values()
+    for nombre in (*obligatorias, *opcionales)
+))
+
+# Posición en `PARAMETROS` y valor por omisión (None si es obligatorio) de los parámetros de cada producto
+_POSICIONES_PRODUCTO = {
+    producto: tuple((PARAMETROS.index(nombre), None) for nombre in obligatorias)
+    + tuple((PARAMETROS.index(nombre), valor) for nombre, valor in opcionales.items())
+    for producto, (obligatorias, opcionales) in COLUMNAS_PRODUCTO.items()
+}
+
+ResumenRecalculo = namedtuple("ResumenRecalculo", ["revisados", "recalculados", "no_convergidos", "segundos"])
+ResumenRecalculo.__doc__ = """
+Resumen de un recálculo incremental de la cartera.
+
+Atributos:
+    revisados (int): Créditos de la cartera revisados
+    recalculados (int): Créditos cuyo CAT se volvió a calcular
+    no_convergidos (int): Créditos recalculados cuyo CAT no convergió
+    segundos (float): Tiempo total del recálculo
+"""
+
+
+class CarteraCAT:
+    """
+    Cartera de créditos guardada en un archivo SQLite, con el último CAT
+    calculado de cada crédito.
+    """
+
+    def __init__(self, ruta):
+        """
+        Args:
+            ruta (str): Archivo SQLite; se crea si no existe
+        """
+        self.ruta = ruta
+        self._conexion = sqlite3.connect(ruta)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS creditos ("
+            "id TEXT PRIMARY KEY, producto TEXT NOT NULL, tipo_tarjeta TEXT, regimen TEXT NOT NULL, "
+            + "".join(f"{nombre} REAL, " for nombre in PARAMETROS)
+            + "huella TEXT NOT NULL, huella_calculada TEXT, huella_regulatoria TEXT, "
+            "cat REAL, iteraciones INTEGER, convergido INTEGER, fecha_calculo TEXT)"
+        )
+        # Columnas de parámetros agregados después de crear el archivo
+        existentes = {fila[1] for fila in self._conexion.execute("PRAGMA table_info(creditos)")}
+        for nombre in PARAMETROS:
+            if nombre not in existentes:
+                self._conexion.execute(f"ALTER TABLE creditos ADD COLUMN {nombre} REAL")
+        self._conexion.execute(
+            "CREATE INDEX IF NOT EXISTS creditos_regimen ON creditos (regimen, huella_regulatoria)")
+        self._conexion.commit()
+
+    def guardar(self, columnas, primera_fila=1):
+        """
+        Agrega o actualiza créditos de la cartera.
+
+        Los créditos cuya huella no cambió no se reescriben y conservan su CAT.
+
+        Args:
+            columnas (dict): Arreglos por nombre de columna, uno por crédito, con
+                      `id`, `producto`, los parámetros de cada producto y,
+                      opcionalmente, `tipo_tarjeta`. Los valores faltantes (NaN)
+                      de las columnas opcionales toman su valor por omisión
+            primera_fila (int, opcional): Número de fila del primer crédito, para
+                      los mensajes de error
+
+        Returns:
+            int: Créditos nuevos o con parámetros distintos
+
+        Raises:
+            ValueError: Si un crédito tiene un producto desconocido o le falta
+            un parámetro obligatorio de su producto; no se guarda ningún
+            crédito de `columnas`
+        """
+        ids = np.asarray(columnas["id"]).astype(str)
+        productos = validar_productos(columnas["producto"], primera_fila)
+        tipos = np.asarray(columnas.get("tipo_tarjeta", np.full(ids.size, "")), dtype=str)
+        valores = [
+            (np.asarray(columnas[nombre], dtype=float) if nombre in columnas else np.full(ids.size, math.nan)).tolist()
+            for nombre in PARAMETROS
+        ]
+
+        renglones = []
+        filas = zip(ids.tolist(), productos.tolist(), tipos.tolist(), *valores)
+        for numero, (id_credito, producto, tipo, *fila) in enumerate(filas, start=primera_fila):
+            tipo = tipo.strip().lower()
+            tipo = tipo if tipo not in _TIPOS_VACIOS else None
+            faltante = _parametro_faltante(producto, tipo, fila)
+            if faltante is not None:
+                if faltante not in columnas:
+                    raise ValueError(f"Falta la columna '{faltante}' para el producto '{producto}' "
+                                     f"(fila {numero})")
+                raise ValueError(f"Falta el valor de '{faltante}' para el producto '{producto}' "
+                                 f"en la fila {numero}")
+            regimen = REGIMEN_UDIS if producto == "revolvente" and tipo else producto
+            parametros = _parametros_credito(producto, tipo, fila)
+            renglones.append((id_credito, producto, tipo, regimen, *parametros,
+                              huella_credito(producto, tipo, parametros)))
+
+        columnas_tabla = ("id", "producto", "tipo_tarjeta", "regimen", *PARAMETROS, "huella")
+        antes = self._conexion.total_changes
+        with self._conexion:
+            self._conexion.executemany(
+                f"INSERT INTO creditos ({', '.join(columnas_tabla)}) "
+                f"VALUES ({', '.join('?' * len(columnas_tabla))}) "
+                "ON CONFLICT (id) DO UPDATE SET "
+                + ", ".join(f"{nombre} = excluded.{nombre}" for nombre in columnas_tabla[1:])
+                + " WHERE creditos.huella != excluded.huella",
+                renglones,
+            )
+        return self._conexion.total_changes - antes
+
+    def importar(self, ruta, tamano_bloque=TAMANO_BLOQUE):
+        """
+        Agrega o actualiza los créditos de un archivo de cartera CSV o Parquet
+        con columnas `id` y `producto` (ver `guardar`).
+
+        Args:
+            ruta (str): Archivo de cartera
+            tamano_bloque (int, opcional): Filas por bloque
+
+        Returns:
+            int: Créditos nuevos o con parámetros distintos
+
+        Raises:
+            ValueError: Con la fila del primer crédito inválido (ver `guardar`);
+            los bloques anteriores a ese crédito ya quedan guardados
+        """
+        cambiados = 0
+        filas = 0
+        for columnas in leer_bloques(ruta, tamano_bloque):
+            if "id" not in columnas:
+                raise ValueError("El archivo de cartera debe tener una columna 'id'")
+            cambiados += self.guardar(columnas, primera_fila=filas + 1)
+            filas += len(columnas["id"])
+        return cambiados
+
+    def recalcular(self, fecha=None, valor_udi=None, tamano_bloque=TAMANO_BLOQUE, progreso=None):
+        """
+        Calcula el CAT de los créditos cuya huella o cuyos parámetros
+        regulatorios cambiaron desde su último cálculo.
+
+        Args:
+            fecha (date o str, opcional): Fecha de cálculo; por omisión, hoy. El
+                      valor de la UDI es el último de la serie activa publicado
+                      en esta fecha o antes de ella (el último publicado si no
+                      se indica)
+            valor_udi (float, opcional): Valor de la UDI; por omisión, el de la serie activa
+            tamano_bloque (int, opcional): Créditos por bloque
+            progreso (callable, opcional): Función llamada después de cada bloque con
+                      (créditos recalculados, segundos transcurridos)
+
+        Returns:
+            ResumenRecalculo: Créditos revisados y recalculados
+        """
+        inicio = time.perf_counter()
+        fecha_calculo = str(fecha) if fecha is not None else date.today().isoformat()
+        regimenes = dict(self._conexion.execute("SELECT regimen, COUNT(*) FROM creditos GROUP BY regimen"))
+
+        recalculados = 0
+        no_convergidos = 0
+        for regimen in sorted(regimenes):
+            if regimen == REGIMEN_UDIS and valor_udi is None:
+                valor_udi = _valor_udi_activo(fecha)
+            huella_regulatoria = _huella(parametros_regulatorios(regimen, valor_udi))
+
+            ultimo = ""
+            while True:
+                # Paginación por identificador: los créditos ya guardados dejan de ser pendientes
+                filas = self._conexion.execute(
+                    f"SELECT id, producto, tipo_tarjeta, {', '.join(PARAMETROS)}, huella FROM creditos "
+                    "WHERE regimen = ? AND id > ? "
+                    "AND (huella_calculada IS NOT huella OR huella_regulatoria IS NOT ?) "
+                    "ORDER BY id LIMIT ?",
+                    (regimen, ultimo, huella_regulatoria, tamano_bloque),
+                ).fetchall()
+                if not filas:
+                    break
+                ultimo = filas[-1][0]
+
+                ids, productos, tipos, *parametros, huellas = zip(*filas)
+                columnas = {nombre: np.array(valores, dtype=float) for nombre, valores in zip(PARAMETROS, parametros)}
+                if regimen == REGIMEN_UDIS:
+                    montos = [MONTOS_UDIS.get(tipo, MONTOS_UDIS["clasica"]) for tipo in tipos]
+                    columnas["monto_linea_credito"] = np.array(montos, dtype=float) * valor_udi
+                resultado = calcular_cat_productos(np.array(productos), columnas)
+
+                with self._conexion:
+                    self._conexion.executemany(
+                        "UPDATE creditos SET cat = ?, iteraciones = ?, convergido = ?, huella_calculada = ?, "
+                        "huella_regulatoria = ?, fecha_calculo = ? WHERE id = ?",
+                        zip(resultado.cat.tolist(), resultado.iteraciones.tolist(),
+                            resultado.convergido.astype(int).tolist(), huellas,
+                            [huella_regulatoria] * len(ids), [fecha_calculo] * len(ids), ids),
+                    )
+
+                recalculados += len(ids)
+                no_convergidos += int(np.count_nonzero(~resultado.convergido))
+                if progreso is not None:
+                    progreso(recalculados, time.perf_counter() - inicio)
+
+        return ResumenRecalculo(sum(regimenes.values()), recalculados, no_convergidos,
+                                time.perf_counter() - inicio)
+
+    def consultar(self, id_credito):
+        """
+        Obtiene el último CAT calculado de un crédito.
+
+        Args:
+            id_credito (str): Identificador del crédito
+
+        Returns:
+            tuple: (cat, iteraciones, convergido, fecha de cálculo), o None si el
+            crédito no existe o no se ha calculado
+        """
+        fila = self._conexion.execute(
+            "SELECT cat, iteraciones, convergido, fecha_calculo FROM creditos "
+            "WHERE id = ? AND huella_calculada IS NOT NULL",
+            (str(id_credito),),
+        ).fetchone()
+        if fila is None:
+            return None
+        cat, iteraciones, convergido, fecha_calculo = fila
+        return (math.nan if cat is None else cat), iteraciones, bool(convergido), fecha_calculo
+
+    def __len__(self):
+        return self._conexion.execute("SELECT COUNT(*) FROM creditos").fetchone()[0]
+
+    def cerrar(self):
+        """Cierra el archivo de la cartera."""
+        self._conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excinfo):
+        self.cerrar()
+
+
+def huella_credito(producto, tipo_tarjeta, parametros):
+    """
+    Calcula la huella de los parámetros que determinan el CAT de un crédito.
+
+    Args:
+        producto (str): Producto del crédito
+        tipo_tarjeta (str): Tipo de tarjeta, o None si el crédito no se registra por tipo
+        parametros (list): Valores de `PARAMETROS` (None en los que no son del producto)
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    texto = repr((producto, tipo_tarjeta, tuple(parametros)))
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def parametros_regulatorios(regimen, valor_udi=None):
+    """
+    Parámetros regulatorios de los que depende el CAT de un régimen.
+
+    Args:
+        regimen (str): Producto, o `REGIMEN_UDIS` para tarjetas registradas por tipo
+        valor_udi (float, opcional): Valor de la UDI (sólo para `REGIMEN_UDIS`)
+
+    Returns:
+        dict: Parámetros regulatorios
+    """
+    parametros = {"version": VERSION_CALCULO, "regimen": regimen}
+    if regimen in ("revolvente", REGIMEN_UDIS):
+        parametros["plazo_meses"] = PLAZO_MESES
+    if regimen == REGIMEN_UDIS:
+        parametros["montos_udis"] = MONTOS_UDIS
+        parametros["valor_udi"] = valor_udi
+    return parametros
+
+
+def _parametros_credito(producto, tipo_tarjeta, fila):
+    """
+    Valores de `PARAMETROS` de un crédito: None en los que no son de su
+    producto y el valor por omisión en los opcionales faltantes (NaN).
+    """
+    parametros = [None] * len(PARAMETROS)
+    for posicion, valor_omision in _POSICIONES_PRODUCTO.get(producto, ()):
+        valor = fila[posicion]
+        parametros[posicion] = valor if not math.isnan(valor) else valor_omision
+    if tipo_tarjeta is not None:
+        # La línea de las tarjetas registradas por tipo sale de la UDI
+        parametros[PARAMETROS.index("monto_linea_credito")] = None
+    return parametros
+
+
+def _parametro_faltante(producto, tipo_tarjeta, fila):
+    """
+    Primer parámetro obligatorio del producto sin valor (NaN) en `fila`, o None
+    si están todos; la línea de las tarjetas registradas por tipo no se pide.
+    """
+    for posicion, valor_omision in _POSICIONES_PRODUCTO[producto]:
+        if valor_omision is None and math.isnan(fila[posicion]):
+            nombre = PARAMETROS[posicion]
+            if not (tipo_tarjeta is not None and nombre == "monto_linea_credito"):
+                return nombre
+    return None
+
+
+def _huella(valor):
+    """Huella hexadecimal de un valor serializable en JSON."""
+    texto = json.dumps(valor, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _valor_udi_activo(fecha):
+    """Último valor de la UDI de la serie activa publicado en una fecha o antes de ella."""
+    serie = serie_udi_activa()
+    if serie is None:
+        raise ValueError("Hay tarjetas registradas por tipo y no hay una serie de la UDI cargada "
+                         "(calculo_cat.udi.usar_serie_udi) ni un valor de la UDI")
+    return serie.valor_vigente(fecha)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Distribución del CAT de Créditos a Tasa Variable
+
+En un crédito a tasa variable (caso 3.2 de docs/casos_uso_cat.md y §3.3 de
+docs/algoritmos_calculo_cat.md) el CAT depende de la trayectoria futura de la
+tasa. Este módulo calcula el CAT de muchos escenarios de tasa a la vez:
+
+    1. Cada trayectoria da la tasa de interés anual de cada mes, ya sea
+       proporcionada como arreglo o generada por un modelo estocástico con
+       semilla (`ModeloVasicek`).
+    2. La amortización se reconstruye para todas las trayectorias de un bloque
+       en una matriz (trayectorias × periodos): cada mes el saldo insoluto se
+       vuelve a amortizar en los meses restantes con la tasa vigente, como en
+       `flujos.pagos_por_tramos`.
+    3. La TIR de todas las trayectorias del bloque se resuelve en una sola
+       solución vectorizada con `calcular_tir_matriz`.
+
+Las trayectorias se procesan por bloques de tamaño fijo, por lo que la memoria
+no depende del número de escenarios. Con un modelo, las trayectorias se generan
+bloque por bloque de un mismo generador, de modo que la distribución no cambia
+con el tamaño de bloque.
+
+Ejemplo:
+    >>> modelo = ModeloVasicek(tasa_inicial=0.11, media=0.09, velocidad=0.3, volatilidad=0.015)
+    >>> distribucion = simular_cat_tasa_variable(2_000_000, 360, modelo, n_trayectorias=10_000,
+    ...                                          comision_apertura=20_000, seguro=600, semilla=7)
+    >>> distribucion.media, distribucion.percentiles[95]
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from calculo_cat.lote import _factor_pago, calcular_tir_matriz
+from calculo_cat.solver import anualizar_tasa
+
+
+# Trayectorias por bloque (un bloque de 360 meses ocupa unos 6 MB por matriz)
+TAMANO_BLOQUE = 2_000
+
+# Percentiles reportados por omisión
+PERCENTILES = (5, 25, 50, 75, 95)
+
+DistribucionCAT = namedtuple(
+    "DistribucionCAT",
+    ["cat", "media", "desviacion", "percentiles", "iteraciones", "convergido"],
+)
+DistribucionCAT.__doc__ = """
+Distribución del CAT sobre los escenarios de tasa.
+
+Las estadísticas sólo consideran las trayectorias cuyo cálculo convergió.
+
+Atributos:
+    cat (numpy.ndarray): CAT de cada trayectoria expresado como porcentaje anual
+                  (NaN si no convergió)
+    media (float): CAT promedio
+    desviacion (float): Desviación estándar del CAT
+    percentiles (dict): CAT por percentil (ej: {5: 11.8, 50: 12.9, 95: 14.6})
+    iteraciones (numpy.ndarray): Iteraciones de Newton-Raphson por trayectoria
+    convergido (numpy.ndarray): Indica si el método convergió para cada trayectoria
+"""
+
+
+class ModeloVasicek:
+    """
+    Modelo de Vasicek para la tasa de interés anual del crédito: la tasa
+    revierte a una media de largo plazo con volatilidad constante,
+
+        dr = velocidad · (media - r) dt + volatilidad · dW.
+
+    La tasa se revisa cada `meses_revision` meses con la discretización exacta
+    del modelo y se mantiene fija entre revisiones; nunca baja de `tasa_minima`.
+    """
+
+    def __init__(self, tasa_inicial, media, velocidad, volatilidad, meses_revision=1, tasa_minima=0.0):
+        """
+        Args:
+            tasa_inicial (float): Tasa de interés anual del primer periodo (en decimal)
+            media (float): Tasa de largo plazo (en decimal)
+            velocidad (float): Velocidad anual de reversión a la media
+            volatilidad (float): Volatilidad anual de la tasa (en decimal)
+            meses_revision (int, opcional): Meses entre revisiones de la tasa
+            tasa_minima (float, opcional): Tasa mínima (en decimal)
+        """
+        self.tasa_inicial = tasa_inicial
+        self.media = media
+        self.velocidad = velocidad
+        self.volatilidad = volatilidad
+        self.meses_revision = meses_revision
+        self.tasa_minima = tasa_minima
+
+    def trayectorias(self, n, meses, generador):
+        """
+        Genera trayectorias de la tasa de interés anual.
+
+        Args:
+            n (int): Número de trayectorias
+            meses (int): Meses de cada trayectoria
+            generador (numpy.random.Generator): Generador de números aleatorios
+
+        Returns:
+            numpy.ndarray: Matriz (n × meses) de tasas de interés anuales
+        """
+        revisiones = math.ceil(meses / self.meses_revision)
+        dt = self.meses_revision / 12
+
+        # Discretización exacta del proceso de Ornstein-Uhlenbeck
+        if self.velocidad > 0:
+            persistencia = math.exp(-self.velocidad * dt)
+            desviacion = self.volatilidad * math.sqrt((1 - persistencia ** 2) / (2 * self.velocidad))
+        else:
+            persistencia = 1.0
+            desviacion = self.volatilidad * math.sqrt(dt)
+
+        choques = generador.standard_normal((n, revisiones - 1))
+        tasas = np.empty((n, revisiones))
+        tasas[:, 0] = self.tasa_inicial
+        for revision in range(1, revisiones):
+            tasas[:, revision] = (self.media + (tasas[:, revision - 1] - self.media) * persistencia
+                                  + desviacion * choques[:, revision - 1])
+        np.maximum(tasas, self.tasa_minima, out=tasas)
+
+        return np.repeat(tasas, self.meses_revision, axis=1)[:, :meses]
+
+
+def simular_cat_tasa_variable(monto_credito, plazo_meses, trayectorias, n_trayectorias=None,
+                              comision_apertura=0, comisiones_mensuales=0, seguro=0, otros_costos=0,
+                              semilla=None, percentiles=PERCENTILES, tamano_bloque=TAMANO_BLOQUE,
+                              tolerancia=1e-10, max_iteraciones=1000):
+    """
+    Calcula la distribución del CAT de un crédito a tasa variable.
+
+    Los cargos tienen la misma semántica que en
+    `prestamo_personal_basico.calcular_cat`; el pago de capital e intereses de
+    cada mes amortiza el saldo insoluto en los meses restantes con la tasa del mes.
+
+    Args:
+        monto_credito (float): Monto del crédito en pesos
+        plazo_meses (int): Plazo del crédito en meses
+        trayectorias (numpy.ndarray o ModeloVasicek): Matriz (trayectorias × meses)
+                      de tasas de interés anuales (en decimal), o un modelo con un
+                      método `trayectorias(n, meses, generador)`
+        n_trayectorias (int, opcional): Número de trayectorias a generar con el modelo
+        comision_apertura (float, opcional): Comisión por apertura (en pesos)
+        comisiones_mensuales (float, opcional): Comisiones mensuales fijas (en pesos)
+        seguro (float, opcional): Costo del seguro mensual (en pesos)
+        otros_costos (float, opcional): Otros costos iniciales (en pesos)
+        semilla (int, opcional): Semilla del generador de números aleatorios
+        percentiles (tuple, opcional): Percentiles a reportar
+        tamano_bloque (int, opcional): Trayectorias por bloque
+        tolerancia (float, opcional): Tolerancia para la convergencia del método
+        max_iteraciones (int, opcional): Número máximo de iteraciones
+
+    Returns:
+        DistribucionCAT: CAT por trayectoria, media, desviación estándar y percentiles
+    """
+    plazo_meses = int(plazo_meses)
+    if isinstance(trayectorias, (np.ndarray, list, tuple)):
+        tasas = np.atleast_2d(np.asarray(trayectorias, dtype=float))
+        if tasas.shape[1] < plazo_meses:
+            raise ValueError(f"Las trayectorias tienen {tasas.shape[1]} meses y el plazo es de {plazo_meses}")
+        n_trayectorias = tasas.shape[0]
+
+        def bloque_tasas(inicio, n):
+            return tasas[inicio:inicio + n, :plazo_meses]
+    else:
+        if n_trayectorias is None:
+            raise ValueError("Indica n_trayectorias para generar las trayectorias con el modelo")
+        generador = np.random.default_rng(semilla)
+
+        def bloque_tasas(inicio, n):
+            return trayectorias.trayectorias(n, plazo_meses, generador)
+
+    cat = np.empty(n_trayectorias)
+    iteraciones = np.empty(n_trayectorias, dtype=np.int64)
+    convergido = np.empty(n_trayectorias, dtype=bool)
+
+    for inicio in range(0, n_trayectorias, tamano_bloque):
+        n = min(tamano_bloque, n_trayectorias - inicio)
+        tasas_bloque = bloque_tasas(inicio, n)
+        flujos = flujos_tasa_variable(monto_credito, tasas_bloque, comision_apertura,
+                                      comisiones_mensuales, seguro, otros_costos)
+
+        # La tasa promedio de cada trayectoria es un punto de partida cercano a la TIR
+        tasa, iteraciones[inicio:inicio + n], convergido[inicio:inicio + n] = calcular_tir_matriz(
+            flujos, tasa_inicial=tasas_bloque.mean(axis=1) / 12,
+            tolerancia=tolerancia, max_iteraciones=max_iteraciones)
+        cat[inicio:inicio + n] = anualizar_tasa(tasa)  # CAT efectivo anual (porcentaje)
+
+    cat[~convergido] = np.nan
+    validos = cat[convergido]
+    if validos.size == 0:
+        return DistribucionCAT(cat, math.nan, math.nan, {p: math.nan for p in percentiles},
+                               iteraciones, convergido)
+    return DistribucionCAT(
+        cat, float(validos.mean()), float(validos.std()),
+        dict(zip(percentiles, np.percentile(validos, percentiles).tolist())),
+        iteraciones, convergido,
+    )
+
+
+def flujos_tasa_variable(monto_credito, tasas, comision_apertura=0, comisiones_mensuales=0,
+                         seguro=0, otros_costos=0):
+    """
+    Construye los flujos de un crédito para varias trayectorias de tasa.
+
+    Cada mes el pago amortiza el saldo insoluto en los meses restantes con la
+    tasa del mes, por lo que el pago sólo cambia cuando cambia la tasa.
+
+    Args:
+        monto_credito (float): Monto del crédito en pesos
+        tasas (numpy.ndarray): Matriz (trayectorias × meses) de tasas de interés anuales
+        comision_apertura (float, opcional): Comisión por apertura (en pesos)
+        comisiones_mensuales (float, opcional): Comisiones mensuales fijas (en pesos)
+        seguro (float, opcional): Costo del seguro mensual (en pesos)
+        otros_costos (float, opcional): Otros costos iniciales (en pesos)
+
+    Returns:
+        numpy.ndarray: Matriz (trayectorias × (meses + 1)) de flujos de efectivo
+        desde la perspectiva de la institución
+    """
+    tasas = np.atleast_2d(tasas)
+    n, plazo_meses = tasas.shape
+
+    flujos = np.empty((n, plazo_meses + 1))
+    flujos[:, 0] = -(monto_credito - comision_apertura - otros_costos)
+
+    saldo = np.full(n, float(monto_credito))
+    for mes in range(plazo_meses):
+        tasa_mensual = tasas[:, mes] / 12
+        pago_mensual = saldo * _factor_pago(tasa_mensual, plazo_meses - mes)
+        flujos[:, mes + 1] = pago_mensual
+        saldo = saldo * (1 + tasa_mensual) - pago_mensual
+
+    flujos[:, 1:] += comisiones_mensuales + seguro
+    return flujos
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Esquema de Flujos Incremental
+
+Este módulo implementa `EsquemaFlujos`, un esquema de flujos mutable para
+simuladores interactivos: cada cambio a una cotización (un mes más, otra prima
+de seguro, una comisión extra en el mes 13) modifica sólo los componentes
+afectados en lugar de reconstruir la lista de flujos y resolver desde cero.
+
+El esquema se compone de componentes con nombre; cada uno es un monto que se
+repite en los periodos `inicio` a `fin` (un flujo individual es un componente
+con `inicio == fin`). Los flujos totales por periodo se guardan en un arreglo
+de NumPy.
+
+Para la última tasa evaluada se guardan el VPN y su derivada. Cuando cambia un
+componente, ambos se actualizan con la fórmula cerrada de ese componente
+(`FlujosSegmentados`), en tiempo constante sin importar cuántos periodos
+abarca; en otra tasa, el VPN se evalúa componente por componente, sin recorrer
+los periodos. Al resolver, el método parte de la TIR anterior, que después de
+un cambio pequeño suele estar a una o dos iteraciones de la nueva.
+
+Los periodos del esquema son mensuales por omisión; con otra periodicidad
+(`periodicidad`, pagos por año) los montos de los componentes son por periodo
+de pago y el CAT se anualiza con ese número de periodos.
+"""
+
+import numpy as np
+
+from calculo_cat.flujos import FlujosSegmentados
+from calculo_cat.lote import _factor_pago
+from calculo_cat.solver import anualizar_tasa, calcular_tir
+
+
+_CAPACIDAD_INICIAL = 64
+
+
+class EsquemaFlujos:
+    """
+    Esquema de flujos mutable con VPN incremental.
+
+    Ejemplo:
+        >>> esquema = EsquemaFlujos.desde_prestamo(2_000_000, 240, 0.11, comision_apertura=20_000)
+        >>> esquema.calcular_cat()
+        >>> esquema.cambiar_monto("seguro", 850)
+        >>> esquema.definir("comision_mes_13", 1_500, 13)
+        >>> esquema.calcular_cat()   # parte de la TIR anterior
+    """
+
+    def __init__(self, tasa_inicial=0.01, periodicidad=12):
+        """
+        Args:
+            tasa_inicial (float, opcional): Estimación inicial de la TIR por periodo
+            periodicidad (int, opcional): Periodos por año
+        """
+        self.tasa = tasa_inicial
+        self.periodicidad = periodicidad
+        self._componentes = {}
+        self._montos = np.zeros(_CAPACIDAD_INICIAL)
+        self._periodos = 0
+        self._prestamo = None
+
+        # Componentes como segmentos, reconstruidos sólo cuando cambian
+        self._segmentos = None
+
+        # VPN y derivada en la última tasa evaluada
+        self._tasa_cache = None
+        self._vpn = 0.0
+        self._derivada = 0.0
+
+    @classmethod
+    def desde_prestamo(cls, monto_credito, plazo_meses, tasa_interes_anual, comision_apertura=0,
+                       comisiones_mensuales=0, seguro=0, otros_costos=0, periodicidad=12):
+        """
+        Crea el esquema de un préstamo con pagos fijos periódicos, con la misma
+        semántica que `prestamo_personal_basico.calcular_cat`.
+
+        Los componentes son "disposicion", "comision_apertura" y "otros_costos" en el
+        periodo 0, y "pago", "comisiones_mensuales" y "seguro" en los periodos 1 a
+        plazo_meses · periodicidad / 12; las comisiones mensuales y el seguro se
+        prorratean por periodo de pago.
+        """
+        esquema = cls(tasa_inicial=tasa_interes_anual / periodicidad, periodicidad=periodicidad)
+        esquema._prestamo = {"monto_credito": monto_credito, "tasa_interes_anual": tasa_interes_anual}
+
+        periodos = esquema._periodos_plazo(plazo_meses)
+        esquema.definir("disposicion", -monto_credito, 0)
+        esquema.definir("comision_apertura", comision_apertura, 0)
+        esquema.definir("otros_costos", otros_costos, 0)
+        esquema.definir("pago", esquema._pago(periodos), 1, periodos)
+        esquema.definir("comisiones_mensuales", comisiones_mensuales * (12 / periodicidad), 1, periodos)
+        esquema.definir("seguro", seguro * (12 / periodicidad), 1, periodos)
+        return esquema
+
+    @property
+    def num_periodos(self):
+        """int: Último periodo con flujos."""
+        return max(self._periodos - 1, 0)
+
+    @property
+    def montos(self):
+        """numpy.ndarray: Flujo total de cada periodo (vista de sólo lectura)."""
+        montos = self._montos[:self._periodos]
+        montos.flags.writeable = False
+        return montos
+
+    @property
+    def componentes(self):
+        """dict: Componentes por nombre como (monto, inicio, fin)."""
+        return dict(self._componentes)
+
+    def __len__(self):
+        return self._periodos
+
+    def __repr__(self):
+        return f"EsquemaFlujos(periodos={self._periodos}, componentes={len(self._componentes)})"
+
+    def definir(self, nombre, monto, inicio, fin=None):
+        """
+        Define o reemplaza un componente del esquema.
+
+        Args:
+            nombre (str): Nombre del componente
+            monto (float): Monto en cada periodo (positivo para ingresos de la institución)
+            inicio (int): Primer periodo
+            fin (int, opcional): Último periodo (inclusive); por omisión, `inicio`
+        """
+        fin = inicio if fin is None else fin
+        if inicio < 0 or fin < inicio:
+            raise ValueError(f"Periodos inválidos para '{nombre}': {inicio} a {fin}")
+
+        anterior = self._componentes.get(nombre)
+        self._componentes[nombre] = (monto, inicio, fin)
+        self._segmentos = None
+        if anterior is not None and anterior[1:] == (inicio, fin):
+            # Mismos periodos: basta con aplicar la diferencia de montos
+            self._aplicar(monto - anterior[0], inicio, fin)
+            return
+        if anterior is not None:
+            self._aplicar(-anterior[0], anterior[1], anterior[2])
+        self._aplicar(monto, inicio, fin)
+        self._ajustar_periodos()
+
+    def cambiar_monto(self, nombre, monto):
+        """Cambia el monto de un componente existente sin cambiar sus periodos."""
+        _, inicio, fin = self._obtener(nombre)
+        self.definir(nombre, monto, inicio, fin)
+
+    def cambiar_periodos(self, nombre, inicio, fin=None):
+        """Cambia los periodos de un componente existente sin cambiar su monto."""
+        monto, _, _ = self._obtener(nombre)
+        self.definir(nombre, monto, inicio, fin)
+
+    def quitar(self, nombre):
+        """Quita un componente del esquema."""
+        monto, inicio, fin = self._obtener(nombre)
+        del self._componentes[nombre]
+        self._segmentos = None
+        self._aplicar(-monto, inicio, fin)
+        self._ajustar_periodos()
+
+    def cambiar_plazo(self, plazo_meses):
+        """
+        Cambia el plazo de un esquema creado con `desde_prestamo`: recalcula el
+        pago fijo y extiende o recorta los componentes periódicos.
+        """
+        if self._prestamo is None:
+            raise ValueError("cambiar_plazo sólo aplica a esquemas creados con desde_prestamo")
+        periodos = self._periodos_plazo(plazo_meses)
+        self.definir("pago", self._pago(periodos), 1, periodos)
+        for nombre in ("comisiones_mensuales", "seguro"):
+            if nombre in self._componentes:
+                self.cambiar_periodos(nombre, 1, periodos)
+
+    def vpn_y_derivada(self, tasa):
+        """
+        Calcula el VPN y su derivada respecto a la tasa.
+
+        En la tasa guardada el resultado sale del estado incremental; en otra
+        tasa se evalúa componente por componente y queda guardado para los
+        siguientes cambios.
+
+        Args:
+            tasa (float): Tasa de descuento por periodo
+
+        Returns:
+            tuple: (vpn, derivada)
+        """
+        if tasa != self._tasa_cache:
+            if self._segmentos is None:
+                self._segmentos = FlujosSegmentados(
+                    [(inicio, fin - inicio + 1, monto) for monto, inicio, fin in self._componentes.values()])
+            self._vpn, self._derivada = self._segmentos.vpn_y_derivada(tasa)
+            self._tasa_cache = tasa
+        return self._vpn, self._derivada
+
+    def vpn(self, tasa):
+        """Calcula el VPN a una tasa dada."""
+        return self.vpn_y_derivada(tasa)[0]
+
+    def a_lista(self):
+        """Devuelve los flujos como una lista con un elemento por periodo."""
+        return self._montos[:self._periodos].tolist()
+
+    def resolver(self, tolerancia=1e-10, max_iteraciones=1000):
+        """
+        Calcula la TIR por periodo partiendo de la TIR anterior.
+
+        Returns:
+            float: TIR por periodo expresada como decimal
+        """
+        self.tasa = calcular_tir(self, tasa_inicial=self.tasa, tolerancia=tolerancia,
+                                 max_iteraciones=max_iteraciones)
+        # Guardar el VPN en la TIR para actualizarlo con los siguientes cambios
+        self.vpn_y_derivada(self.tasa)
+        return self.tasa
+
+    def calcular_cat(self, tolerancia=1e-10, max_iteraciones=1000):
+        """
+        Calcula el CAT partiendo de la TIR anterior.
+
+        Returns:
+            float: CAT efectivo anual expresado como porcentaje
+        """
+        return anualizar_tasa(self.resolver(tolerancia, max_iteraciones), self.periodicidad)
+
+    def _periodos_plazo(self, plazo_meses):
+        """Número de pagos de un plazo en meses con la periodicidad del esquema."""
+        return round(plazo_meses * self.periodicidad / 12)
+
+    def _pago(self, periodos):
+        """Pago fijo por periodo del préstamo de `desde_prestamo` para un número de pagos."""
+        tasa_periodo = self._prestamo["tasa_interes_anual"] / self.periodicidad
+        return float(self._prestamo["monto_credito"] * _factor_pago(np.float64(tasa_periodo), periodos))
+
+    def _obtener(self, nombre):
+        if nombre not in self._componentes:
+            raise KeyError(f"No existe el componente '{nombre}'")
+        return self._componentes[nombre]
+
+    def _aplicar(self, delta, inicio, fin):
+        """Suma un monto en los periodos `inicio` a `fin` a los flujos y al VPN guardado."""
+        if delta == 0:
+            return
+        if fin >= self._montos.size:
+            self._crecer(fin + 1)
+
+        self._montos[inicio:fin + 1] += delta
+        if self._tasa_cache is not None:
+            vpn, derivada = FlujosSegmentados([(inicio, fin - inicio + 1, delta)]).vpn_y_derivada(
+                self._tasa_cache)
+            self._vpn += vpn
+            self._derivada += derivada
+
+    def _ajustar_periodos(self):
+        """Actualiza el número de periodos y limpia los flujos que quedaron fuera."""
+        periodos = max((fin + 1 for _, _, fin in self._componentes.values()), default=0)
+        if periodos < self._periodos:
+            self._montos[periodos:self._periodos] = 0.0
+        self._periodos = periodos
+
+    def _crecer(self, tamano):
+        """Duplica la capacidad del arreglo de flujos hasta alcanzar `tamano` periodos."""
+        capacidad = self._montos.size
+        while capacidad < tamano:
+            capacidad *= 2
+        montos = np.zeros(capacidad)
+        montos[:self._montos.size] = self._montos
+        self._montos = montos
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculo del CAT con Fechas Exactas
+
+Este módulo resuelve la ecuación del CAT con flujos en fechas reales
+(`docs/algoritmos_calculo_cat.md` §1.1):
+
+    VPN = Σ Fᵢ / (1 + CAT)^tᵢ = 0
+
+donde tᵢ es el tiempo en años, por días exactos, desde la primera fecha del
+calendario. A diferencia del cálculo por periodos iguales, que resuelve la TIR
+por periodo y la anualiza con (1 + r)^k - 1 (§1.2), aquí el resultado es
+directamente la tasa efectiva anual, sin suponer periodos de igual duración.
+
+Las fracciones de año de un calendario se calculan una sola vez, y los factores
+de descuento se evalúan en forma vectorizada como exp(-t·log1p(CAT)). Un lote
+de créditos que comparte el mismo calendario de fechas se resuelve como una
+matriz (créditos × fechas) con Newton-Raphson en paralelo; los créditos que
+empiezan después de la primera fecha simplemente tienen flujos en cero al
+inicio, ya que desplazar todas las fechas no cambia la raíz.
+"""
+
+import calendar
+from collections import namedtuple
+
+import numpy as np
+
+from calculo_cat.lote import _newton_lote
+
+
+# Días por año para convertir días exactos en fracciones de año
+BASE_DIAS = 365
+
+ResultadoFechas = namedtuple("ResultadoFechas", ["cat", "iteraciones", "convergido"])
+ResultadoFechas.__doc__ = """
+Resultado del cálculo del CAT con fechas exactas.
+
+Atributos:
+    cat (numpy.ndarray): CAT efectivo anual de cada crédito expresado como porcentaje
+                  (NaN si el método no convergió)
+    iteraciones (numpy.ndarray): Iteraciones de Newton-Raphson usadas por crédito
+    convergido (numpy.ndarray): Indica si el método convergió para cada crédito
+"""
+
+
+def fracciones_anio(fechas, fecha_inicial=None, base_dias=BASE_DIAS):
+    """
+    Convierte fechas en años transcurridos desde una fecha inicial.
+
+    Args:
+        fechas (array_like): Fechas (`datetime.date`, `numpy.datetime64` o texto ISO)
+        fecha_inicial (fecha, opcional): Fecha de referencia; por omisión, la más antigua
+        base_dias (int, opcional): Días por año
+
+    Returns:
+        numpy.ndarray: Años transcurridos hasta cada fecha
+    """
+    fechas = np.asarray(fechas, dtype="datetime64[D]")
+    if fecha_inicial is None:
+        fecha_inicial = fechas.min()
+    dias = (fechas - np.datetime64(fecha_inicial, "D")).astype(np.int64)
+    return dias / base_dias
+
+
+def fechas_mensuales(fecha_inicial, plazo_meses):
+    """
+    Genera las fechas de un calendario mensual: la fecha inicial y un pago en el
+    mismo día de cada mes siguiente (o el último día del mes si no existe).
+
+    Args:
+        fecha_inicial (fecha): Fecha de disposición del crédito
+        plazo_meses (int): Número de pagos mensuales
+
+    Returns:
+        numpy.ndarray: `plazo_meses + 1` fechas como `datetime64[D]`
+    """
+    inicio = np.datetime64(fecha_inicial, "D")
+    dia = int((inicio - np.datetime64(inicio, "M")).astype(np.int64)) + 1
+    meses = np.datetime64(inicio, "M") + np.arange(plazo_meses + 1)
+
+    fechas = []
+    for mes in meses.tolist():
+        ultimo_dia = calendar.monthrange(mes.year, mes.month)[1]
+        fechas.append(mes.replace(day=min(dia, ultimo_dia)))
+    return np.array(fechas, dtype="datetime64[D]")
+
+
+class CalendarioFlujos:
+    """
+    Calendario de fechas compartido por uno o varios créditos, con las
+    fracciones de año precalculadas.
+
+    Ejemplo:
+        >>> calendario = CalendarioFlujos(fechas_mensuales("2024-01-15", 24))
+        >>> flujos = np.full(25, 2642.74)
+        >>> flujos[0] = -49000
+        >>> calendario.calcular_cat(flujos).cat
+    """
+
+    def __init__(self, fechas, base_dias=BASE_DIAS):
+        """
+        Args:
+            fechas (array_like): Fechas de los flujos
+            base_dias (int, opcional): Días por año
+        """
+        self.fechas = np.asarray(fechas, dtype="datetime64[D]")
+        self.tiempos = fracciones_anio(self.fechas, base_dias=base_dias)
+
+    def __len__(self):
+        return self.tiempos.size
+
+    def vpn_y_derivada(self, flujos, cat):
+        """
+        Evalúa el VPN y su derivada respecto al CAT.
+
+        Args:
+            flujos (numpy.ndarray): Flujos de un crédito (fechas,) o de un lote
+                          (créditos × fechas)
+            cat (float o numpy.ndarray): CAT efectivo anual en decimal, uno por crédito
+
+        Returns:
+            tuple: (vpn, derivada)
+        """
+        flujos = np.asarray(flujos, dtype=float)
+        cat = np.asarray(cat, dtype=float)
+        descuento = np.exp(-np.multiply.outer(np.log1p(cat), self.tiempos))  # (1+CAT)^-t
+        vpn = (flujos * descuento).sum(axis=-1)
+        derivada = -(flujos * self.tiempos * descuento).sum(axis=-1) / (1 + cat)
+        return vpn, derivada
+
+    def calcular_cat(self, flujos, tasa_inicial=None, tolerancia=1e-10, max_iteraciones=1000):
+        """
+        Calcula el CAT efectivo anual de uno o varios créditos con este calendario.
+
+        Args:
+            flujos (array_like): Flujos de un crédito (fechas,) o de un lote
+                          (créditos × fechas), con la convención de signos de la
+                          institución (monto otorgado negativo, pagos positivos)
+            tasa_inicial (float o array_like, opcional): Estimación inicial del CAT
+                          en decimal; por omisión se estima a partir de los flujos
+            tolerancia (float, opcional): Tolerancia para la convergencia del método
+            max_iteraciones (int, opcional): Número máximo de iteraciones
+
+        Returns:
+            ResultadoFechas: CAT, iteraciones y convergencia; el CAT de los
+            créditos que no convergieron es NaN, y cada campo es escalar
+            (arreglo de dimensión cero) si `flujos` es de un solo crédito
+        """
+        flujos = np.asarray(flujos, dtype=float)
+        if flujos.shape[-1] != self.tiempos.size:
+            raise ValueError(f"Se esperaban {self.tiempos.size} flujos por crédito, "
+                             f"se recibieron {flujos.shape[-1]}")
+        forma = flujos.shape[:-1]
+        matriz = flujos.reshape(-1, self.tiempos.size)
+
+        if tasa_inicial is None:
+            tasa = self._estimar_cat(matriz)
+        else:
+            tasa = np.array(np.broadcast_to(np.asarray(tasa_inicial, dtype=float), forma),
+                            dtype=float).ravel()
+
+        # Productos flujo × tiempo: no dependen del CAT, se calculan una sola vez
+        flujos_tiempo = matriz * self.tiempos
+
+        def evaluar(activos, cat):
+            descuento = np.exp(-np.multiply.outer(np.log1p(cat), self.tiempos))
+            vpn = np.einsum("ij,ij->i", matriz[activos], descuento)
+            derivada = -np.einsum("ij,ij->i", flujos_tiempo[activos], descuento) / (1 + cat)
+            return vpn, derivada
+
+        iteraciones, convergido = _newton_lote(evaluar, tasa, tolerancia, max_iteraciones)
+
+        # La última aproximación de un crédito que no convergió no es un CAT
+        tasa = np.where(convergido, tasa, np.nan)
+
+        return ResultadoFechas(
+            (tasa * 100).reshape(forma),  # Convertir a porcentaje anual
+            iteraciones.reshape(forma),
+            convergido.reshape(forma),
+        )
+
+    def _estimar_cat(self, flujos):
+        """
+        Estima el CAT inicial de cada crédito como el rendimiento compuesto de
+        los pagos sobre lo otorgado, entre los tiempos promedio de ambos.
+        """
+        positivos = np.where(flujos > 0, flujos, 0)
+        negativos = np.where(flujos < 0, -flujos, 0)
+        recibido = positivos.sum(axis=1)
+        otorgado = negativos.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            duracion = positivos @ self.tiempos / recibido - negativos @ self.tiempos / otorgado
+            estimacion = np.power(recibido / otorgado, 1 / duracion) - 1
+        return np.where(np.isfinite(estimacion), np.clip(estimacion, -0.9, 10.0), 0.1)
+
+
+def calcular_cat_fechas(flujos, base_dias=BASE_DIAS, tolerancia=1e-10, max_iteraciones=1000):
+    """
+    Calcula el CAT efectivo anual de un crédito con flujos en fechas exactas.
+
+    Los flujos de una misma fecha se suman.
+
+    Args:
+        flujos (list): Pares (fecha, monto) con la convención de signos de la
+                      institución (monto otorgado negativo, pagos positivos)
+        base_dias (int, opcional): Días por año
+        tolerancia (float, opcional): Tolerancia para la convergencia del método
+        max_iteraciones (int, opcional): Número máximo de iteraciones
+
+    Returns:
+        float: CAT efectivo anual expresado como porcentaje, o NaN si el método
+        no convergió
+    """
+    fechas, montos = zip(*flujos)
+    fechas, posiciones = np.unique(np.asarray(fechas, dtype="datetime64[D]"), return_inverse=True)
+    totales = np.zeros(fechas.size)
+    np.add.at(totales, posiciones.ravel(), np.asarray(montos, dtype=float))
+
+    resultado = CalendarioFlujos(fechas, base_dias).calcular_cat(
+        totales, tolerancia=tolerancia, max_iteraciones=max_iteraciones)
+    return float(resultado.cat)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Flujos de Efectivo por Segmentos
+
+Este módulo implementa una representación compacta de los flujos de efectivo
+de un crédito. En lugar de guardar un elemento por periodo, los pagos iguales
+consecutivos se guardan como segmentos (inicio, longitud, monto), y el VPN y
+su derivada se evalúan por segmento con la fórmula cerrada de la serie
+geométrica. Así, una hipoteca a 30 años cuesta lo mismo por iteración que un
+préstamo a 12 meses.
+
+Los segmentos pueden traslaparse: el flujo de un periodo es la suma de los
+montos de todos los segmentos que lo cubren (por ejemplo, pagos de capital e
+intereses más comisiones y seguros).
+"""
+
+import math
+
+# Por debajo de esta tasa se usa la expansión en serie de la suma geométrica
+_TASA_MINIMA_SERIE = 1e-8
+
+
+class FlujosSegmentados:
+    """
+    Flujos de efectivo almacenados como segmentos de pagos iguales.
+
+    Cada segmento es una tupla (inicio, longitud, monto) que representa
+    `longitud` flujos de `monto` en los periodos inicio, inicio + 1, ...
+    """
+
+    __slots__ = ("segmentos",)
+
+    def __init__(self, segmentos=None):
+        """
+        Args:
+            segmentos (list, opcional): Lista de tuplas (inicio, longitud, monto)
+        """
+        self.segmentos = []
+        for inicio, longitud, monto in segmentos or ():
+            self.agregar(inicio, longitud, monto)
+
+    @classmethod
+    def desde_lista(cls, flujos):
+        """
+        Comprime una lista de flujos (uno por periodo) en segmentos.
+
+        Args:
+            flujos (list): Lista de flujos de efectivo, comenzando en el periodo 0
+
+        Returns:
+            FlujosSegmentados: Flujos equivalentes agrupados en segmentos
+        """
+        resultado = cls()
+        inicio = 0
+        for periodo in range(1, len(flujos) + 1):
+            if periodo == len(flujos) or flujos[periodo] != flujos[inicio]:
+                resultado.agregar(inicio, periodo - inicio, flujos[inicio])
+                inicio = periodo
+        return resultado
+
+    def agregar(self, inicio, longitud, monto):
+        """
+        Agrega un segmento de `longitud` flujos iguales a partir del periodo `inicio`.
+
+        Si el segmento continúa al último segmento agregado con el mismo monto,
+        ambos se fusionan.
+
+        Args:
+            inicio (int): Periodo del primer flujo del segmento
+            longitud (int): Número de periodos del segmento
+            monto (float): Monto de cada flujo del segmento
+        """
+        if longitud <= 0 or monto == 0:
+            return
+        if self.segmentos:
+            inicio_previo, longitud_previa, monto_previo = self.segmentos[-1]
+            if monto_previo == monto and inicio_previo + longitud_previa == inicio:
+                self.segmentos[-1] = (inicio_previo, longitud_previa + longitud, monto)
+                return
+        self.segmentos.append((inicio, longitud, monto))
+
+    def agregar_flujo(self, periodo, monto):
+        """
+        Agrega un flujo único en el periodo indicado.
+
+        Args:
+            periodo (int): Periodo del flujo
+            monto (float): Monto del flujo
+        """
+        self.agregar(periodo, 1, monto)
+
+    def num_periodos(self):
+        """
+        Returns:
+            int: Número de periodos cubiertos, incluyendo el periodo 0
+        """
+        return max((inicio + longitud for inicio, longitud, _ in self.segmentos), default=0)
+
+    def a_lista(self):
+        """
+        Expande los segmentos en una lista con un flujo por periodo.
+
+        Returns:
+            list: Flujos de efectivo del periodo 0 al último periodo
+        """
+        flujos = [0.0] * self.num_periodos()
+        for inicio, longitud, monto in self.segmentos:
+            for periodo in range(inicio, inicio + longitud):
+                flujos[periodo] += monto
+        return flujos
+
+    def vpn(self, tasa):
+        """
+        Calcula el VPN de los flujos a la tasa por periodo indicada.
+
+        Args:
+            tasa (float): Tasa de descuento por periodo
+
+        Returns:
+            float: VPN calculado
+        """
+        return self.vpn_y_derivada(tasa)[0]
+
+    def vpn_y_derivada(self, tasa):
+        """
+        Calcula el VPN y su derivada respecto a la tasa, segmento por segmento.
+
+        Para un segmento, Σ vⁱ desde i = s hasta s + L - 1 es v^(s-1)·aₗ(r),
+        con v = 1 / (1 + r) y aₗ(r) = (1 - v^L) / r el valor presente de una
+        anualidad unitaria.
+
+        Args:
+            tasa (float): Tasa de descuento por periodo
+
+        Returns:
+            tuple: (vpn, derivada) calculados
+        """
+        log_crecimiento = math.log1p(tasa)
+        vpn = 0.0
+        derivada = 0.0
+
+        if abs(tasa) < _TASA_MINIMA_SERIE:
+            # Expansión de primer orden alrededor de r = 0
+            for inicio, longitud, monto in self.segmentos:
+                suma_periodos = longitud * inicio + longitud * (longitud - 1) / 2
+                vpn += monto * (longitud - tasa * suma_periodos)
+                derivada -= monto * suma_periodos
+            return vpn, derivada
+
+        for inicio, longitud, monto in self.segmentos:
+            # v^(s-1) y v^L
+            descuento_inicio = math.exp(-(inicio - 1) * log_crecimiento)
+            descuento_longitud = math.exp(-longitud * log_crecimiento)
+
+            anualidad = -math.expm1(-longitud * log_crecimiento) / tasa
+            derivada_anualidad = (longitud * descuento_longitud / (1 + tasa) - anualidad) / tasa
+
+            vpn += monto * descuento_inicio * anualidad
+            derivada += monto * descuento_inicio * (
+                derivada_anualidad - (inicio - 1) * anualidad / (1 + tasa))
+
+        return vpn, derivada
+
+    def __len__(self):
+        return len(self.segmentos)
+
+    def __repr__(self):
+        return f"FlujosSegmentados({self.segmentos!r})"
+
+
+def pagos_por_tramos(monto_credito, plazo_meses, tramos):
+    """
+    Construye los pagos mensuales de un crédito cuya tasa cambia por tramos.
+
+    Al inicio de cada tramo el saldo insoluto se vuelve a amortizar en los meses
+    restantes con la nueva tasa, como en las hipotecas de tasa mixta o variable
+    (casos 3.1 y 3.2 de docs/casos_uso_cat.md). Cada tramo produce un solo
+    segmento de pagos iguales.
+
+    Args:
+        monto_credito (float): Monto del crédito en pesos
+        plazo_meses (int): Plazo total del crédito en meses
+        tramos (list): Lista de tuplas (meses, tasa_interes_anual); el último
+                      tramo se extiende hasta el final del plazo
+
+    Returns:
+        FlujosSegmentados: Pagos mensuales (capital e intereses) en los periodos 1 a plazo_meses
+    """
+    pagos = FlujosSegmentados()
+    saldo = monto_credito
+    mes = 0
+
+    for indice, (meses, tasa_interes_anual) in enumerate(tramos):
+        restantes = plazo_meses - mes
+        if restantes <= 0:
+            break
+        if indice == len(tramos) - 1:
+            meses = restantes
+        meses = min(meses, restantes)
+
+        # Pago que amortiza el saldo en los meses restantes con la tasa del tramo
+        tasa_mensual = tasa_interes_anual / 12
+        if tasa_mensual == 0:
+            pago_mensual = saldo / restantes
+        else:
+            crecimiento = (1 + tasa_mensual) ** restantes
+            pago_mensual = saldo * tasa_mensual * crecimiento / (crecimiento - 1)
+
+        pagos.agregar(mes + 1, meses, pago_mensual)
+
+        # Saldo insoluto al final del tramo
+        if tasa_mensual == 0:
+            saldo -= pago_mensual * meses
+        else:
+            crecimiento = (1 + tasa_mensual) ** meses
+            saldo = saldo * crecimiento - pago_mensual * (crecimiento - 1) / tasa_mensual
+        mes += meses
+
+    return pagos
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Garantías en Efectivo
+
+Este módulo incorpora al cálculo del CAT las garantías en efectivo que el
+cliente debe constituir como condición del crédito (inciso d Bis) del numeral
+4.2 de la Circular 9/2015): desde la perspectiva de la institución, la garantía
+es un ingreso en el mes de su constitución y cada liberación, total o parcial,
+es un desembolso por el monto liberado más los intereses que generó. Los
+rendimientos pueden ser una tasa fija o una serie de tasas estimadas mes a mes.
+
+Si con la garantía la TIR resulta negativa o indeterminada, el inciso b) del
+numeral 4.1 pide reducir la garantía "en la proporción necesaria" hasta obtener
+el primer valor positivo. Como los flujos son lineales en la fracción f de la
+garantía,
+
+    VPN(r, f) = VPN_crédito(r) + f · VPN_garantía(r)
+
+la fracción que da una TIR objetivo r* es f = -VPN_crédito(r*) / VPN_garantía(r*).
+Esa fracción es el primer punto de una búsqueda acotada en [0, 1] (regula falsi
+con la modificación de Illinois, o bisección cuando la TIR no está determinada)
+en la que cada solución parte de la TIR más cercana ya conocida; en flujos
+convencionales basta una solución además de la inicial.
+"""
+
+import math
+from collections import namedtuple
+
+from calculo_cat.flujos import FlujosSegmentados
+from calculo_cat.solver import anualizar_tasa, calcular_tir_diagnostico, tasa_periodica
+
+# Primer CAT positivo publicable, en porcentaje (el CAT se publica con un decimal)
+CAT_MINIMO = 0.1
+
+ResultadoGarantia = namedtuple("ResultadoGarantia", ["cat", "fraccion_garantia", "monto_garantia", "soluciones"])
+ResultadoGarantia.__doc__ = """
+Resultado del cálculo del CAT con garantía en efectivo.
+
+Atributos:
+    cat (float): CAT expresado como porcentaje anual
+    fraccion_garantia (float): Fracción de la garantía considerada (1.0 si no se redujo)
+    monto_garantia (float): Monto de la garantía considerado en el cálculo
+    soluciones (int): Número de soluciones de la TIR realizadas
+"""
+
+
+class GarantiaEfectivo:
+    """
+    Garantía en efectivo de un crédito.
+
+    Ejemplo:
+        >>> # $10,000 al 2% anual, liberados la mitad en el mes 12 y el resto al final
+        >>> garantia = GarantiaEfectivo(10_000, 0.02, liberaciones=[(12, 0.5)])
+        >>> calcular_cat(100_000, 24, 0.18, garantia=garantia)
+    """
+
+    def __init__(self, monto, tasa_rendimiento=0.0, liberaciones=None, mes_constitucion=0):
+        """
+        Args:
+            monto (float): Monto de la garantía en pesos
+            tasa_rendimiento (float o list, opcional): Tasa de rendimiento anual (en
+                          decimal) fija, o una lista de tasas anuales estimadas para
+                          cada mes a partir de la constitución; la última se repite
+                          en los meses siguientes
+            liberaciones (list, opcional): Liberaciones parciales como tuplas (mes,
+                          fracción del monto original); lo que no se libere se
+                          libera al final del plazo
+            mes_constitucion (int, opcional): Mes en que se constituye la garantía
+        """
+        liberaciones = sorted(liberaciones or ())
+        for mes, fraccion in liberaciones:
+            if mes <= mes_constitucion:
+                raise ValueError(f"La liberación del mes {mes} es anterior a la constitución de la garantía")
+            if fraccion <= 0:
+                raise ValueError(f"Fracción de liberación inválida en el mes {mes}: {fraccion}")
+        if sum(fraccion for _, fraccion in liberaciones) > 1 + 1e-12:
+            raise ValueError("Las liberaciones suman más que el monto de la garantía")
+
+        self.monto = monto
+        self.tasa_rendimiento = tasa_rendimiento
+        self.liberaciones = liberaciones
+        self.mes_constitucion = mes_constitucion
+
+    def __repr__(self):
+        return (f"GarantiaEfectivo(monto={self.monto}, tasa_rendimiento={self.tasa_rendimiento}, "
+                f"liberaciones={self.liberaciones}, mes_constitucion={self.mes_constitucion})")
+
+    def flujos(self, plazo_meses):
+        """
+        Calcula los flujos de la garantía desde la perspectiva de la institución.
+
+        Args:
+            plazo_meses (int): Plazo del crédito en meses
+
+        Returns:
+            list: Tuplas (mes, monto) ordenadas por mes: el monto de la garantía en
+            la constitución y cada liberación con sus intereses, con signo negativo
+        """
+        if plazo_meses <= self.mes_constitucion:
+            raise ValueError(f"El plazo ({plazo_meses}) no es posterior a la constitución de la garantía")
+        for mes, _ in self.liberaciones:
+            if mes > plazo_meses:
+                raise ValueError(f"La liberación del mes {mes} es posterior al plazo del crédito ({plazo_meses})")
+
+        liberaciones = list(self.liberaciones)
+        restante = 1.0 - sum(fraccion for _, fraccion in liberaciones)
+        if restante > 1e-12:
+            liberaciones.append((plazo_meses, restante))
+
+        flujos = {self.mes_constitucion: float(self.monto)}
+        for mes, fraccion in liberaciones:
+            flujos[mes] = flujos.get(mes, 0.0) - fraccion * self.monto * self._acumulado(mes)
+        return sorted(flujos.items())
+
+    def _acumulado(self, mes):
+        """Factor de acumulación de los rendimientos desde la constitución hasta `mes`."""
+        meses = mes - self.mes_constitucion
+        if not isinstance(self.tasa_rendimiento, (list, tuple)):
+            return (1 + self.tasa_rendimiento / 12) ** meses
+
+        # Rendimientos estimados: una tasa anual por mes, repitiendo la última
+        tasas = self.tasa_rendimiento
+        factor = 1.0
+        for k in range(meses):
+            factor *= 1 + (tasas[k] if k < len(tasas) else tasas[-1]) / 12
+        return factor
+
+
+class _FlujosConGarantia:
+    """Flujos de un crédito más una fracción de los flujos de su garantía."""
+
+    __slots__ = ("credito", "garantia", "fraccion")
+
+    def __init__(self, credito, garantia, fraccion):
+        self.credito = credito
+        self.garantia = garantia
+        self.fraccion = fraccion
+
+    def vpn_y_derivada(self, tasa):
+        vpn, derivada = self.credito.vpn_y_derivada(tasa)
+        vpn_garantia, derivada_garantia = self.garantia.vpn_y_derivada(tasa)
+        return vpn + self.fraccion * vpn_garantia, derivada + self.fraccion * derivada_garantia
+
+    def vpn(self, tasa):
+        return self.vpn_y_derivada(tasa)[0]
+
+
+def calcular_cat_con_garantia(flujos, garantia, plazo_meses, tasa_inicial=0.01, signo=1,
+                              cat_minimo=CAT_MINIMO, tolerancia=1e-6, tolerancia_fraccion=1e-9):
+    """
+    Calcula el CAT de un crédito con garantía en efectivo, reduciendo la garantía
+    si con ella la TIR resulta negativa o indeterminada.
+
+    Args:
+        flujos (FlujosSegmentados): Flujos del crédito sin la garantía
+        garantia (GarantiaEfectivo): Garantía en efectivo
+        plazo_meses (int): Plazo del crédito en meses
+        tasa_inicial (float, opcional): Estimación inicial de la TIR mensual
+        signo (int, opcional): 1 si los flujos están desde la perspectiva de la
+                      institución, -1 si están desde la del cliente
+        cat_minimo (float, opcional): CAT (en porcentaje) que se busca al reducir la garantía
+        tolerancia (float, opcional): Tolerancia del CAT reducido respecto a `cat_minimo`,
+                      en puntos porcentuales
+        tolerancia_fraccion (float, opcional): Ancho mínimo del intervalo de la fracción
+
+    Returns:
+        ResultadoGarantia: CAT, fracción y monto de la garantía considerados y
+        número de soluciones de la TIR
+    """
+    flujos_garantia = FlujosSegmentados()
+    for mes, monto in garantia.flujos(plazo_meses):
+        flujos_garantia.agregar_flujo(mes, signo * monto)
+    combinados = _FlujosConGarantia(flujos, flujos_garantia, 1.0)
+    soluciones = 0
+
+    def resolver(fraccion, tasa_inicial):
+        nonlocal soluciones
+        soluciones += 1
+        combinados.fraccion = fraccion
+        diagnostico = calcular_tir_diagnostico(combinados, tasa_inicial=tasa_inicial)
+        tasa = diagnostico.tasa
+        if not diagnostico.estado.convergido or not math.isfinite(tasa) or tasa <= -1:
+            return None
+        return tasa
+
+    def resultado(fraccion, tasa):
+        cat = anualizar_tasa(tasa) if tasa is not None else math.nan  # CAT efectivo anual (porcentaje)
+        return ResultadoGarantia(cat, fraccion, fraccion * garantia.monto, soluciones)
+
+    # Garantía completa: si la TIR es positiva no hay nada que reducir
+    tasa = resolver(1.0, tasa_inicial)
+    if tasa is not None and tasa > 0:
+        return resultado(1.0, tasa)
+
+    # Búsqueda acotada de la fracción: en `inferior` la TIR alcanza la objetivo, en `superior` no
+    tasa_objetivo = tasa_periodica(cat_minimo)
+    inferior, tasa_inferior = 0.0, None
+    superior, tasa_superior = 1.0, tasa
+    lado_repetido = 0
+
+    # Primer punto: la fracción que anula el VPN en la TIR objetivo
+    vpn_credito = flujos.vpn(tasa_objetivo)
+    vpn_garantia = flujos_garantia.vpn(tasa_objetivo)
+    fraccion = -vpn_credito / vpn_garantia if vpn_garantia != 0 else 0.5
+    inicial = tasa_objetivo
+    if fraccion <= 0 and signo * vpn_credito < 0:
+        # Ni sin garantía se alcanza el CAT objetivo (VPN de la institución
+        # negativo en la TIR objetivo): el crédito sin garantía
+        return resultado(0.0, resolver(0.0, tasa_inicial))
+
+    while superior - inferior > tolerancia_fraccion:
+        if not inferior < fraccion < superior:
+            fraccion = (inferior + superior) / 2
+
+        tasa = resolver(fraccion, inicial)
+
+        if tasa is not None and abs(anualizar_tasa(tasa) - cat_minimo) <= tolerancia:
+            return resultado(fraccion, tasa)
+        if tasa is not None and tasa > tasa_objetivo:
+            inferior, tasa_inferior = fraccion, tasa
+            lado_repetido = min(lado_repetido, 0) - 1
+        else:
+            superior, tasa_superior = fraccion, tasa
+            lado_repetido = max(lado_repetido, 0) + 1
+
+        # Regula falsi sobre la TIR si ambos extremos la tienen; bisección en otro caso
+        if tasa_inferior is None or tasa_superior is None:
+            fraccion = (inferior + superior) / 2
+            inicial = tasa_inferior if tasa_inferior is not None else tasa_objetivo
+            continue
+        exceso_inferior = tasa_inferior - tasa_objetivo
+        exceso_superior = tasa_superior - tasa_objetivo
+        # Illinois: si el mismo extremo se repite, reducir a la mitad el peso del otro
+        if lado_repetido <= -2:
+            exceso_superior /= 2
+        elif lado_repetido >= 2:
+            exceso_inferior /= 2
+        fraccion = inferior + (superior - inferior) * exceso_inferior / (exceso_inferior - exceso_superior)
+
+        # La siguiente solución parte de la TIR del extremo más cercano
+        inicial = tasa_inferior if fraccion - inferior < superior - fraccion else tasa_superior
+
+    if tasa_inferior is None:
+        # Ninguna fracción positiva alcanza el CAT objetivo: el crédito sin garantía
+        tasa_inferior = resolver(0.0, tasa_inicial)
+    return resultado(inferior, tasa_inferior)
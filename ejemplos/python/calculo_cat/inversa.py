@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+CAT Inverso y Sensibilidades para Préstamos con Pagos Fijos
+
+Este módulo responde la pregunta inversa del cálculo del CAT: qué tasa de
+interés, comisión por apertura, seguro o plazo produce un CAT objetivo, con la
+semántica de `prestamo_personal_basico.calcular_cat`.
+
+El CAT objetivo fija la TIR mensual r* = (1 + CAT / 100)^(1/12) - 1 (el CAT es
+la tasa efectiva anual, `solver.anualizar_tasa`), por lo que la ecuación
+del VPN
+
+    F(r, p) = -(monto - comisión - otros costos) + cuota(p) · a(r, n) = 0
+
+con a(r, n) = (1 - (1 + r)^-n) / r, se resuelve directamente para el parámetro
+p con r = r* fija, en lugar de anidar una búsqueda sobre `calcular_cat`:
+
+    - comisión por apertura y seguro: en forma cerrada
+    - tasa de interés: invirtiendo el factor de pago con Newton-Raphson
+    - plazo: por bisección sobre un plazo continuo
+
+Si el CAT objetivo sólo se alcanza con un valor fuera del dominio del parámetro
+(una comisión, un seguro o una tasa negativos), el resultado es NaN y no
+convergido, igual que cuando el objetivo es inalcanzable.
+
+Las sensibilidades dCAT/dp se obtienen con el teorema de la función implícita,
+dr/dp = -(∂F/∂p) / (∂F/∂r), sin volver a resolver la TIR.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from calculo_cat.lote import _anualidad, _factor_pago, _newton_lote, calcular_tir_lote
+from calculo_cat.solver import anualizar_tasa, tasa_periodica
+
+
+# Parámetros que se pueden despejar para un CAT objetivo
+PARAMETROS_OBJETIVO = ("tasa_interes_anual", "comision_apertura", "seguro", "plazo_meses")
+
+# Intervalo de búsqueda del plazo (en meses) y pasos de bisección
+_PLAZO_MINIMO = 1.0
+_PLAZO_MAXIMO = 1200.0
+_PASOS_BISECCION_PLAZO = 80
+
+ResultadoInverso = namedtuple("ResultadoInverso", ["valor", "convergido", "sensibilidades"])
+ResultadoInverso.__doc__ = """
+Resultado del cálculo inverso del CAT.
+
+Atributos:
+    valor (numpy.ndarray): Valor del parámetro despejado que produce el CAT objetivo
+                  (NaN si no existe o está fuera del dominio del parámetro)
+    convergido (numpy.ndarray): Indica si se encontró un valor válido
+    sensibilidades (dict): dCAT/dparámetro en el punto encontrado, como en
+                  `sensibilidades_cat`
+"""
+
+
+def resolver_parametro(cat_objetivo, parametro, monto_credito, plazo_meses=None,
+                       tasa_interes_anual=None, comision_apertura=0, comisiones_mensuales=0,
+                       seguro=0, otros_costos=0, tolerancia=1e-12, max_iteraciones=1000):
+    """
+    Despeja un parámetro del préstamo para obtener un CAT objetivo.
+
+    El valor que se pase para el parámetro despejado se ignora. Todos los
+    argumentos numéricos pueden ser escalares o arreglos (broadcasting de NumPy).
+
+    Args:
+        cat_objetivo (array_like): CAT objetivo expresado como porcentaje anual
+        parametro (str): "tasa_interes_anual", "comision_apertura", "seguro" o "plazo_meses"
+        monto_credito (array_like): Monto del crédito en pesos
+        plazo_meses (array_like): Plazo del crédito en meses
+        tasa_interes_anual (array_like): Tasa de interés anual (en decimal)
+        comision_apertura (array_like, opcional): Comisión por apertura (en pesos)
+        comisiones_mensuales (array_like, opcional): Comisiones mensuales fijas (en pesos)
+        seguro (array_like, opcional): Costo del seguro mensual (en pesos)
+        otros_costos (array_like, opcional): Otros costos iniciales (en pesos)
+        tolerancia (float, opcional): Tolerancia para la convergencia del método
+        max_iteraciones (int, opcional): Número máximo de iteraciones
+
+    Returns:
+        ResultadoInverso: Valor del parámetro, convergencia y sensibilidades
+
+    Ejemplo:
+        >>> resolver_parametro(30.0, "comision_apertura", 50000, 24, 0.24).valor
+    """
+    if parametro not in PARAMETROS_OBJETIVO:
+        raise ValueError(f"Parámetro desconocido: '{parametro}'; "
+                         f"use uno de {', '.join(PARAMETROS_OBJETIVO)}")
+
+    parametros = {
+        "monto_credito": monto_credito,
+        "plazo_meses": plazo_meses,
+        "tasa_interes_anual": tasa_interes_anual,
+        "comision_apertura": comision_apertura,
+        "comisiones_mensuales": comisiones_mensuales,
+        "seguro": seguro,
+        "otros_costos": otros_costos,
+    }
+    parametros[parametro] = 0.0
+    for nombre, valor in parametros.items():
+        if valor is None:
+            raise ValueError(f"Falta el parámetro '{nombre}'")
+
+    nombres = ("cat_objetivo",) + tuple(parametros)
+    valores = dict(zip(nombres, np.broadcast_arrays(
+        *(np.asarray(valor, dtype=float) for valor in (cat_objetivo, *parametros.values())))))
+
+    # El CAT objetivo fija la TIR mensual
+    tasa = tasa_periodica(valores.pop("cat_objetivo"))
+    valores = {nombre: valor.copy() for nombre, valor in valores.items()}
+
+    despejar = {
+        "comision_apertura": _despejar_comision,
+        "seguro": _despejar_seguro,
+        "tasa_interes_anual": _despejar_tasa,
+        "plazo_meses": _despejar_plazo,
+    }[parametro]
+    valor, convergido = despejar(tasa, tolerancia=tolerancia, max_iteraciones=max_iteraciones, **valores)
+
+    valores[parametro] = np.where(convergido, valor, np.nan)
+    sensibilidades = _sensibilidades(tasa, **valores)
+    return ResultadoInverso(valores[parametro], convergido, sensibilidades)
+
+
+def sensibilidades_cat(monto_credito, plazo_meses, tasa_interes_anual, comision_apertura=0,
+                       comisiones_mensuales=0, seguro=0, otros_costos=0):
+    """
+    Calcula las derivadas del CAT respecto a cada parámetro del préstamo.
+
+    Resuelve la TIR una sola vez; las derivadas salen del teorema de la función
+    implícita, por lo que un panel de escenarios puede estimar el CAT de cambios
+    pequeños como CAT + Σ (dCAT/dp) · Δp sin volver a resolver.
+
+    Args:
+        monto_credito (array_like): Monto del crédito en pesos
+        plazo_meses (array_like): Plazo del crédito en meses
+        tasa_interes_anual (array_like): Tasa de interés anual (en decimal)
+        comision_apertura (array_like, opcional): Comisión por apertura (en pesos)
+        comisiones_mensuales (array_like, opcional): Comisiones mensuales fijas (en pesos)
+        seguro (array_like, opcional): Costo del seguro mensual (en pesos)
+        otros_costos (array_like, opcional): Otros costos iniciales (en pesos)
+
+    Returns:
+        dict: Puntos porcentuales de CAT por unidad de cada parámetro (por peso,
+        por unidad de tasa anual en decimal o por mes), más la llave "cat"
+    """
+    valores = dict(zip(
+        ("monto_credito", "plazo_meses", "tasa_interes_anual", "comision_apertura",
+         "comisiones_mensuales", "seguro", "otros_costos"),
+        np.broadcast_arrays(*(np.asarray(valor, dtype=float) for valor in (
+            monto_credito, plazo_meses, tasa_interes_anual, comision_apertura,
+            comisiones_mensuales, seguro, otros_costos)))))
+
+    tasa_mensual = valores["tasa_interes_anual"] / 12
+    cuota = _cuota(**valores)
+    monto_neto = valores["monto_credito"] - valores["comision_apertura"] - valores["otros_costos"]
+    tasa, _, _ = calcular_tir_lote(monto_neto, cuota, valores["plazo_meses"], tasa_inicial=tasa_mensual)
+
+    sensibilidades = _sensibilidades(tasa, **valores)
+    sensibilidades["cat"] = anualizar_tasa(tasa)
+    return sensibilidades
+
+
+def _cuota(monto_credito, plazo_meses, tasa_interes_anual, comisiones_mensuales, seguro, **_):
+    """Flujo mensual recibido por la institución."""
+    return (monto_credito * _factor_pago(tasa_interes_anual / 12, plazo_meses)
+            + comisiones_mensuales + seguro)
+
+
+def _despejar_comision(tasa, monto_credito, plazo_meses, tasa_interes_anual, comisiones_mensuales,
+                       seguro, otros_costos, tolerancia, **_):
+    """
+    Comisión por apertura en forma cerrada: comisión = monto - otros - cuota · a(r*, n).
+    Una comisión negativa (el CAT objetivo es menor que el CAT sin comisión) no es válida.
+    """
+    anualidad, _ = _anualidad(tasa, plazo_meses)
+    cuota = _cuota(monto_credito, plazo_meses, tasa_interes_anual, comisiones_mensuales, seguro)
+    comision = monto_credito - otros_costos - cuota * anualidad
+    return _no_negativo(comision, tolerancia * monto_credito)
+
+
+def _despejar_seguro(tasa, monto_credito, plazo_meses, tasa_interes_anual, comision_apertura,
+                     comisiones_mensuales, otros_costos, tolerancia, **_):
+    """
+    Seguro mensual en forma cerrada: seguro = neto / a(r*, n) - pago - comisiones.
+    Un seguro negativo no es válido.
+    """
+    anualidad, _ = _anualidad(tasa, plazo_meses)
+    monto_neto = monto_credito - comision_apertura - otros_costos
+    seguro = (monto_neto / anualidad
+              - monto_credito * _factor_pago(tasa_interes_anual / 12, plazo_meses)
+              - comisiones_mensuales)
+    return _no_negativo(seguro, tolerancia * monto_credito)
+
+
+def _no_negativo(valor, holgura):
+    """
+    Valida un parámetro que no puede ser negativo: los valores mayores que
+    -holgura (redondeo en el límite) se llevan a cero y los demás no convergen.
+    """
+    convergido = np.isfinite(valor) & (valor >= -holgura)
+    return np.maximum(valor, 0.0), convergido
+
+
+def _despejar_tasa(tasa, monto_credito, plazo_meses, comision_apertura, comisiones_mensuales,
+                   seguro, otros_costos, tolerancia, max_iteraciones, **_):
+    """
+    Tasa de interés anual: el pago que produce el CAT objetivo fija el factor de
+    pago, y la tasa mensual j se obtiene resolviendo a(j, n) = monto / pago.
+    """
+    anualidad, _ = _anualidad(tasa, plazo_meses)
+    monto_neto = monto_credito - comision_apertura - otros_costos
+    pago = monto_neto / anualidad - comisiones_mensuales - seguro
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        anualidad_objetivo = (monto_credito / pago).ravel()
+    plazo = plazo_meses.ravel()
+    factible = (pago.ravel() > 0) & np.isfinite(anualidad_objetivo)
+
+    # La TIR mensual es un punto de partida cercano a la tasa mensual
+    tasa_mensual = np.where(factible, tasa.ravel(), 0.0)
+
+    def evaluar(activos, j):
+        a, derivada = _anualidad(j, plazo[activos])
+        return a - anualidad_objetivo[activos], derivada
+
+    _, convergido = _newton_lote(evaluar, tasa_mensual, tolerancia, max_iteraciones)
+    convergido &= factible & (tasa_mensual >= -tolerancia)
+    np.maximum(tasa_mensual, 0.0, out=tasa_mensual)
+    return (tasa_mensual * 12).reshape(tasa.shape), convergido.reshape(tasa.shape)
+
+
+def _despejar_plazo(tasa, monto_credito, tasa_interes_anual, comision_apertura, comisiones_mensuales,
+                    seguro, otros_costos, **_):
+    """
+    Plazo continuo en meses por bisección sobre [1, 1200]: el redondeo al
+    plazo entero queda a cargo de quien llama.
+    """
+    monto_neto = monto_credito - comision_apertura - otros_costos
+
+    def vpn(plazo):
+        anualidad, _ = _anualidad(tasa, plazo)
+        return _cuota(monto_credito, plazo, tasa_interes_anual, comisiones_mensuales, seguro) * anualidad - monto_neto
+
+    inferior = np.full(tasa.shape, _PLAZO_MINIMO)
+    superior = np.full(tasa.shape, _PLAZO_MAXIMO)
+    vpn_inferior = vpn(inferior)
+    convergido = np.sign(vpn_inferior) != np.sign(vpn(superior))
+
+    for _ in range(_PASOS_BISECCION_PLAZO):
+        medio = (inferior + superior) / 2
+        vpn_medio = vpn(medio)
+        mismo_signo = np.sign(vpn_medio) == np.sign(vpn_inferior)
+        inferior = np.where(mismo_signo, medio, inferior)
+        vpn_inferior = np.where(mismo_signo, vpn_medio, vpn_inferior)
+        superior = np.where(mismo_signo, superior, medio)
+
+    return (inferior + superior) / 2, convergido
+
+
+def _sensibilidades(tasa, monto_credito, plazo_meses, tasa_interes_anual, comision_apertura,
+                    comisiones_mensuales, seguro, otros_costos):
+    """
+    Derivadas del CAT respecto a cada parámetro en la TIR mensual `tasa`:
+    dCAT/dp = -1200 · (1 + r)^11 · (∂F/∂p) / (∂F/∂r), ya que dCAT/dr = 1200 · (1 + r)^11.
+    """
+    tasa_mensual = tasa_interes_anual / 12
+    anualidad, derivada_anualidad = _anualidad(tasa, plazo_meses)
+    anualidad_pago, derivada_anualidad_pago = _anualidad(tasa_mensual, plazo_meses)
+    factor = _factor_pago(tasa_mensual, plazo_meses)
+    cuota = monto_credito * factor + comisiones_mensuales + seguro
+
+    # Factor de pago φ = 1 / a(j, n): derivadas respecto a la tasa mensual j y al plazo n
+    dfactor_tasa = -derivada_anualidad_pago / anualidad_pago ** 2
+    dfactor_plazo = -_derivada_anualidad_plazo(tasa_mensual, plazo_meses) / anualidad_pago ** 2
+
+    derivadas_vpn = {
+        "monto_credito": factor * anualidad - 1,
+        "plazo_meses": (monto_credito * dfactor_plazo * anualidad
+                        + cuota * _derivada_anualidad_plazo(tasa, plazo_meses)),
+        "tasa_interes_anual": monto_credito * dfactor_tasa / 12 * anualidad,
+        "comision_apertura": np.ones_like(anualidad),
+        "comisiones_mensuales": anualidad,
+        "seguro": anualidad,
+        "otros_costos": np.ones_like(anualidad),
+    }
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        escala = -12 * 100 * (1 + tasa) ** 11 / (cuota * derivada_anualidad)
+    return {nombre: derivada * escala for nombre, derivada in derivadas_vpn.items()}
+
+
+def _derivada_anualidad_plazo(tasa, plazo):
+    """
+    Derivada de a(r, n) = (1 - (1+r)^-n) / r respecto a un plazo continuo n:
+    (1+r)^-n · ln(1+r) / r, con su expansión de primer orden para r cercana a cero.
+    """
+    pequena = np.abs(tasa) < 1e-8
+    r = np.where(pequena, 1.0, tasa)
+    derivada = np.exp(-plazo * np.log1p(r)) * np.log1p(r) / r
+    return np.where(pequena, 1 - tasa * (plazo + 0.5), derivada)
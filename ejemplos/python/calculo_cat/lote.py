@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculo del CAT por Lotes
+
+Este módulo implementa el cálculo del Costo Anual Total (CAT) para carteras
+completas de créditos con pagos fijos periódicos. En lugar de resolver un
+préstamo a la vez, el método de Newton-Raphson avanza en paralelo sobre todos
+los créditos del lote usando arreglos de NumPy; los créditos que ya
+convergieron se retiran del conjunto activo en cada iteración. Cada crédito
+lleva su propio intervalo con cambio de signo del VPN y, como en
+`solver.calcular_tir`, los pasos de Newton que salen de él se sustituyen por
+pasos de bisección, por lo que un crédito difícil no diverge.
+
+Para pagos iguales, el VPN se evalúa con la fórmula cerrada de la anualidad,
+por lo que el costo por iteración no depende del plazo ni de la periodicidad:
+un microcrédito semanal de 104 pagos cuesta lo mismo que uno mensual de 24, y
+los créditos de distintas periodicidades se resuelven en el mismo lote, cada
+uno anualizado con su propio número de periodos por año.
+
+Cuando el cálculo escalar de `prestamo_personal_basico.calcular_cat` converge,
+los resultados coinciden con él, crédito por crédito, con una diferencia menor
+a 1e-6 puntos porcentuales del CAT.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from calculo_cat.solver import anualizar_tasa
+
+
+ResultadoLote = namedtuple("ResultadoLote", ["cat", "iteraciones", "convergido"])
+ResultadoLote.__doc__ = """
+Resultado del cálculo del CAT por lotes.
+
+Atributos:
+    cat (numpy.ndarray): CAT de cada crédito expresado como porcentaje anual
+    iteraciones (numpy.ndarray): Iteraciones de Newton-Raphson usadas por crédito
+    convergido (numpy.ndarray): Indica si el método convergió para cada crédito
+"""
+
+# Por debajo de esta tasa se usa la expansión en serie de la anualidad
+_TASA_MINIMA_ANUALIDAD = 1e-8
+
+
+def calcular_cat_lote(monto_credito, plazo_meses, tasa_interes_anual, comision_apertura=0,
+                      comisiones_mensuales=0, seguro=0, otros_costos=0, periodicidad=12,
+                      tolerancia=1e-10, max_iteraciones=1000):
+    """
+    Calcula el CAT para un lote de préstamos con pagos fijos periódicos.
+
+    Cada argumento puede ser un escalar o un arreglo; todos se combinan con las
+    reglas de broadcasting de NumPy. La semántica es la misma que la de
+    `prestamo_personal_basico.calcular_cat`.
+
+    Args:
+        monto_credito (array_like): Monto del crédito en pesos
+        plazo_meses (array_like): Plazo del crédito en meses
+        tasa_interes_anual (array_like): Tasa de interés anual (en decimal, ej: 0.12 para 12%)
+        comision_apertura (array_like, opcional): Comisión por apertura (en pesos)
+        comisiones_mensuales (array_like, opcional): Comisiones mensuales fijas (en pesos)
+        seguro (array_like, opcional): Costo del seguro mensual (en pesos)
+        otros_costos (array_like, opcional): Otros costos iniciales (en pesos)
+        periodicidad (array_like, opcional): Pagos por año de cada crédito (12, 24, 26 o 52)
+        tolerancia (float, opcional): Tolerancia para la convergencia del método
+        max_iteraciones (int, opcional): Número máximo de iteraciones
+
+    Returns:
+        ResultadoLote: Arreglos con el CAT (porcentaje anual), las iteraciones
+        y la bandera de convergencia de cada crédito
+    """
+    (monto_credito, plazo_meses, tasa_interes_anual, comision_apertura,
+     comisiones_mensuales, seguro, otros_costos, periodicidad) = np.broadcast_arrays(
+        *(np.asarray(valor, dtype=float) for valor in (
+            monto_credito, plazo_meses, tasa_interes_anual, comision_apertura,
+            comisiones_mensuales, seguro, otros_costos, periodicidad)))
+
+    # Número de pagos y tasa por periodo (mensual con la periodicidad por omisión)
+    periodos = np.rint(plazo_meses * periodicidad / 12)
+    tasa_periodo = tasa_interes_anual / periodicidad
+
+    # Calcular pago periódico (amortización + intereses)
+    pago_periodo = monto_credito * _factor_pago(tasa_periodo, periodos)
+
+    # Monto neto recibido (descontando comisiones y otros costos iniciales)
+    monto_neto = monto_credito - comision_apertura - otros_costos
+
+    # Flujo periódico recibido por la institución, con los cargos mensuales prorrateados
+    cuota = pago_periodo + (comisiones_mensuales + seguro) * (12 / periodicidad)
+
+    # La tasa nominal por periodo es un punto de partida cercano a la TIR
+    tasa, iteraciones, convergido = calcular_tir_lote(
+        monto_neto, cuota, periodos, tasa_inicial=tasa_periodo,
+        tolerancia=tolerancia, max_iteraciones=max_iteraciones)
+
+    cat = anualizar_tasa(tasa, periodicidad)  # CAT efectivo anual (porcentaje)
+
+    return ResultadoLote(cat, iteraciones, convergido)
+
+
+def calcular_tir_lote(monto_neto, cuota, plazo, tasa_inicial=0.1, tolerancia=1e-10,
+                      max_iteraciones=1000):
+    """
+    Calcula la TIR por periodo de un lote de créditos con pagos iguales.
+
+    Cada crédito tiene un flujo inicial `-monto_neto` seguido de `plazo`
+    pagos iguales a `cuota`. El método de Newton-Raphson se aplica a todos los
+    créditos simultáneamente y sólo los que no han convergido se siguen
+    iterando.
+
+    Args:
+        monto_neto (array_like): Monto neto desembolsado por la institución
+        cuota (array_like): Flujo periódico recibido por la institución
+        plazo (array_like): Número de periodos
+        tasa_inicial (array_like, opcional): Estimación inicial de la tasa por periodo
+        tolerancia (float, opcional): Tolerancia para la convergencia del método
+        max_iteraciones (int, opcional): Número máximo de iteraciones
+
+    Returns:
+        tuple: (tasa, iteraciones, convergido) como arreglos de NumPy
+    """
+    monto_neto, cuota, plazo, tasa = np.broadcast_arrays(
+        *(np.asarray(valor, dtype=float) for valor in (monto_neto, cuota, plazo, tasa_inicial)))
+    forma = tasa.shape
+
+    monto_neto = monto_neto.ravel()
+    cuota = cuota.ravel()
+    plazo = plazo.ravel()
+    tasa = tasa.ravel().copy()
+
+    def evaluar(activos, r):
+        anualidad, derivada_anualidad = _anualidad(r, plazo[activos])
+        return cuota[activos] * anualidad - monto_neto[activos], cuota[activos] * derivada_anualidad
+
+    iteraciones, convergido = _newton_lote(evaluar, tasa, tolerancia, max_iteraciones)
+
+    return tasa.reshape(forma), iteraciones.reshape(forma), convergido.reshape(forma)
+
+
+def calcular_tir_matriz(flujos, tasa_inicial=0.1, tolerancia=1e-10, max_iteraciones=1000):
+    """
+    Calcula la TIR por periodo de un lote de créditos con flujos arbitrarios.
+
+    Cada renglón de `flujos` contiene los flujos de un crédito, del periodo 0 al
+    último periodo. El VPN y su derivada se evalúan con el esquema de Horner
+    sobre todas las columnas a la vez, y sólo los renglones que no han
+    convergido se siguen iterando.
+
+    Args:
+        flujos (numpy.ndarray): Matriz (créditos × periodos) de flujos de efectivo
+        tasa_inicial (array_like, opcional): Estimación inicial de la tasa por periodo
+        tolerancia (float, opcional): Tolerancia para la convergencia del método
+        max_iteraciones (int, opcional): Número máximo de iteraciones
+
+    Returns:
+        tuple: (tasa, iteraciones, convergido) como arreglos de NumPy
+    """
+    flujos = np.atleast_2d(np.asarray(flujos, dtype=float))
+    tasa = np.broadcast_to(np.asarray(tasa_inicial, dtype=float), flujos.shape[:1]).copy()
+
+    def evaluar(activos, r):
+        return _vpn_y_derivada_matriz(flujos[activos], r)
+
+    iteraciones, convergido = _newton_lote(evaluar, tasa, tolerancia, max_iteraciones)
+
+    return tasa, iteraciones, convergido
+
+
+def _newton_lote(evaluar, tasa, tolerancia, max_iteraciones):
+    """
+    Aplica Newton-Raphson protegido por bisección en paralelo, retirando del
+    conjunto activo los créditos que ya convergieron. Actualiza `tasa` en su lugar.
+
+    Cada crédito sigue las mismas reglas que `solver.calcular_tir`: en cuanto
+    se conocen dos tasas con VPN de signo opuesto, un paso de Newton que salga
+    de ese intervalo o que no reduzca lo suficiente el paso anterior se
+    sustituye por un paso de bisección; sin intervalo, un paso inválido se
+    sustituye por un alejamiento que conserva (1 + tasa) > 0.
+
+    Args:
+        evaluar (callable): Función (activos, tasa) -> (vpn, derivada) para los
+                      índices activos
+        tasa (numpy.ndarray): Estimación inicial de la tasa de cada crédito
+        tolerancia (float): Tolerancia para la convergencia del método
+        max_iteraciones (int): Número máximo de iteraciones
+
+    Returns:
+        tuple: (iteraciones, convergido) como arreglos de NumPy
+    """
+    iteraciones = np.full(tasa.size, max_iteraciones, dtype=np.int64)
+    convergido = np.zeros(tasa.size, dtype=bool)
+
+    # Estado de los créditos que siguen iterando, alineado con `activos`: tasa
+    # actual, tasas con VPN positivo y negativo más cercanas a la raíz y último
+    # paso (NaN mientras no se conocen)
+    activos = np.arange(tasa.size)
+    r = tasa.copy()
+    positiva = np.full(tasa.size, np.nan)
+    negativa = np.full(tasa.size, np.nan)
+    paso_anterior = np.full(tasa.size, np.nan)
+
+    for iteracion in range(1, max_iteraciones + 1):
+        if activos.size == 0:
+            break
+
+        vpn, derivada = evaluar(activos, r)
+
+        # Si el VPN está dentro de la tolerancia, hemos encontrado la TIR
+        en_tolerancia = np.abs(vpn) < tolerancia
+
+        # Actualizar el intervalo que contiene la raíz
+        vpn_positivo = vpn > 0
+        positiva = np.where(vpn_positivo, r, positiva)
+        negativa = np.where(vpn_positivo, negativa, r)
+        inferior = np.minimum(positiva, negativa)
+        superior = np.maximum(positiva, negativa)
+        acotada = ~np.isnan(inferior)
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            # Paso de Newton-Raphson
+            nueva_tasa = r - vpn / derivada
+
+            # Con intervalo: bisección si Newton sale de él o avanza demasiado lento
+            biseccion = acotada & ~((inferior < nueva_tasa) & (nueva_tasa < superior)
+                                    & ~(np.abs(nueva_tasa - r) > np.abs(paso_anterior) / 2))
+            nueva_tasa = np.where(biseccion, (inferior + superior) / 2, nueva_tasa)
+
+            # Sin intervalo: alejarse del punto sin perder (1 + tasa) > 0
+            invalida = ~acotada & ~(nueva_tasa > -1)
+            if invalida.any():
+                alejarse = vpn_positivo & (derivada <= 0) | (vpn < 0) & (derivada > 0)
+                nueva_tasa = np.where(invalida, np.where(alejarse, r + np.maximum(np.abs(r), 0.1), (r - 1) / 2),
+                                      nueva_tasa)
+            nueva_tasa = np.where(en_tolerancia, r, nueva_tasa)
+
+            # Convergencia: VPN, intervalo o paso menores que la tolerancia
+            paso = nueva_tasa - r
+            terminado = en_tolerancia | (np.abs(paso) < tolerancia) | (superior - inferior < tolerancia)
+        valido = np.isfinite(nueva_tasa) & np.isfinite(vpn)
+
+        # Retirar los créditos que terminaron o cuyo VPN ya no es finito
+        sale = terminado | ~valido
+        if sale.any():
+            salientes = activos[sale]
+            tasa[salientes] = np.where(valido[sale], nueva_tasa[sale], r[sale])
+            iteraciones[salientes] = iteracion
+            convergido[salientes] = terminado[sale] & valido[sale]
+            sigue = ~sale
+            activos, nueva_tasa, positiva, negativa, paso = (
+                activos[sigue], nueva_tasa[sigue], positiva[sigue], negativa[sigue], paso[sigue])
+        r, paso_anterior = nueva_tasa, paso
+
+    # Los créditos que agotaron las iteraciones conservan la última aproximación
+    tasa[activos] = r
+    return iteraciones, convergido
+
+
+def _vpn_y_derivada_matriz(flujos, tasa):
+    """
+    Evalúa el VPN y su derivada de cada renglón con el esquema de Horner.
+
+    Args:
+        flujos (numpy.ndarray): Matriz (créditos × periodos) de flujos de efectivo
+        tasa (numpy.ndarray): Tasa por periodo de cada crédito
+
+    Returns:
+        tuple: (vpn, derivada) como arreglos de NumPy
+    """
+    v = 1 / (1 + tasa)
+    vpn = np.zeros_like(tasa)
+    dvpn = np.zeros_like(tasa)
+    for columna in range(flujos.shape[1] - 1, -1, -1):
+        dvpn = dvpn * v + vpn
+        vpn = vpn * v + flujos[:, columna]
+    return vpn, -v * v * dvpn
+
+
+def _factor_pago(tasa, plazo):
+    """
+    Calcula el factor de pago de una anualidad: r(1+r)^n / ((1+r)^n - 1).
+
+    Para tasa cero el factor es 1/n.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crecimiento = np.power(1 + tasa, plazo)
+        factor = tasa * crecimiento / (crecimiento - 1)
+    return np.where(tasa == 0, 1 / plazo, factor)
+
+
+def _anualidad(tasa, plazo):
+    """
+    Calcula el valor presente de una anualidad unitaria y su derivada.
+
+    Args:
+        tasa (numpy.ndarray): Tasa por periodo
+        plazo (numpy.ndarray): Número de periodos
+
+    Returns:
+        tuple: (a, da/dtasa) con a = (1 - (1+r)^-n) / r
+    """
+    descuento = np.exp(-plazo * np.log1p(tasa))  # (1+r)^-n
+    pequena = np.abs(tasa) < _TASA_MINIMA_ANUALIDAD
+    r = np.where(pequena, 1.0, tasa)
+
+    anualidad = (1 - descuento) / r
+    derivada = (plazo * descuento / (1 + r) - anualidad) / r
+
+    # Expansión de primer orden alrededor de r = 0
+    anualidad = np.where(pequena, plazo - plazo * (plazo + 1) / 2 * tasa, anualidad)
+    derivada = np.where(pequena, -plazo * (plazo + 1) / 2, derivada)
+
+    return anualidad, derivada
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Malla Precalculada del CAT
+
+Este módulo construye, fuera de línea, una malla densa de valores del CAT para
+préstamos con pagos fijos mensuales sobre combinaciones de plazo × tasa ×
+comisión por apertura, y la guarda en un archivo binario que se abre con
+`numpy.memmap`. Las tablas publicitarias y los simuladores consultan la malla
+por interpolación multilineal, sin iteraciones del solucionador.
+
+Como el CAT de un préstamo con pagos fijos no depende de la escala del monto
+cuando los costos son proporcionales, la comisión por apertura se expresa como
+fracción del monto del crédito.
+
+Formato del archivo:
+    - 8 bytes: identificador `CATMALLA`
+    - 4 bytes: longitud del encabezado (entero sin signo, little-endian)
+    - encabezado JSON con la versión de la anualización del CAT
+      (`solver.VERSION_CAT`), los ejes y el factor de seguridad, rellenado con
+      espacios hasta un múltiplo de 64 bytes
+    - valores del CAT (float64, orden C) con forma (plazos, tasas, comisiones)
+    - cota de error por eje y celda (float64, orden C) con forma
+      (3, plazos - 1, tasas - 1, comisiones - 1)
+
+La interpolación multilineal es la composición de interpolaciones lineales por
+eje, así que su error en una celda está acotado por la suma, sobre los ejes,
+del error de la interpolación lineal en cada eje:
+
+    |f - I f| <= Σ_d h_d² / 8 · max |∂²f/∂x_d²|.
+
+Al construir la malla se guarda, para cada celda, una cota del error en cada
+eje, multiplicada por un factor de seguridad:
+
+    - Plazo: el CAT sólo está definido en meses enteros, así que el error de la
+      interpolación se mide exactamente en cada mes entero dentro de la celda,
+      sobre las aristas de la celda.
+    - Tasa y comisión: la curvatura se mide con la segunda diferencia en el
+      punto medio de cada arista paralela al eje (el error lineal en ese punto
+      es h² / 8 · f''), y la celda toma el mayor error de sus aristas y de las
+      de sus celdas vecinas en el eje, lo que cubre la variación de la
+      curvatura dentro de la celda.
+
+La consulta suma las cotas de los ejes en los que el punto cae dentro de la
+celda (en un nodo de la malla ese eje no interpola). A diferencia del error en
+el centro de la celda, la suma no se anula cuando las curvaturas de los ejes
+tienen signos opuestos. Cuando un punto cae fuera de la malla o la cota de su
+celda excede el error permitido, la consulta resuelve el CAT exacto.
+"""
+
+import bisect
+import json
+import struct
+
+import numpy as np
+
+from calculo_cat.lote import calcular_cat_lote
+from calculo_cat.solver import VERSION_CAT
+
+
+_IDENTIFICADOR = b"CATMALLA"
+_ALINEACION = 64
+
+
+def construir_malla(ruta, plazos, tasas, comisiones=(0.0,), factor_seguridad=1.25):
+    """
+    Calcula el CAT en todos los puntos de la malla y lo guarda en un archivo.
+
+    Args:
+        ruta (str): Archivo de salida
+        plazos (list): Plazos en meses enteros, en orden creciente
+        tasas (list): Tasas de interés anuales (en decimal), en orden creciente
+        comisiones (list, opcional): Comisiones por apertura como fracción del
+                      monto, en orden creciente
+        factor_seguridad (float, opcional): Factor aplicado al error medido en
+                      cada eje para obtener su cota
+
+    Returns:
+        float: Cota de error máxima de la malla (en puntos porcentuales del CAT)
+    """
+    ejes = [np.asarray(eje, dtype=float) for eje in (plazos, tasas, comisiones)]
+    for eje in ejes:
+        if eje.size < 1 or np.any(np.diff(eje) <= 0):
+            raise ValueError("Los ejes de la malla deben ser crecientes y no vacíos")
+    if np.any(ejes[0] != np.round(ejes[0])):
+        raise ValueError("Los plazos de la malla deben ser meses enteros")
+
+    valores = _cat_exacto(*np.meshgrid(*ejes, indexing="ij"))
+
+    # Cota del error de cada eje por celda
+    forma_cotas = tuple(max(eje.size - 1, 1) for eje in ejes)
+    cotas = np.zeros((len(ejes),) + forma_cotas)
+    if ejes[0].size > 1:
+        cotas[0] = _error_plazo(valores, ejes)
+    for eje in (1, 2):
+        if ejes[eje].size > 1:
+            cotas[eje] = _error_eje(valores, ejes, eje)
+    cotas *= factor_seguridad
+
+    encabezado = json.dumps({
+        "version": VERSION_CAT,
+        "plazos": ejes[0].tolist(),
+        "tasas": ejes[1].tolist(),
+        "comisiones": ejes[2].tolist(),
+        "factor_seguridad": factor_seguridad,
+    }).encode("utf-8")
+    relleno = -(len(_IDENTIFICADOR) + 4 + len(encabezado)) % _ALINEACION
+    encabezado += b" " * relleno
+
+    with open(ruta, "wb") as archivo:
+        archivo.write(_IDENTIFICADOR)
+        archivo.write(struct.pack("<I", len(encabezado)))
+        archivo.write(encabezado)
+        archivo.write(np.ascontiguousarray(valores, dtype="<f8").tobytes())
+        archivo.write(np.ascontiguousarray(cotas, dtype="<f8").tobytes())
+
+    return float(cotas.sum(axis=0).max())
+
+
+class MallaCAT:
+    """
+    Consulta de una malla precalculada del CAT mapeada en memoria.
+
+    Ejemplo:
+        >>> construir_malla("cat.malla", range(6, 61), np.linspace(0.1, 0.6, 51), np.linspace(0, 0.03, 7))
+        >>> malla = MallaCAT("cat.malla")
+        >>> malla.consultar(24, 0.245, 0.0125)   # interpolado, error menor a 0.01 puntos
+        >>> malla.interpoladas, malla.exactas
+        (1, 0)
+    """
+
+    def __init__(self, ruta):
+        """
+        Args:
+            ruta (str): Archivo creado con `construir_malla`
+        """
+        with open(ruta, "rb") as archivo:
+            if archivo.read(len(_IDENTIFICADOR)) != _IDENTIFICADOR:
+                raise ValueError(f"{ruta} no es un archivo de malla del CAT")
+            (longitud,) = struct.unpack("<I", archivo.read(4))
+            encabezado = json.loads(archivo.read(longitud).decode("utf-8"))
+        if encabezado.get("version") != VERSION_CAT:
+            raise ValueError(f"{ruta} se construyó con otra versión del cálculo del CAT "
+                             f"({encabezado.get('version')}, se espera {VERSION_CAT}); vuelve a construirla")
+
+        self.plazos = encabezado["plazos"]
+        self.tasas = encabezado["tasas"]
+        self.comisiones = encabezado["comisiones"]
+        self.factor_seguridad = encabezado["factor_seguridad"]
+
+        forma = (len(self.plazos), len(self.tasas), len(self.comisiones))
+        forma_cotas = (len(forma),) + tuple(max(n - 1, 1) for n in forma)
+        desplazamiento = len(_IDENTIFICADOR) + 4 + longitud
+
+        # Vistas ndarray del mapeo en memoria: evitan el costo de indexar un memmap
+        self.valores = np.memmap(ruta, dtype="<f8", mode="r", offset=desplazamiento,
+                                 shape=forma).view(np.ndarray)
+        self.cotas = np.memmap(ruta, dtype="<f8", mode="r",
+                               offset=desplazamiento + self.valores.nbytes,
+                               shape=forma_cotas).view(np.ndarray)
+
+        self.interpoladas = 0
+        self.exactas = 0
+
+    def consultar(self, plazo_meses, tasa_interes_anual, comision_porcentaje=0.0, error_maximo=0.01):
+        """
+        Obtiene el CAT por interpolación, o lo resuelve si la malla no alcanza
+        la precisión requerida.
+
+        Args:
+            plazo_meses (int): Plazo del crédito en meses
+            tasa_interes_anual (float): Tasa de interés anual (en decimal)
+            comision_porcentaje (float, opcional): Comisión por apertura como fracción del monto
+            error_maximo (float, opcional): Error permitido en puntos porcentuales del CAT
+
+        Returns:
+            float: CAT expresado como porcentaje anual
+        """
+        punto = (plazo_meses, tasa_interes_anual, comision_porcentaje)
+        celdas = []
+        for valor, eje in zip(punto, (self.plazos, self.tasas, self.comisiones)):
+            celda = _ubicar(eje, valor)
+            if celda is None:
+                return self._exacto(*punto)
+            celdas.append(celda)
+
+        (i, pi), (j, pj), (k, pk) = celdas
+        cotas = self.cotas[:, min(i, self.cotas.shape[1] - 1), min(j, self.cotas.shape[2] - 1),
+                           min(k, self.cotas.shape[3] - 1)]
+        cota = sum(float(cota) for cota, posicion in zip(cotas, (pi, pj, pk)) if 0 < posicion < 1)
+        if cota > error_maximo:
+            return self._exacto(*punto)
+
+        # Interpolación multilineal entre las esquinas de la celda
+        cat = 0.0
+        for di, wi in ((0, 1 - pi), (1, pi)):
+            if wi == 0:
+                continue
+            for dj, wj in ((0, 1 - pj), (1, pj)):
+                if wj == 0:
+                    continue
+                for dk, wk in ((0, 1 - pk), (1, pk)):
+                    if wk == 0:
+                        continue
+                    cat += wi * wj * wk * float(self.valores[i + di, j + dj, k + dk])
+
+        self.interpoladas += 1
+        return cat
+
+    def _exacto(self, plazo_meses, tasa_interes_anual, comision_porcentaje):
+        """Resuelve el CAT exacto para un punto fuera de la malla."""
+        self.exactas += 1
+        return float(_cat_exacto(plazo_meses, tasa_interes_anual, comision_porcentaje))
+
+
+def _cat_exacto(plazo_meses, tasa_interes_anual, comision_porcentaje):
+    """
+    Calcula el CAT exacto de un préstamo unitario con la semántica de
+    `prestamo_personal_basico.calcular_cat`.
+    """
+    resultado = calcular_cat_lote(
+        monto_credito=1.0,
+        plazo_meses=plazo_meses,
+        tasa_interes_anual=tasa_interes_anual,
+        comision_apertura=comision_porcentaje,
+    )
+    return resultado.cat
+
+
+def _error_plazo(valores, ejes):
+    """
+    Error de la interpolación lineal en el plazo, por celda: el mayor error en
+    los meses enteros dentro de cada celda, sobre las aristas de la celda.
+
+    Returns:
+        numpy.ndarray: Error por celda, con la forma de las cotas
+    """
+    plazos = ejes[0]
+    meses = np.arange(plazos[0], plazos[-1] + 1)
+    exacto = _cat_exacto(*np.meshgrid(meses, ejes[1], ejes[2], indexing="ij"))
+
+    # Interpolación lineal en el plazo entre los nodos de la malla
+    celda = np.minimum(np.searchsorted(plazos, meses, side="right") - 1, plazos.size - 2)
+    posicion = ((meses - plazos[celda]) / (plazos[celda + 1] - plazos[celda]))[:, np.newaxis, np.newaxis]
+    interpolado = (1 - posicion) * valores[celda] + posicion * valores[celda + 1]
+
+    error = np.zeros((plazos.size - 1,) + valores.shape[1:])
+    np.maximum.at(error, celda, np.abs(exacto - interpolado))
+    return _maximo_esquinas(error, 0)
+
+
+def _maximo_esquinas(error, eje):
+    """Máximo de un error por arista sobre las esquinas de cada celda en los demás ejes."""
+    for otro in range(error.ndim):
+        if otro != eje and error.shape[otro] > 1:
+            error = np.maximum(np.take(error, np.arange(error.shape[otro] - 1), axis=otro),
+                               np.take(error, np.arange(1, error.shape[otro]), axis=otro))
+    return error
+
+
+def _error_eje(valores, ejes, eje):
+    """
+    Error de la interpolación lineal a lo largo de un eje, por celda.
+
+    El CAT exacto en el punto medio de cada arista paralela al eje se compara
+    con el promedio de sus extremos. Cada celda toma el mayor error de sus
+    aristas (el máximo sobre las esquinas en los demás ejes) y de las celdas
+    vecinas en el mismo eje, que cubre la variación de la curvatura dentro de
+    la celda.
+
+    Returns:
+        numpy.ndarray: Error por celda, con la forma de las cotas
+    """
+    medios = [eje_d if d != eje else (eje_d[:-1] + eje_d[1:]) / 2 for d, eje_d in enumerate(ejes)]
+    exacto = _cat_exacto(*np.meshgrid(*medios, indexing="ij"))
+    inicio = np.take(valores, np.arange(valores.shape[eje] - 1), axis=eje)
+    fin = np.take(valores, np.arange(1, valores.shape[eje]), axis=eje)
+    error = _maximo_esquinas(np.abs(exacto - (inicio + fin) / 2), eje)
+
+    # Máximo con las celdas vecinas en el mismo eje
+    vecinos = error.copy()
+    if error.shape[eje] > 1:
+        anterior = [slice(None)] * error.ndim
+        siguiente = [slice(None)] * error.ndim
+        anterior[eje], siguiente[eje] = slice(None, -1), slice(1, None)
+        np.maximum(vecinos[tuple(siguiente)], error[tuple(anterior)], out=vecinos[tuple(siguiente)])
+        np.maximum(vecinos[tuple(anterior)], error[tuple(siguiente)], out=vecinos[tuple(anterior)])
+    return vecinos
+
+
+def _ubicar(eje, valor):
+    """
+    Ubica un valor dentro de un eje ordenado.
+
+    Returns:
+        tuple: (índice de la celda, posición relativa en [0, 1]), o None si el
+        valor está fuera del eje
+    """
+    if valor < eje[0] or valor > eje[-1]:
+        return None
+    if len(eje) == 1:
+        return 0, 0.0
+    indice = min(bisect.bisect_right(eje, valor) - 1, len(eje) - 2)
+    return indice, (valor - eje[indice]) / (eje[indice + 1] - eje[indice])
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Recálculo Paralelo de Carteras con Memoria Compartida
+
+Este módulo reparte el cálculo del CAT de una cartera entre varios procesos.
+Los parámetros de los créditos se copian una sola vez a un bloque de
+`multiprocessing.shared_memory`; cada tarea del grupo de procesos recibe sólo
+el nombre del bloque y el rango de filas que le toca, resuelve su bloque con
+`calcular_cat_productos` y escribe los resultados directamente en los arreglos
+de salida compartidos. No se serializa ninguna fila, y como cada bloque escribe
+en un rango disjunto, los resultados quedan en el orden de entrada y no
+dependen del número de procesos.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from calculo_cat.productos import COLUMNAS_PRODUCTO, ResultadoProductos, calcular_cat_productos, validar_productos
+
+
+TAMANO_BLOQUE = 50_000
+
+# Código numérico de cada producto dentro de la memoria compartida
+_PRODUCTOS = tuple(COLUMNAS_PRODUCTO)
+
+
+class EjecutorParalelo:
+    """
+    Grupo de procesos para recalcular el CAT de carteras completas.
+
+    Ejemplo:
+        >>> with EjecutorParalelo(procesos=8, tamano_bloque=50_000) as ejecutor:
+        ...     resultado = ejecutor.calcular(producto, columnas)
+    """
+
+    def __init__(self, procesos=None, tamano_bloque=TAMANO_BLOQUE):
+        """
+        Args:
+            procesos (int, opcional): Número de procesos; por omisión, el número de CPUs
+            tamano_bloque (int, opcional): Filas por tarea
+        """
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tamano_bloque = tamano_bloque
+        self._grupo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excinfo):
+        self.cerrar()
+
+    def cerrar(self):
+        """Termina los procesos del grupo."""
+        if self._grupo is not None:
+            self._grupo.shutdown()
+            self._grupo = None
+
+    def calcular(self, producto, columnas):
+        """
+        Calcula el CAT de un lote de créditos de distintos productos en paralelo.
+
+        Args:
+            producto (array_like): Producto de cada crédito: "personal", "automotriz"
+                          o "revolvente"
+            columnas (dict): Arreglos por nombre de parámetro, uno por crédito
+
+        Returns:
+            calculo_cat.productos.ResultadoProductos: CAT, iteraciones y
+            convergencia de cada crédito, en el orden de entrada
+
+        Raises:
+            ValueError: Si algún crédito tiene un producto desconocido
+        """
+        producto = validar_productos(producto)
+        filas = producto.size
+
+        # Lotes pequeños o un solo proceso: no vale la pena repartir
+        if self.procesos == 1 or filas <= self.tamano_bloque:
+            return calcular_cat_productos(producto, columnas)
+
+        nombres = sorted(columnas)
+        codigos = np.full(filas, -1.0)
+        for codigo, nombre in enumerate(_PRODUCTOS):
+            codigos[producto == nombre] = codigo
+
+        entrada = _crear_memoria((len(nombres) + 1) * filas * 8)
+        salida = _crear_memoria(filas * (8 + 8 + 1))
+        try:
+            parametros = np.ndarray((len(nombres) + 1, filas), dtype=np.float64, buffer=entrada.buf)
+            parametros[0] = codigos
+            for renglon, nombre in enumerate(nombres, start=1):
+                parametros[renglon] = np.asarray(columnas[nombre], dtype=float)
+
+            tareas = [
+                self._obtener_grupo().submit(_calcular_bloque, entrada.name, salida.name,
+                                             nombres, filas, inicio, min(inicio + self.tamano_bloque, filas))
+                for inicio in range(0, filas, self.tamano_bloque)
+            ]
+            for tarea in tareas:
+                tarea.result()
+
+            cat, iteraciones, convergido = _vistas_salida(salida, filas)
+            resultado = ResultadoProductos(cat.copy(), iteraciones.copy(), convergido.copy())
+            del parametros, cat, iteraciones, convergido
+        finally:
+            for memoria in (entrada, salida):
+                memoria.close()
+                memoria.unlink()
+
+        return resultado
+
+    def _obtener_grupo(self):
+        """Crea el grupo de procesos la primera vez que se necesita."""
+        if self._grupo is None:
+            self._grupo = ProcessPoolExecutor(max_workers=self.procesos)
+        return self._grupo
+
+
+def calcular_cat_paralelo(producto, columnas, procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Calcula el CAT de un lote de créditos en paralelo con un grupo de procesos temporal.
+
+    Args:
+        producto (array_like): Producto de cada crédito
+        columnas (dict): Arreglos por nombre de parámetro, uno por crédito
+        procesos (int, opcional): Número de procesos; por omisión, el número de CPUs
+        tamano_bloque (int, opcional): Filas por tarea
+
+    Returns:
+        calculo_cat.productos.ResultadoProductos: Resultados en el orden de entrada
+    """
+    with EjecutorParalelo(procesos=procesos, tamano_bloque=tamano_bloque) as ejecutor:
+        return ejecutor.calcular(producto, columnas)
+
+
+def _calcular_bloque(nombre_entrada, nombre_salida, nombres, filas, inicio, fin):
+    """
+    Resuelve un bloque de filas dentro de un proceso del grupo.
+
+    Lee los parámetros de la memoria compartida de entrada y escribe los
+    resultados en el rango [inicio, fin) de la memoria compartida de salida.
+    """
+    entrada = _abrir_memoria(nombre_entrada)
+    salida = _abrir_memoria(nombre_salida)
+    try:
+        parametros = np.ndarray((len(nombres) + 1, filas), dtype=np.float64, buffer=entrada.buf)
+        codigos = parametros[0, inicio:fin].astype(np.int64)
+        producto = np.array(_PRODUCTOS + ("",))[codigos]
+        columnas = {nombre: parametros[renglon, inicio:fin]
+                    for renglon, nombre in enumerate(nombres, start=1)}
+
+        resultado = calcular_cat_productos(producto, columnas)
+
+        cat, iteraciones, convergido = _vistas_salida(salida, filas)
+        cat[inicio:fin] = resultado.cat
+        iteraciones[inicio:fin] = resultado.iteraciones
+        convergido[inicio:fin] = resultado.convergido
+        del parametros, columnas, cat, iteraciones, convergido
+    finally:
+        entrada.close()
+        salida.close()
+
+
+def _vistas_salida(memoria, filas):
+    """Vistas de NumPy del CAT, las iteraciones y la convergencia en la memoria de salida."""
+    cat = np.ndarray(filas, dtype=np.float64, buffer=memoria.buf)
+    iteraciones = np.ndarray(filas, dtype=np.int64, buffer=memoria.buf, offset=filas * 8)
+    convergido = np.ndarray(filas, dtype=np.bool_, buffer=memoria.buf, offset=filas * 16)
+    return cat, iteraciones, convergido
+
+
+def _crear_memoria(tamano):
+    """Crea un bloque de memoria compartida de al menos un byte."""
+    return shared_memory.SharedMemory(create=True, size=max(tamano, 1))
+
+
+def _abrir_memoria(nombre):
+    """
+    Abre un bloque de memoria compartida creado por el proceso principal.
+
+    Los procesos del grupo comparten el `resource_tracker` del proceso
+    principal, que es el único que libera el bloque con `unlink`.
+    """
+    return shared_memory.SharedMemory(name=nombre)
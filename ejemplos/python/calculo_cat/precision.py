@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Modo de Precisión del CAT
+
+Este módulo calcula un CAT reproducible hasta el decimal publicado, sin resolver
+toda la TIR en aritmética decimal:
+
+    1. La TIR se resuelve en float64 con `calcular_tir` y se refina con Newton
+       sumando los términos del VPN con suma compensada (Neumaier), que no
+       pierde precisión cuando el desembolso y los pagos se cancelan en
+       calendarios largos con saldos altos.
+    2. La raíz se pule con una o dos iteraciones en `decimal.Decimal` con la
+       precisión indicada. El VPN se evalúa por segmentos con la fórmula cerrada
+       de la serie geométrica y la derivada se toma del paso en float64, por lo
+       que cada iteración gana unas trece cifras.
+    3. Una última evaluación del VPN en decimal acota el error de la raíz, y el
+       CAT se redondea al decimal publicado verificando que el error no pueda
+       cambiar el redondeo.
+
+El costo es una pequeña constante sobre la ruta rápida: unas cuantas
+evaluaciones del VPN en decimal por segmento, no una solución completa.
+
+Ejemplo:
+    >>> resultado = calcular_cat_preciso(EsquemaFlujos.desde_prestamo(50000, 24, 0.24, 1000))
+    >>> resultado.cat_publicado, resultado.verificado
+    (Decimal('29.5'), True)
+"""
+
+import math
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal, localcontext
+
+from calculo_cat.flujos import FlujosSegmentados
+from calculo_cat.solver import calcular_tir
+
+# Cifras significativas de la aritmética decimal
+DIGITOS = 34
+
+# Decimales y regla de redondeo del CAT publicado
+DECIMALES_PUBLICACION = 1
+REDONDEO_PUBLICACION = ROUND_HALF_UP
+
+# Iteraciones máximas del refinamiento con suma compensada
+_ITERACIONES_COMPENSADAS = 3
+
+ResultadoPreciso = namedtuple("ResultadoPreciso", ["cat", "cat_publicado", "tasa", "error", "verificado"])
+ResultadoPreciso.__doc__ = """
+Resultado del cálculo del CAT en modo de precisión.
+
+Atributos:
+    cat (Decimal): CAT expresado como porcentaje anual, con todas las cifras de la
+                  aritmética decimal
+    cat_publicado (Decimal): CAT redondeado para su publicación
+    tasa (Decimal): TIR por periodo pulida
+    error (Decimal): Cota estimada del error del CAT, en puntos porcentuales
+    verificado (bool): Indica si el error no puede cambiar el CAT publicado
+"""
+
+
+def suma_neumaier(valores):
+    """
+    Suma compensada de Neumaier.
+
+    Acumula por separado el error de redondeo de cada suma, incluso cuando el
+    sumando es mayor que el acumulado, por lo que el resultado no depende del
+    orden de los términos ni de las cancelaciones entre ellos.
+
+    Args:
+        valores (iterable): Valores a sumar
+
+    Returns:
+        float: Suma compensada
+    """
+    suma = 0.0
+    compensacion = 0.0
+    for valor in valores:
+        total = suma + valor
+        if abs(suma) >= abs(valor):
+            compensacion += (suma - total) + valor
+        else:
+            compensacion += (valor - total) + suma
+        suma = total
+    return suma + compensacion
+
+
+def vpn_y_derivada_compensados(flujos, tasa):
+    """
+    Calcula el VPN y su derivada sumando los términos con suma compensada.
+
+    Cada segmento de pagos iguales aporta un término evaluado en forma cerrada;
+    una lista aporta un término por periodo.
+
+    Args:
+        flujos (list, FlujosSegmentados o EsquemaFlujos): Flujos de efectivo
+        tasa (float): Tasa de descuento por periodo
+
+    Returns:
+        tuple: (vpn, derivada) calculados
+    """
+    terminos = [FlujosSegmentados([segmento]).vpn_y_derivada(tasa) for segmento in _segmentos(flujos).segmentos]
+    return suma_neumaier(vpn for vpn, _ in terminos), suma_neumaier(derivada for _, derivada in terminos)
+
+
+def redondear_cat(cat, decimales=DECIMALES_PUBLICACION, redondeo=REDONDEO_PUBLICACION):
+    """
+    Redondea un CAT para su publicación.
+
+    Un CAT en float se convierte a decimal con su representación más corta (la
+    que se imprime), no con su valor binario exacto.
+
+    Args:
+        cat (float o Decimal): CAT expresado como porcentaje anual
+        decimales (int, opcional): Decimales del CAT publicado
+        redondeo (str, opcional): Regla de redondeo del módulo `decimal`
+
+    Returns:
+        Decimal: CAT redondeado
+    """
+    if not isinstance(cat, Decimal):
+        cat = Decimal(repr(float(cat)))
+    return cat.quantize(Decimal(1).scaleb(-decimales), rounding=redondeo)
+
+
+def calcular_cat_preciso(flujos, tasa_inicial=0.01, digitos=DIGITOS, iteraciones_decimal=1,
+                         decimales=DECIMALES_PUBLICACION, redondeo=REDONDEO_PUBLICACION):
+    """
+    Calcula el CAT en modo de precisión: TIR en float64 con suma compensada,
+    pulida y verificada en aritmética decimal, y redondeada para su publicación.
+
+    Args:
+        flujos (list, FlujosSegmentados o EsquemaFlujos): Flujos de efectivo, donde el
+                      primer elemento ocurre en el periodo 0; los periodos son
+                      mensuales salvo que el esquema indique su `periodicidad`
+        tasa_inicial (float, opcional): Estimación inicial de la TIR por periodo
+        digitos (int, opcional): Cifras significativas de la aritmética decimal
+        iteraciones_decimal (int, opcional): Iteraciones de Newton en decimal
+        decimales (int, opcional): Decimales del CAT publicado
+        redondeo (str, opcional): Regla de redondeo del módulo `decimal`
+
+    Returns:
+        ResultadoPreciso: CAT, CAT publicado, TIR, cota del error y verificación
+    """
+    segmentos = _segmentos(flujos)
+
+    # 1. Ruta rápida y refinamiento con suma compensada
+    tasa = calcular_tir(flujos, tasa_inicial=tasa_inicial)
+    derivada = 0.0
+    for _ in range(_ITERACIONES_COMPENSADAS):
+        vpn, derivada = vpn_y_derivada_compensados(segmentos, tasa)
+        if derivada == 0 or not math.isfinite(vpn):
+            break
+        paso = vpn / derivada
+        tasa -= paso
+        if abs(paso) <= 4 * math.ulp(tasa):
+            break
+    if derivada == 0 or not math.isfinite(tasa):
+        raise ValueError("La TIR no está determinada para estos flujos")
+
+    with localcontext() as contexto:
+        contexto.prec = digitos
+        derivada = Decimal(derivada)
+
+        # 2. Pulido con Newton en decimal, con la derivada en float64
+        tasa = Decimal(tasa)
+        for _ in range(iteraciones_decimal):
+            tasa -= _vpn_decimal(segmentos, tasa) / derivada
+
+        # 3. Verificación: cota del error a partir del VPN en la raíz pulida
+        # CAT efectivo anual (§1.2); el error se propaga con su derivada k·(1 + r)^(k-1)·100
+        periodicidad = getattr(flujos, "periodicidad", 12)
+        cat = ((1 + tasa) ** periodicidad - 1) * 100
+        error = (abs(_vpn_decimal(segmentos, tasa) / derivada)
+                 * periodicidad * 100 * (1 + tasa) ** (periodicidad - 1))
+
+        cat_publicado = redondear_cat(cat, decimales, redondeo)
+        distancia = Decimal(1).scaleb(-decimales) / 2 - abs(cat - cat_publicado)
+        return ResultadoPreciso(+cat, cat_publicado, +tasa, error, error < distancia)
+
+
+def _segmentos(flujos):
+    """Segmentos (inicio, longitud, monto) de los flujos."""
+    if isinstance(flujos, FlujosSegmentados):
+        return flujos
+    if isinstance(flujos, list):
+        return FlujosSegmentados.desde_lista(flujos)
+    a_lista = getattr(flujos, "a_lista", None)
+    if a_lista is None:
+        raise TypeError(f"Flujos no soportados: {type(flujos).__name__}")
+    return FlujosSegmentados.desde_lista(a_lista())
+
+
+def _vpn_decimal(segmentos, tasa):
+    """
+    VPN en aritmética decimal, segmento por segmento:
+    Σ vⁱ desde i = s hasta s + L - 1 es v^s·(1 - v^L) / (1 - v).
+    """
+    v = 1 / (1 + tasa)
+    vpn = Decimal(0)
+    for inicio, longitud, monto in segmentos.segmentos:
+        if tasa == 0:
+            suma = Decimal(longitud)
+        else:
+            suma = v ** inicio * (1 - v ** longitud) / (1 - v)
+        vpn += Decimal(monto) * suma
+    return vpn
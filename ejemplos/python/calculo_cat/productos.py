@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculo del CAT por Lotes para Carteras con Varios Productos
+
+Este módulo reparte un lote de créditos de distintos productos (préstamo
+personal, crédito automotriz y crédito revolvente) entre los solucionadores
+por lotes correspondientes, a partir de columnas de NumPy con los mismos
+nombres que los parámetros de las funciones `calcular_cat` de cada ejemplo.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from calculo_cat.lote import calcular_cat_lote
+from calculo_cat.revolvente import calcular_cat_revolvente_lote
+
+
+# Columnas de cada producto: (obligatorias, opcionales con valor por omisión)
+COLUMNAS_PRODUCTO = {
+    "personal": (
+        ("monto_credito", "plazo_meses", "tasa_interes_anual"),
+        {"comision_apertura": 0.0, "comisiones_mensuales": 0.0, "seguro": 0.0, "otros_costos": 0.0,
+         "periodicidad": 12.0},
+    ),
+    "automotriz": (
+        ("precio_vehiculo", "enganche", "plazo_meses", "tasa_interes_anual"),
+        {"comision_apertura": 0.0, "comisiones_mensuales": 0.0, "seguro_auto": 0.0,
+         "seguro_vida": 0.0, "gps": 0.0, "otros_costos": 0.0},
+    ),
+    "revolvente": (
+        ("monto_linea_credito", "tasa_interes_anual"),
+        {"comision_anual": 0.0, "pago_minimo_porcentaje": 0.05, "otros_cargos_mensuales": 0.0},
+    ),
+}
+
+ResultadoProductos = namedtuple("ResultadoProductos", ["cat", "iteraciones", "convergido"])
+ResultadoProductos.__doc__ = """
+Resultado del cálculo del CAT para un lote con varios productos, en el orden
+de entrada.
+
+Atributos:
+    cat (numpy.ndarray): CAT de cada crédito
+    iteraciones (numpy.ndarray): Iteraciones de Newton-Raphson por crédito
+    convergido (numpy.ndarray): Indica si el método convergió para cada crédito
+"""
+
+
+def calcular_cat_productos(producto, columnas):
+    """
+    Calcula el CAT de un lote de créditos de distintos productos.
+
+    Args:
+        producto (array_like): Producto de cada crédito: "personal", "automotriz"
+                      o "revolvente"
+        columnas (dict): Arreglos por nombre de parámetro, uno por crédito. Los
+                      valores faltantes (NaN) de las columnas opcionales toman su
+                      valor por omisión
+
+    Returns:
+        ResultadoProductos: Arreglos con el CAT, las iteraciones y la
+        convergencia de cada crédito, en el orden de entrada
+
+    Raises:
+        ValueError: Si algún crédito tiene un producto desconocido
+    """
+    producto = validar_productos(producto)
+    filas = producto.size
+
+    cat = np.full(filas, np.nan)
+    iteraciones = np.zeros(filas, dtype=np.int64)
+    convergido = np.zeros(filas, dtype=bool)
+
+    for nombre in COLUMNAS_PRODUCTO:
+        indices = np.flatnonzero(producto == nombre)
+        if indices.size == 0:
+            continue
+        parametros = columnas_producto(nombre, columnas, indices)
+        resultado = _CALCULO_PRODUCTO[nombre](**parametros)
+        cat[indices] = resultado.cat
+        iteraciones[indices] = resultado.iteraciones
+        convergido[indices] = resultado.convergido
+
+    return ResultadoProductos(cat, iteraciones, convergido)
+
+
+def validar_productos(producto, primera_fila=1):
+    """
+    Normaliza los productos de un lote y rechaza los desconocidos.
+
+    Args:
+        producto (array_like): Producto de cada crédito
+        primera_fila (int, opcional): Número de fila del primer crédito, para
+                      el mensaje de error
+
+    Returns:
+        numpy.ndarray: Productos en minúsculas
+
+    Raises:
+        ValueError: Con la fila del primer crédito cuyo producto no está en
+        `COLUMNAS_PRODUCTO`
+    """
+    producto = np.char.lower(np.asarray(producto, dtype=str))
+    desconocidos = np.flatnonzero(~np.isin(producto, list(COLUMNAS_PRODUCTO)))
+    if desconocidos.size:
+        indice = desconocidos[0]
+        raise ValueError(f"Producto desconocido '{producto[indice]}' en la fila {primera_fila + indice} "
+                         f"(se esperaba {', '.join(COLUMNAS_PRODUCTO)})")
+    return producto
+
+
+def columnas_producto(nombre, columnas, indices):
+    """
+    Extrae los parámetros de un producto para los créditos indicados.
+
+    Args:
+        nombre (str): Producto
+        columnas (dict): Arreglos por nombre de parámetro
+        indices (numpy.ndarray): Créditos del producto
+
+    Returns:
+        dict: Parámetros del producto como arreglos de NumPy
+    """
+    obligatorias, opcionales = COLUMNAS_PRODUCTO[nombre]
+    parametros = {}
+    for columna in obligatorias:
+        if columna not in columnas:
+            raise ValueError(f"Falta la columna '{columna}' para el producto '{nombre}'")
+        parametros[columna] = np.asarray(columnas[columna], dtype=float)[indices]
+    for columna, valor_omision in opcionales.items():
+        if columna in columnas:
+            valores = np.asarray(columnas[columna], dtype=float)[indices]
+            parametros[columna] = np.where(np.isnan(valores), valor_omision, valores)
+        else:
+            parametros[columna] = np.full(indices.size, valor_omision)
+    return parametros
+
+
+def _calcular_personal(monto_credito, plazo_meses, tasa_interes_anual, comision_apertura,
+                       comisiones_mensuales, seguro, otros_costos, periodicidad):
+    """Préstamo personal con pagos fijos de periodicidad semanal a mensual."""
+    return calcular_cat_lote(monto_credito, plazo_meses, tasa_interes_anual, comision_apertura,
+                             comisiones_mensuales, seguro, otros_costos, periodicidad)
+
+
+def _calcular_automotriz(precio_vehiculo, enganche, plazo_meses, tasa_interes_anual,
+                         comision_apertura, comisiones_mensuales, seguro_auto, seguro_vida,
+                         gps, otros_costos):
+    """Crédito automotriz: todos los cargos mensuales se suman al pago periódico."""
+    return calcular_cat_lote(
+        monto_credito=precio_vehiculo - enganche,
+        plazo_meses=plazo_meses,
+        tasa_interes_anual=tasa_interes_anual,
+        comision_apertura=comision_apertura,
+        comisiones_mensuales=comisiones_mensuales + seguro_auto + seguro_vida + gps,
+        otros_costos=otros_costos,
+    )
+
+
+def _calcular_revolvente(monto_linea_credito, tasa_interes_anual, comision_anual,
+                         pago_minimo_porcentaje, otros_cargos_mensuales):
+    """Crédito revolvente según la Circular 9/2015."""
+    return calcular_cat_revolvente_lote(monto_linea_credito, tasa_interes_anual, comision_anual,
+                                        pago_minimo_porcentaje, otros_cargos_mensuales)
+
+
+_CALCULO_PRODUCTO = {
+    "personal": _calcular_personal,
+    "automotriz": _calcular_automotriz,
+    "revolvente": _calcular_revolvente,
+}
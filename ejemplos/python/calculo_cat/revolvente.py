@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Simulación por Lotes de Créditos Revolventes según Circular 9/2015
+
+Este módulo simula simultáneamente muchas configuraciones de tarjetas de
+crédito (tasa, pago mínimo, anualidad, monto de línea) con los supuestos de
+la Circular 9/2015, usando arreglos de NumPy preasignados de longitud fija:
+37 periodos (el inicial más 36 meses) por configuración.
+
+En cada periodo el flujo es neto: el pago recibido menos la nueva disposición,
+ya que ambos ocurren al final del mismo periodo. La semántica coincide con
+`credito_revolvente.calcular_cat_revolvente`.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from calculo_cat.lote import calcular_tir_matriz
+from calculo_cat.solver import anualizar_tasa
+
+
+# Plazo fijo de 36 meses según Circular 9/2015
+PLAZO_MESES = 36
+
+ResultadoRevolvente = namedtuple(
+    "ResultadoRevolvente",
+    ["cat", "iteraciones", "convergido", "flujos", "saldo", "interes", "pago", "disposicion"],
+)
+ResultadoRevolvente.__doc__ = """
+Resultado de la simulación por lotes de créditos revolventes.
+
+El CAT, las iteraciones y la convergencia tienen la forma combinada (por
+broadcasting) de los parámetros; los arreglos por periodo agregan un último eje
+de longitud 37, cuyo elemento 0 corresponde a la disposición inicial.
+
+Atributos:
+    cat (numpy.ndarray): CAT de cada configuración expresado como porcentaje anual
+    iteraciones (numpy.ndarray): Iteraciones de Newton-Raphson por configuración
+    convergido (numpy.ndarray): Indica si el método convergió para cada configuración
+    flujos (numpy.ndarray): Flujo neto de cada periodo (perspectiva de la institución)
+    saldo (numpy.ndarray): Saldo al final de cada periodo
+    interes (numpy.ndarray): Intereses generados en cada periodo
+    pago (numpy.ndarray): Pago total recibido en cada periodo
+    disposicion (numpy.ndarray): Nueva disposición al final de cada periodo
+"""
+
+
+def simular_revolvente_lote(monto_linea_credito, tasa_interes_anual, comision_anual=0,
+                            pago_minimo_porcentaje=0.05, otros_cargos_mensuales=0,
+                            pago_minimo_fijo=100):
+    """
+    Simula los 36 meses de un lote de créditos revolventes.
+
+    Cada argumento puede ser un escalar o un arreglo; todos se combinan con las
+    reglas de broadcasting de NumPy, lo que permite barrer mallas de
+    tasa × pago mínimo × anualidad × monto de línea en una sola llamada.
+
+    Args:
+        monto_linea_credito (array_like): Monto de la línea de crédito en pesos
+        tasa_interes_anual (array_like): Tasa de interés anual (en decimal)
+        comision_anual (array_like, opcional): Comisión anual (en pesos)
+        pago_minimo_porcentaje (array_like, opcional): Porcentaje del saldo para pago mínimo (decimal)
+        otros_cargos_mensuales (array_like, opcional): Otros cargos mensuales fijos (en pesos)
+        pago_minimo_fijo (array_like, opcional): Monto mínimo del pago mínimo (en pesos)
+
+    Returns:
+        tuple: (flujos, saldo, interes, pago, disposicion), cada uno con la forma
+        combinada de los parámetros más un último eje de 37 periodos
+    """
+    parametros = np.broadcast_arrays(
+        *(np.asarray(valor, dtype=float) for valor in (
+            monto_linea_credito, tasa_interes_anual, comision_anual,
+            pago_minimo_porcentaje, otros_cargos_mensuales, pago_minimo_fijo)))
+    forma = parametros[0].shape
+    (monto_linea_credito, tasa_interes_anual, comision_anual, pago_minimo_porcentaje,
+     otros_cargos_mensuales, pago_minimo_fijo) = (np.ravel(valor) for valor in parametros)
+
+    configuraciones = monto_linea_credito.size
+    periodos = PLAZO_MESES + 1
+
+    # Arreglos preasignados de longitud fija
+    flujos = np.empty((configuraciones, periodos))
+    saldo = np.empty((configuraciones, periodos))
+    interes = np.zeros((configuraciones, periodos))
+    pago = np.zeros((configuraciones, periodos))
+    disposicion = np.zeros((configuraciones, periodos))
+
+    # Convertir tasa anual a mensual
+    tasa_mensual = tasa_interes_anual / 12
+
+    # Disposición inicial del monto total de la línea
+    flujos[:, 0] = -monto_linea_credito
+    saldo[:, 0] = monto_linea_credito
+
+    for mes in range(1, periodos):
+        saldo_anterior = saldo[:, mes - 1]
+
+        # Intereses y pago mínimo del periodo
+        intereses = saldo_anterior * tasa_mensual
+        pago_minimo = np.maximum(saldo_anterior * pago_minimo_porcentaje, pago_minimo_fijo)
+
+        # Pago total del periodo (comisión anual al final de cada 12 meses)
+        pago_total = pago_minimo + otros_cargos_mensuales
+        if mes % 12 == 0:
+            pago_total = pago_total + comision_anual
+
+        nuevo_saldo = saldo_anterior + intereses - pago_minimo
+
+        if mes == PLAZO_MESES:
+            # En el último mes se amortiza todo el saldo restante
+            pago_total = pago_total + nuevo_saldo
+            nuevo_saldo = np.zeros(configuraciones)
+            nueva_disposicion = np.zeros(configuraciones)
+        else:
+            # Nueva disposición: lo que se pagó del principal (no los intereses)
+            nueva_disposicion = np.maximum(pago_minimo - intereses, 0)
+            nuevo_saldo = nuevo_saldo + nueva_disposicion
+
+        interes[:, mes] = intereses
+        pago[:, mes] = pago_total
+        disposicion[:, mes] = nueva_disposicion
+        saldo[:, mes] = nuevo_saldo
+        flujos[:, mes] = pago_total - nueva_disposicion
+
+    forma_periodos = forma + (periodos,)
+    return tuple(arreglo.reshape(forma_periodos) for arreglo in (flujos, saldo, interes, pago, disposicion))
+
+
+def calcular_cat_revolvente_lote(monto_linea_credito, tasa_interes_anual, comision_anual=0,
+                                 pago_minimo_porcentaje=0.05, otros_cargos_mensuales=0,
+                                 pago_minimo_fijo=100, tolerancia=1e-10, max_iteraciones=1000):
+    """
+    Calcula el CAT para un lote de créditos revolventes según la Circular 9/2015.
+
+    Acepta los mismos parámetros que `simular_revolvente_lote`.
+
+    Returns:
+        ResultadoRevolvente: CAT, iteraciones, convergencia y arreglos por periodo
+    """
+    flujos, saldo, interes, pago, disposicion = simular_revolvente_lote(
+        monto_linea_credito, tasa_interes_anual, comision_anual,
+        pago_minimo_porcentaje, otros_cargos_mensuales, pago_minimo_fijo)
+
+    forma = flujos.shape[:-1]
+
+    # La tasa nominal mensual es un punto de partida cercano a la TIR
+    tasa_inicial = np.broadcast_to(np.asarray(tasa_interes_anual, dtype=float) / 12, forma)
+    tasa, iteraciones, convergido = calcular_tir_matriz(
+        flujos.reshape(-1, flujos.shape[-1]), tasa_inicial=tasa_inicial.ravel(),
+        tolerancia=tolerancia, max_iteraciones=max_iteraciones)
+
+    cat = anualizar_tasa(tasa.reshape(forma))  # CAT efectivo anual (porcentaje)
+    iteraciones = iteraciones.reshape(forma)
+    convergido = convergido.reshape(forma)
+
+    return ResultadoRevolvente(cat, iteraciones, convergido, flujos, saldo, interes, pago, disposicion)
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio Local de Cotización del CAT con Agrupación de Solicitudes
+
+Este módulo expone la cotización del CAT de préstamos personales, créditos
+automotrices y créditos revolventes en un servicio HTTP/JSON basado en
+`asyncio`, sin dependencias fuera de la biblioteca estándar y NumPy.
+
+Las solicitudes que llegan juntas se agrupan en micro-lotes: la primera
+solicitud de un lote abre una ventana de espera corta, y el lote se resuelve
+cuando la ventana vence o cuando alcanza el tamaño máximo. Cada lote se
+resuelve con una sola llamada vectorizada a `calcular_cat_productos` y los
+resultados se reparten a las solicitudes que esperan.
+
+Rutas:
+    POST /cotizar/<producto>   Cuerpo JSON con los parámetros de `calcular_cat`
+                               del producto ("personal", "automotriz" o "revolvente")
+    GET  /metricas             Latencias p50/p99 y tamaños de lote
+
+Uso:
+    python -m calculo_cat servir --puerto 8080 --tamano-lote 256 --espera-ms 2
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import Counter, deque
+from http import HTTPStatus
+
+import numpy as np
+
+from calculo_cat.productos import COLUMNAS_PRODUCTO, calcular_cat_productos
+
+
+TAMANO_LOTE = 256
+ESPERA_MAXIMA = 0.002  # segundos
+MUESTRAS_LATENCIA = 10_000
+
+_NAN = float("nan")
+_MAX_CUERPO = 64 * 1024
+
+
+class MetricasServicio:
+    """
+    Latencias y tamaños de lote del servicio.
+
+    Las latencias se guardan en una ventana de las últimas `muestras`
+    solicitudes; los tamaños de lote, en un histograma acumulado.
+    """
+
+    def __init__(self, muestras=MUESTRAS_LATENCIA):
+        """
+        Args:
+            muestras (int, opcional): Número de latencias recientes a conservar
+        """
+        self.latencias = deque(maxlen=muestras)
+        self.tamanos_lote = Counter()
+        self.solicitudes = 0
+        self.errores = 0
+
+    def registrar_lote(self, tamano):
+        """Registra un lote resuelto."""
+        self.tamanos_lote[tamano] += 1
+
+    def registrar_solicitud(self, segundos):
+        """Registra la latencia de una cotización completada."""
+        self.solicitudes += 1
+        self.latencias.append(segundos)
+
+    def resumen(self):
+        """
+        Resume las métricas acumuladas.
+
+        Returns:
+            dict: Solicitudes, errores, latencias p50/p99 en milisegundos y
+            estadísticas de tamaño de lote
+        """
+        latencias = sorted(self.latencias)
+        lotes = sum(self.tamanos_lote.values())
+        cotizaciones = sum(tamano * veces for tamano, veces in self.tamanos_lote.items())
+        return {
+            "solicitudes": self.solicitudes,
+            "errores": self.errores,
+            "latencia_p50_ms": _percentil(latencias, 50) * 1000,
+            "latencia_p99_ms": _percentil(latencias, 99) * 1000,
+            "lotes": lotes,
+            "tamano_lote_promedio": cotizaciones / lotes if lotes else 0.0,
+            "tamano_lote_maximo": max(self.tamanos_lote, default=0),
+            "histograma_tamano_lote": {str(tamano): veces for tamano, veces in sorted(self.tamanos_lote.items())},
+        }
+
+
+class AgrupadorCotizaciones:
+    """
+    Agrupa cotizaciones concurrentes en micro-lotes resueltos de forma vectorizada.
+
+    Debe usarse dentro de un ciclo de eventos de `asyncio`.
+    """
+
+    def __init__(self, tamano_lote=TAMANO_LOTE, espera_maxima=ESPERA_MAXIMA, metricas=None):
+        """
+        Args:
+            tamano_lote (int, opcional): Máximo de cotizaciones por lote
+            espera_maxima (float, opcional): Segundos que el primer elemento de un
+                          lote espera a que lleguen más cotizaciones
+            metricas (MetricasServicio, opcional): Métricas a actualizar
+        """
+        self.tamano_lote = tamano_lote
+        self.espera_maxima = espera_maxima
+        self.metricas = metricas if metricas is not None else MetricasServicio()
+        self._pendientes = []
+        self._temporizador = None
+
+    async def cotizar(self, producto, parametros):
+        """
+        Cotiza el CAT de un crédito dentro del siguiente lote.
+
+        Args:
+            producto (str): "personal", "automotriz" o "revolvente"
+            parametros (dict): Parámetros de `calcular_cat` del producto
+
+        Returns:
+            dict: CAT, iteraciones y convergencia
+
+        Raises:
+            ValueError: Si el producto no existe o faltan parámetros obligatorios
+        """
+        inicio = time.perf_counter()
+        producto = str(producto).lower()
+        _validar(producto, parametros)
+
+        ciclo = asyncio.get_running_loop()
+        futuro = ciclo.create_future()
+        self._pendientes.append((producto, parametros, futuro))
+
+        if len(self._pendientes) >= self.tamano_lote:
+            self._despachar()
+        elif self._temporizador is None:
+            self._temporizador = ciclo.call_later(self.espera_maxima, self._despachar)
+
+        resultado = await futuro
+        self.metricas.registrar_solicitud(time.perf_counter() - inicio)
+        return resultado
+
+    def _despachar(self):
+        """Resuelve el lote pendiente y entrega cada resultado a su solicitud."""
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        lote, self._pendientes = self._pendientes, []
+        if not lote:
+            return
+
+        # El lote se resuelve dentro del ciclo de eventos: una llamada vectorizada
+        # tarda menos que el cambio a un hilo, y las solicitudes que llegan
+        # mientras tanto forman el siguiente lote
+        try:
+            resultado = calcular_cat_productos(*_columnas_lote(lote))
+        except Exception as error:
+            for _, _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(error)
+            return
+
+        self.metricas.registrar_lote(len(lote))
+        for i, (producto, _, futuro) in enumerate(lote):
+            if not futuro.done():
+                cat = float(resultado.cat[i])
+                futuro.set_result({
+                    "producto": producto,
+                    "cat": cat if math.isfinite(cat) else None,
+                    "iteraciones": int(resultado.iteraciones[i]),
+                    "convergido": bool(resultado.convergido[i]),
+                })
+
+
+class ServicioCotizacion:
+    """
+    Servidor HTTP/JSON mínimo sobre `asyncio` para el `AgrupadorCotizaciones`.
+
+    Admite conexiones persistentes (HTTP/1.1 keep-alive), por lo que un cliente
+    puede enviar muchas cotizaciones por la misma conexión.
+    """
+
+    def __init__(self, host="127.0.0.1", puerto=8080, tamano_lote=TAMANO_LOTE,
+                 espera_maxima=ESPERA_MAXIMA):
+        """
+        Args:
+            host (str, opcional): Dirección en la que escucha el servicio
+            puerto (int, opcional): Puerto TCP (0 elige uno libre)
+            tamano_lote (int, opcional): Máximo de cotizaciones por lote
+            espera_maxima (float, opcional): Espera máxima de un lote en segundos
+        """
+        self.host = host
+        self.puerto = puerto
+        self.agrupador = AgrupadorCotizaciones(tamano_lote, espera_maxima)
+        self._servidor = None
+
+    @property
+    def metricas(self):
+        """MetricasServicio: Métricas del agrupador."""
+        return self.agrupador.metricas
+
+    async def iniciar(self):
+        """Comienza a aceptar conexiones y actualiza `puerto` con el puerto asignado."""
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+
+    async def detener(self):
+        """Deja de aceptar conexiones."""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+    async def servir(self):
+        """Inicia el servicio y atiende solicitudes hasta que se cancela."""
+        await self.iniciar()
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def _atender(self, lector, escritor):
+        """Atiende las solicitudes de una conexión hasta que el cliente la cierra."""
+        try:
+            while True:
+                solicitud = await _leer_solicitud(lector)
+                if solicitud is None:
+                    break
+                metodo, ruta, encabezados, cuerpo = solicitud
+                estado, respuesta = await self._responder(metodo, ruta, cuerpo)
+                mantener = encabezados.get("connection", "").lower() != "close"
+                _escribir_respuesta(escritor, estado, respuesta, mantener)
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError:
+            # Solicitud HTTP mal formada
+            self.metricas.errores += 1
+            _escribir_respuesta(escritor, HTTPStatus.BAD_REQUEST,
+                                {"error": "Solicitud HTTP mal formada"}, False)
+        finally:
+            escritor.close()
+
+    async def _responder(self, metodo, ruta, cuerpo):
+        """
+        Despacha una solicitud a su ruta.
+
+        Returns:
+            tuple: (estado HTTP, cuerpo de la respuesta como dict)
+        """
+        partes = ruta.split("?", 1)[0].strip("/").split("/")
+
+        if partes == ["metricas"]:
+            if metodo != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use GET"}
+            return HTTPStatus.OK, self.metricas.resumen()
+
+        if len(partes) == 2 and partes[0] == "cotizar":
+            if metodo != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+            try:
+                parametros = json.loads(cuerpo or b"{}")
+                if not isinstance(parametros, dict):
+                    raise ValueError("El cuerpo debe ser un objeto JSON")
+                return HTTPStatus.OK, await self.agrupador.cotizar(partes[1], parametros)
+            except ValueError as error:
+                self.metricas.errores += 1
+                return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+
+        return HTTPStatus.NOT_FOUND, {"error": f"Ruta desconocida: {ruta}"}
+
+
+def servir(host="127.0.0.1", puerto=8080, tamano_lote=TAMANO_LOTE, espera_maxima=ESPERA_MAXIMA):
+    """
+    Ejecuta el servicio de cotización hasta que se interrumpe.
+
+    Args:
+        host (str, opcional): Dirección en la que escucha el servicio
+        puerto (int, opcional): Puerto TCP
+        tamano_lote (int, opcional): Máximo de cotizaciones por lote
+        espera_maxima (float, opcional): Espera máxima de un lote en segundos
+    """
+    servicio = ServicioCotizacion(host, puerto, tamano_lote, espera_maxima)
+    asyncio.run(servicio.servir())
+
+
+def _validar(producto, parametros):
+    """Verifica el producto y los parámetros de una cotización."""
+    if producto not in COLUMNAS_PRODUCTO:
+        raise ValueError(f"Producto desconocido: '{producto}'")
+    obligatorias, opcionales = COLUMNAS_PRODUCTO[producto]
+    for nombre in obligatorias:
+        if nombre not in parametros:
+            raise ValueError(f"Falta el parámetro '{nombre}' para el producto '{producto}'")
+    for nombre, valor in parametros.items():
+        if nombre not in obligatorias and nombre not in opcionales:
+            raise ValueError(f"Parámetro desconocido '{nombre}' para el producto '{producto}'")
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            raise ValueError(f"El parámetro '{nombre}' debe ser numérico")
+
+
+def _columnas_lote(lote):
+    """
+    Convierte un lote de cotizaciones en las columnas de `calcular_cat_productos`.
+
+    Los parámetros que una cotización no trae quedan en NaN, que
+    `calcular_cat_productos` reemplaza por su valor por omisión.
+    """
+    producto = np.array([producto for producto, _, _ in lote])
+    nombres = {nombre for _, parametros, _ in lote for nombre in parametros}
+    columnas = {
+        nombre: np.fromiter((parametros.get(nombre, _NAN) for _, parametros, _ in lote),
+                            dtype=float, count=len(lote))
+        for nombre in nombres
+    }
+    return producto, columnas
+
+
+async def _leer_solicitud(lector):
+    """
+    Lee una solicitud HTTP/1.1.
+
+    Returns:
+        tuple: (método, ruta, encabezados, cuerpo), o None si el cliente cerró la conexión
+    """
+    linea = await lector.readline()
+    if not linea:
+        return None
+    partes = linea.decode("latin-1").split()
+    if len(partes) != 3:
+        raise ValueError("Línea de solicitud inválida")
+    metodo, ruta, _ = partes
+
+    encabezados = {}
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        encabezados[nombre.strip().lower()] = valor.strip()
+
+    longitud = int(encabezados.get("content-length", 0))
+    if longitud < 0 or longitud > _MAX_CUERPO:
+        raise ValueError("Longitud de cuerpo inválida")
+    cuerpo = await lector.readexactly(longitud) if longitud else b""
+    return metodo.upper(), ruta, encabezados, cuerpo
+
+
+def _escribir_respuesta(escritor, estado, respuesta, mantener):
+    """Escribe una respuesta JSON."""
+    cuerpo = json.dumps(respuesta).encode("utf-8")
+    escritor.write(
+        f"HTTP/1.1 {estado.value} {estado.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Connection: {'keep-alive' if mantener else 'close'}\r\n"
+        f"\r\n".encode("latin-1") + cuerpo)
+
+
+def _percentil(valores_ordenados, porcentaje):
+    """Percentil por rango más cercano de una lista ordenada (0.0 si está vacía)."""
+    if not valores_ordenados:
+        return 0.0
+    rango = max(math.ceil(porcentaje / 100 * len(valores_ordenados)), 1)
+    return valores_ordenados[rango - 1]
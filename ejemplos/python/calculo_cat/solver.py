@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Solucionador Compartido de la TIR
+
+Este módulo implementa el cálculo de la Tasa Interna de Retorno (TIR) por
+periodo que usan todos los ejemplos de Python para obtener el CAT.
+
+El VPN y su derivada se evalúan juntos en una sola pasada con el esquema de
+Horner sobre el factor de descuento v = 1 / (1 + tasa), sin llamadas a `pow`.
+La búsqueda de la raíz combina Newton-Raphson con bisección: en cuanto se
+conocen dos tasas con VPN de signo opuesto, cualquier paso de Newton que salga
+de ese intervalo o que no reduzca lo suficiente el intervalo se sustituye por
+un paso de bisección, por lo que el método no diverge.
+
+Los flujos pueden ser una lista con un elemento por periodo o un objeto con
+métodos `vpn` y `vpn_y_derivada`, como `FlujosSegmentados`, cuyo VPN se evalúa
+por segmentos en forma cerrada, o `EsquemaFlujos`, que lo actualiza en forma
+incremental.
+
+`calcular_tir_diagnostico` devuelve además el estado de convergencia, las
+iteraciones, el residuo, el intervalo y el tiempo de la solución; con la
+telemetría activa, `calcular_tir` acumula esos diagnósticos en
+`calculo_cat.telemetria`.
+
+La TIR por periodo se convierte en el CAT efectivo anual con `anualizar_tasa`
+según el §1.2 de docs/algoritmos_calculo_cat.md, para cualquier número k de
+periodos por año (`PERIODICIDADES`).
+"""
+
+import math
+import time
+
+from calculo_cat import telemetria as _telemetria
+from calculo_cat.telemetria import DiagnosticoSolucion, EstadoSolucion
+
+# Límite inferior de la tasa por periodo: (1 + tasa) debe ser positivo
+_TASA_MINIMA = -1.0
+
+# Periodos por año de cada frecuencia de pago
+PERIODICIDADES = {
+    "semanal": 52,
+    "catorcenal": 26,
+    "quincenal": 24,
+    "mensual": 12,
+}
+
+# Versión de la anualización del CAT (2: efectiva, §1.2); los resultados guardados
+# con otra versión (cachés, mallas) no se reutilizan
+VERSION_CAT = 2
+
+
+def anualizar_tasa(tasa, periodicidad=12):
+    """
+    Convierte la TIR por periodo en el CAT efectivo anual (§1.2 de
+    docs/algoritmos_calculo_cat.md): con k periodos por año, el VPN descontado
+    con (1 + CAT)^(i/k) se anula cuando CAT = (1 + r)^k - 1.
+
+    Args:
+        tasa (float o numpy.ndarray): TIR por periodo expresada como decimal
+        periodicidad (int o numpy.ndarray, opcional): Periodos por año (ej: 52 para
+                      pagos semanales)
+
+    Returns:
+        float o numpy.ndarray: CAT expresado como porcentaje anual
+    """
+    return ((1 + tasa) ** periodicidad - 1) * 100
+
+
+def tasa_periodica(cat, periodicidad=12):
+    """
+    Convierte un CAT efectivo anual en la TIR por periodo equivalente (inversa
+    de `anualizar_tasa`).
+
+    Args:
+        cat (float o numpy.ndarray): CAT expresado como porcentaje anual
+        periodicidad (int o numpy.ndarray, opcional): Periodos por año
+
+    Returns:
+        float o numpy.ndarray: TIR por periodo expresada como decimal
+    """
+    return (1 + cat / 100) ** (1 / periodicidad) - 1
+
+
+def calcular_tir(flujos, tasa_inicial=0.1, tolerancia=1e-10, max_iteraciones=1000):
+    """
+    Calcula la Tasa Interna de Retorno (TIR) por periodo para una serie de flujos de efectivo.
+
+    Si la telemetría está activa (`calculo_cat.telemetria.activar_telemetria`),
+    cada llamada se registra con su diagnóstico.
+
+    Args:
+        flujos (list, FlujosSegmentados o EsquemaFlujos): Flujos de efectivo, donde el primer elemento
+                      ocurre en el periodo 0 y los siguientes al final de cada periodo
+        tasa_inicial (float, opcional): Estimación inicial de la tasa por periodo,
+                      típicamente la tasa nominal del crédito
+        tolerancia (float, opcional): Tolerancia para la convergencia del método
+        max_iteraciones (int, opcional): Número máximo de iteraciones
+
+    Returns:
+        float: TIR por periodo expresada como decimal
+    """
+    telemetria = _telemetria._activa
+    if telemetria is None:
+        return _resolver_tir(flujos, tasa_inicial, tolerancia, max_iteraciones)[0]
+
+    diagnostico = calcular_tir_diagnostico(flujos, tasa_inicial, tolerancia, max_iteraciones)
+    telemetria.registrar(diagnostico, flujos)
+    return diagnostico.tasa
+
+
+def calcular_tir_diagnostico(flujos, tasa_inicial=0.1, tolerancia=1e-10, max_iteraciones=1000):
+    """
+    Calcula la TIR por periodo y devuelve el diagnóstico completo de la solución.
+
+    Acepta los mismos argumentos que `calcular_tir`.
+
+    Returns:
+        calculo_cat.telemetria.DiagnosticoSolucion: TIR, estado de convergencia,
+        iteraciones, residuo, intervalo y tiempo
+    """
+    inicio = time.perf_counter()
+    tasa, estado, iteraciones, residuo, intervalo = _resolver_tir(
+        flujos, tasa_inicial, tolerancia, max_iteraciones)
+    return DiagnosticoSolucion(tasa, estado, iteraciones, residuo, intervalo,
+                               time.perf_counter() - inicio)
+
+
+def _resolver_tir(flujos, tasa_inicial, tolerancia, max_iteraciones):
+    """
+    Búsqueda de la raíz con Newton-Raphson protegido por bisección.
+
+    Returns:
+        tuple: (tasa, estado, iteraciones, residuo, intervalo)
+    """
+    tasa = tasa_inicial
+    vpn = math.nan
+
+    # Tasas con VPN positivo y negativo más cercanas a la raíz
+    tasa_positiva = None
+    tasa_negativa = None
+    paso_anterior = None
+
+    for iteracion in range(1, max_iteraciones + 1):
+        vpn, derivada = calcular_vpn_y_derivada(flujos, tasa)
+
+        # Si el VPN está dentro de la tolerancia, hemos encontrado la TIR
+        if abs(vpn) < tolerancia:
+            return tasa, EstadoSolucion.CONVERGIDO, iteracion, vpn, _intervalo(tasa_positiva, tasa_negativa)
+
+        # Actualizar el intervalo que contiene la raíz
+        if vpn > 0:
+            tasa_positiva = tasa
+        else:
+            tasa_negativa = tasa
+        acotada = tasa_positiva is not None and tasa_negativa is not None
+
+        # Paso de Newton-Raphson
+        nueva_tasa = tasa - vpn / derivada if derivada != 0 else None
+
+        if acotada:
+            inferior = min(tasa_positiva, tasa_negativa)
+            superior = max(tasa_positiva, tasa_negativa)
+            ancho = superior - inferior
+
+            # Bisección si Newton sale del intervalo o avanza demasiado lento
+            if (nueva_tasa is None or not inferior < nueva_tasa < superior
+                    or (paso_anterior is not None and abs(nueva_tasa - tasa) > abs(paso_anterior) / 2)):
+                nueva_tasa = (inferior + superior) / 2
+
+            # Si el intervalo ya es menor que la tolerancia, hemos convergido
+            if ancho < tolerancia:
+                return nueva_tasa, EstadoSolucion.INTERVALO_MINIMO, iteracion, vpn, (inferior, superior)
+        elif nueva_tasa is None or not math.isfinite(nueva_tasa) or nueva_tasa <= _TASA_MINIMA:
+            # Sin intervalo todavía: alejarse del punto sin perder (1 + tasa) > 0
+            if vpn > 0 and derivada <= 0 or vpn < 0 and derivada > 0:
+                nueva_tasa = tasa + max(abs(tasa), 0.1)
+            else:
+                nueva_tasa = (tasa + _TASA_MINIMA) / 2
+
+        paso_anterior = nueva_tasa - tasa
+
+        # Si la tasa no cambia significativamente, hemos convergido
+        if abs(paso_anterior) < tolerancia:
+            return (nueva_tasa, EstadoSolucion.PASO_MINIMO, iteracion, vpn,
+                    _intervalo(tasa_positiva, tasa_negativa))
+
+        tasa = nueva_tasa
+
+    # Si no converge, devolver la mejor aproximación
+    return (tasa, EstadoSolucion.MAX_ITERACIONES, max_iteraciones, vpn,
+            _intervalo(tasa_positiva, tasa_negativa))
+
+
+def _intervalo(tasa_positiva, tasa_negativa):
+    """Intervalo (inferior, superior) con cambio de signo del VPN, o None."""
+    if tasa_positiva is None or tasa_negativa is None:
+        return None
+    return min(tasa_positiva, tasa_negativa), max(tasa_positiva, tasa_negativa)
+
+
+def calcular_vpn_y_derivada(flujos, tasa):
+    """
+    Calcula el VPN y su derivada respecto a la tasa en una sola pasada.
+
+    Con v = 1 / (1 + tasa), el VPN es el polinomio P(v) = Σ Fᵢ·vⁱ y su derivada
+    respecto a la tasa es -v²·P'(v). Ambos se evalúan con el esquema de Horner.
+
+    Args:
+        flujos (list, FlujosSegmentados o EsquemaFlujos): Flujos de efectivo
+        tasa (float): Tasa de descuento por periodo
+
+    Returns:
+        tuple: (vpn, derivada) calculados
+    """
+    if not isinstance(flujos, list):
+        vpn_y_derivada = getattr(flujos, "vpn_y_derivada", None)
+        if vpn_y_derivada is not None:
+            return vpn_y_derivada(tasa)
+
+    v = 1 / (1 + tasa)
+    vpn = 0.0
+    dvpn = 0.0
+    for flujo in reversed(flujos):
+        dvpn = dvpn * v + vpn
+        vpn = vpn * v + flujo
+    return vpn, -v * v * dvpn
+
+
+def calcular_vpn(flujos, tasa):
+    """
+    Calcula el Valor Presente Neto (VPN) para una serie de flujos de efectivo y una tasa dada.
+
+    Args:
+        flujos (list, FlujosSegmentados o EsquemaFlujos): Flujos de efectivo
+        tasa (float): Tasa de descuento por periodo
+
+    Returns:
+        float: VPN calculado
+    """
+    if not isinstance(flujos, list):
+        vpn = getattr(flujos, "vpn", None)
+        if vpn is not None:
+            return vpn(tasa)
+
+    v = 1 / (1 + tasa)
+    vpn = 0.0
+    for flujo in reversed(flujos):
+        vpn = vpn * v + flujo
+    return vpn
+
+
+def calcular_derivada_vpn(flujos, tasa):
+    """
+    Calcula la derivada del VPN respecto a la tasa para una serie de flujos de efectivo.
+
+    Args:
+        flujos (list, FlujosSegmentados o EsquemaFlujos): Flujos de efectivo
+        tasa (float): Tasa de descuento por periodo
+
+    Returns:
+        float: Derivada del VPN respecto a la tasa
+    """
+    return calcular_vpn_y_derivada(flujos, tasa)[1]
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Telemetría del Solucionador de la TIR
+
+Este módulo registra el comportamiento de `calculo_cat.solver.calcular_tir`:
+iteraciones, residuo final, intervalo usado, tiempo y estado de convergencia
+de cada solución. Los registros se acumulan en contadores e histogramas que se
+consultan desde Python o se exportan en el formato de texto de Prometheus.
+
+La telemetría está desactivada por omisión; mientras lo está, `calcular_tir`
+no mide tiempos ni construye diagnósticos, por lo que su costo es una sola
+comparación por llamada.
+
+Ejemplo:
+    >>> telemetria = activar_telemetria(umbral_lento=0.001, muestreo=print)
+    >>> calcular_cat(50000, 24, 0.24)
+    >>> print(telemetria.exportar_prometheus())
+    >>> desactivar_telemetria()
+"""
+
+import bisect
+import threading
+from collections import deque, namedtuple
+from enum import Enum
+
+
+class EstadoSolucion(Enum):
+    """Motivo por el que terminó una solución de la TIR."""
+
+    # El VPN quedó dentro de la tolerancia
+    CONVERGIDO = "convergido"
+    # El paso de la tasa fue menor que la tolerancia
+    PASO_MINIMO = "paso_minimo"
+    # El intervalo con cambio de signo fue menor que la tolerancia
+    INTERVALO_MINIMO = "intervalo_minimo"
+    # Se agotaron las iteraciones: la tasa es sólo la mejor aproximación
+    MAX_ITERACIONES = "max_iteraciones"
+
+    @property
+    def convergido(self):
+        """bool: Indica si la solución convergió."""
+        return self is not EstadoSolucion.MAX_ITERACIONES
+
+
+DiagnosticoSolucion = namedtuple(
+    "DiagnosticoSolucion", ["tasa", "estado", "iteraciones", "residuo", "intervalo", "segundos"])
+DiagnosticoSolucion.__doc__ = """
+Diagnóstico de una solución de la TIR.
+
+Atributos:
+    tasa (float): TIR por periodo obtenida
+    estado (EstadoSolucion): Motivo por el que terminó la solución
+    iteraciones (int): Evaluaciones del VPN realizadas
+    residuo (float): VPN en la última tasa evaluada
+    intervalo (tuple): Último intervalo (inferior, superior) con cambio de signo
+                  del VPN, o None si nunca se encontró uno
+    segundos (float): Tiempo de la solución
+"""
+
+# Límites de los histogramas (como los `le` de Prometheus)
+LIMITES_ITERACIONES = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50, 100, 1000)
+LIMITES_SEGUNDOS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 1e-1)
+
+# Telemetría activa; None mientras está desactivada
+_activa = None
+
+
+class Histograma:
+    """Histograma acumulativo con límites fijos, al estilo de Prometheus."""
+
+    def __init__(self, limites):
+        """
+        Args:
+            limites (tuple): Límites superiores de las cubetas, en orden creciente
+        """
+        self.limites = tuple(limites)
+        self.conteos = [0] * (len(self.limites) + 1)  # la última cubeta es +Inf
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        """Agrega una observación."""
+        self.conteos[bisect.bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+    def acumulado(self):
+        """
+        Returns:
+            list: Pares (límite, observaciones menores o iguales al límite),
+            terminando con (inf, total)
+        """
+        pares = []
+        acumulado = 0
+        for limite, conteo in zip(self.limites + (float("inf"),), self.conteos):
+            acumulado += conteo
+            pares.append((limite, acumulado))
+        return pares
+
+
+class TelemetriaSolver:
+    """
+    Contadores e histogramas de las soluciones de la TIR.
+
+    Las soluciones lentas (tiempo mayor o igual a `umbral_lento`) y las que no
+    convergen se guardan junto con sus flujos en `muestras_lentas` y, si se
+    indicó, se pasan a la función `muestreo`.
+    """
+
+    def __init__(self, umbral_lento=None, muestreo=None, max_muestras=100):
+        """
+        Args:
+            umbral_lento (float, opcional): Segundos a partir de los cuales una
+                          solución se considera lenta; None sólo muestrea las que
+                          no convergen
+            muestreo (callable, opcional): Función llamada con (diagnóstico, flujos)
+                          para cada solución muestreada
+            max_muestras (int, opcional): Muestras lentas a conservar
+        """
+        self.umbral_lento = umbral_lento
+        self.muestreo = muestreo
+        self.soluciones = {estado: 0 for estado in EstadoSolucion}
+        self.iteraciones = Histograma(LIMITES_ITERACIONES)
+        self.segundos = Histograma(LIMITES_SEGUNDOS)
+        self.muestras_lentas = deque(maxlen=max_muestras)
+        self.total_muestras = 0
+        self._candado = threading.Lock()
+
+    def registrar(self, diagnostico, flujos):
+        """
+        Registra una solución.
+
+        Args:
+            diagnostico (DiagnosticoSolucion): Diagnóstico de la solución
+            flujos (list o FlujosSegmentados): Flujos resueltos
+        """
+        lenta = (not diagnostico.estado.convergido
+                 or (self.umbral_lento is not None and diagnostico.segundos >= self.umbral_lento))
+        with self._candado:
+            self.soluciones[diagnostico.estado] += 1
+            self.iteraciones.observar(diagnostico.iteraciones)
+            self.segundos.observar(diagnostico.segundos)
+            if lenta:
+                self.total_muestras += 1
+                self.muestras_lentas.append((diagnostico, flujos))
+        if lenta and self.muestreo is not None:
+            self.muestreo(diagnostico, flujos)
+
+    def resumen(self):
+        """
+        Resume los contadores acumulados.
+
+        Returns:
+            dict: Soluciones por estado, iteraciones y tiempo promedio, y número de
+            soluciones muestreadas
+        """
+        total = self.iteraciones.total
+        return {
+            "soluciones": total,
+            "por_estado": {estado.value: conteo for estado, conteo in self.soluciones.items()},
+            "iteraciones_promedio": self.iteraciones.suma / total if total else 0.0,
+            "segundos_promedio": self.segundos.suma / total if total else 0.0,
+            "muestras_lentas": self.total_muestras,
+        }
+
+    def exportar_prometheus(self, prefijo="calculo_cat_tir"):
+        """
+        Exporta los contadores e histogramas en el formato de texto de Prometheus.
+
+        Args:
+            prefijo (str, opcional): Prefijo de los nombres de las métricas
+
+        Returns:
+            str: Métricas en formato de exposición de Prometheus
+        """
+        lineas = [
+            f"# HELP {prefijo}_soluciones_total Soluciones de la TIR por estado de convergencia",
+            f"# TYPE {prefijo}_soluciones_total counter",
+        ]
+        for estado, conteo in self.soluciones.items():
+            lineas.append(f'{prefijo}_soluciones_total{{estado="{estado.value}"}} {conteo}')
+
+        for nombre, ayuda, histograma in (
+                ("iteraciones", "Evaluaciones del VPN por solución", self.iteraciones),
+                ("segundos", "Tiempo por solución en segundos", self.segundos)):
+            lineas.append(f"# HELP {prefijo}_{nombre} {ayuda}")
+            lineas.append(f"# TYPE {prefijo}_{nombre} histogram")
+            for limite, acumulado in histograma.acumulado():
+                etiqueta = "+Inf" if limite == float("inf") else f"{limite:g}"
+                lineas.append(f'{prefijo}_{nombre}_bucket{{le="{etiqueta}"}} {acumulado}')
+            lineas.append(f"{prefijo}_{nombre}_sum {histograma.suma:g}")
+            lineas.append(f"{prefijo}_{nombre}_count {histograma.total}")
+
+        lineas.append(f"# HELP {prefijo}_muestras_lentas_total Soluciones lentas o sin convergencia muestreadas")
+        lineas.append(f"# TYPE {prefijo}_muestras_lentas_total counter")
+        lineas.append(f"{prefijo}_muestras_lentas_total {self.total_muestras}")
+        return "\n".join(lineas) + "\n"
+
+
+def activar_telemetria(umbral_lento=None, muestreo=None, max_muestras=100):
+    """
+    Activa la telemetría de `calcular_tir` con contadores nuevos.
+
+    Acepta los mismos argumentos que `TelemetriaSolver`.
+
+    Returns:
+        TelemetriaSolver: Telemetría activa
+    """
+    global _activa
+    _activa = TelemetriaSolver(umbral_lento, muestreo, max_muestras)
+    return _activa
+
+
+def desactivar_telemetria():
+    """
+    Desactiva la telemetría de `calcular_tir`.
+
+    Returns:
+        TelemetriaSolver: La telemetría que estaba activa, o None
+    """
+    global _activa
+    telemetria, _activa = _activa, None
+    return telemetria
+
+
+def telemetria_activa():
+    """
+    Returns:
+        TelemetriaSolver: Telemetría activa, o None si está desactivada
+    """
+    return _activa
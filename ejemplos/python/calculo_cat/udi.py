@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+Serie de la UDI y CAT Publicitado de Tarjetas de Crédito
+
+Los montos de línea de crédito con los que se publica el CAT de las tarjetas
+están en UDIS (Circular 9/2015), por lo que el CAT publicitado depende del
+valor de la UDI en la fecha de cálculo. Este módulo guarda la serie histórica
+de la UDI en un archivo binario con un valor por día, abierto con
+`numpy.memmap`, de modo que consultar una fecha es un acceso por índice.
+NumPy se importa al guardar o abrir una serie; `MONTOS_UDIS` y la serie activa
+se consultan sin importarlo, para no cargarlo en la ruta escalar.
+
+`ActualizadorCATTarjetas` recalcula en una sola pasada vectorizada el CAT de
+todos los productos de tarjeta y tipos (clásica, oro, platino) para una fecha,
+y guarda los resultados por (fecha, producto) para no repetir combinaciones
+que no cambiaron; sólo conserva las fechas usadas más recientemente.
+
+Formato del archivo:
+    - 8 bytes: identificador `CATUDI\\0\\0`
+    - 4 bytes: longitud del encabezado (entero sin signo, little-endian)
+    - encabezado JSON con la fecha inicial y el número de días, rellenado con
+      espacios hasta un múltiplo de 64 bytes
+    - un valor float64 por día natural desde la fecha inicial (NaN si falta)
+
+Ejemplo:
+    >>> serie = SerieUDI.desde_csv("udis.csv", "udis.serie")
+    >>> usar_serie_udi(serie)                # calcular_cat_tarjeta_credito la consulta
+    >>> actualizador = ActualizadorCATTarjetas(serie, {
+    ...     "basica": {"tasa_interes_anual": 0.42, "comision_anual": 700},
+    ...     "premium": {"tasa_interes_anual": 0.30, "comision_anual": 2500, "pago_minimo_porcentaje": 0.08},
+    ... })
+    >>> actualizador.actualizar("2024-03-01")["basica"]["oro"]
+"""
+
+import csv
+import json
+import math
+import struct
+from collections import OrderedDict
+from datetime import date, datetime
+
+
+_IDENTIFICADOR = b"CATUDI\x00\x00"
+_ALINEACION = 64
+
+# Montos de la línea de crédito en UDIS por tipo de tarjeta según Circular 9/2015
+MONTOS_UDIS = {
+    "clasica": 3000,
+    "oro": 7000,
+    "platino": 13000
+}
+
+# Formatos de fecha aceptados en el archivo CSV (el de Banxico es dd/mm/aaaa)
+_FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y")
+
+# Parámetros de un producto de tarjeta y sus valores por omisión
+PARAMETROS_PRODUCTO = {
+    "tasa_interes_anual": None,
+    "comision_anual": 0.0,
+    "pago_minimo_porcentaje": 0.05,
+    "otros_cargos_mensuales": 0.0,
+    "pago_minimo_fijo": 100.0,
+}
+
+# Fechas cuyos resultados conserva `ActualizadorCATTarjetas` por omisión
+MAX_FECHAS_GUARDADAS = 64
+
+# Serie activa para `credito_revolvente.calcular_cat_tarjeta_credito`; None si no hay
+_serie_activa = None
+
+
+def leer_csv_udi(ruta):
+    """
+    Lee la serie de la UDI de un archivo CSV con columnas fecha y valor.
+
+    Las filas cuyo valor no es numérico (encabezados, "N/E") se omiten.
+
+    Args:
+        ruta (str): Archivo CSV
+
+    Returns:
+        tuple: (fechas, valores) como listas
+    """
+    fechas = []
+    valores = []
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        for fila in csv.reader(archivo):
+            if len(fila) < 2:
+                continue
+            try:
+                valor = float(fila[1].replace(",", ""))
+                fecha = _leer_fecha(fila[0].strip())
+            except ValueError:
+                continue
+            fechas.append(fecha)
+            valores.append(valor)
+    return fechas, valores
+
+
+def guardar_serie_udi(ruta, fechas, valores):
+    """
+    Guarda la serie de la UDI con un valor por día natural.
+
+    Args:
+        ruta (str): Archivo de salida
+        fechas (list): Fechas (`date` o texto aaaa-mm-dd)
+        valores (list): Valor de la UDI en cada fecha
+
+    Returns:
+        int: Número de días de la serie
+    """
+    import numpy as np
+
+    ordinales = np.array([_fecha(fecha).toordinal() for fecha in fechas], dtype=np.int64)
+    if ordinales.size == 0:
+        raise ValueError("La serie de la UDI está vacía")
+
+    inicial = int(ordinales.min())
+    dias = int(ordinales.max()) - inicial + 1
+    serie = np.full(dias, np.nan)
+    serie[ordinales - inicial] = np.asarray(valores, dtype=float)
+
+    encabezado = json.dumps({
+        "fecha_inicial": date.fromordinal(inicial).isoformat(),
+        "dias": dias,
+    }).encode("utf-8")
+    relleno = -(len(_IDENTIFICADOR) + 4 + len(encabezado)) % _ALINEACION
+    encabezado += b" " * relleno
+
+    with open(ruta, "wb") as archivo:
+        archivo.write(_IDENTIFICADOR)
+        archivo.write(struct.pack("<I", len(encabezado)))
+        archivo.write(encabezado)
+        archivo.write(serie.astype("<f8").tobytes())
+    return dias
+
+
+class SerieUDI:
+    """
+    Serie diaria de la UDI mapeada en memoria.
+
+    Ejemplo:
+        >>> serie = SerieUDI.desde_csv("udis.csv", "udis.serie")
+        >>> serie.valor("2024-03-01")
+    """
+
+    def __init__(self, ruta):
+        """
+        Args:
+            ruta (str): Archivo creado con `guardar_serie_udi`
+        """
+        import numpy as np
+
+        with open(ruta, "rb") as archivo:
+            if archivo.read(len(_IDENTIFICADOR)) != _IDENTIFICADOR:
+                raise ValueError(f"{ruta} no es un archivo de la serie de la UDI")
+            (longitud,) = struct.unpack("<I", archivo.read(4))
+            encabezado = json.loads(archivo.read(longitud).decode("utf-8"))
+
+        self.fecha_inicial = date.fromisoformat(encabezado["fecha_inicial"])
+        self._ordinal_inicial = self.fecha_inicial.toordinal()
+
+        # Vista ndarray del mapeo en memoria: evita el costo de indexar un memmap
+        self.valores = np.memmap(ruta, dtype="<f8", mode="r", offset=len(_IDENTIFICADOR) + 4 + longitud,
+                                 shape=(encabezado["dias"],)).view(np.ndarray)
+
+        publicados = np.flatnonzero(~np.isnan(self.valores))
+        self.fecha_final = date.fromordinal(self._ordinal_inicial + int(publicados[-1]))
+
+    @classmethod
+    def desde_csv(cls, ruta_csv, ruta_serie):
+        """
+        Convierte un archivo CSV con la serie de la UDI y abre el resultado.
+
+        Args:
+            ruta_csv (str): Archivo CSV con columnas fecha y valor
+            ruta_serie (str): Archivo binario de salida
+
+        Returns:
+            SerieUDI: Serie mapeada en memoria
+        """
+        guardar_serie_udi(ruta_serie, *leer_csv_udi(ruta_csv))
+        return cls(ruta_serie)
+
+    def __repr__(self):
+        return f"SerieUDI({self.fecha_inicial.isoformat()} a {self.fecha_final.isoformat()})"
+
+    def valor(self, fecha=None):
+        """
+        Obtiene el valor de la UDI en una fecha.
+
+        Args:
+            fecha (date o str, opcional): Fecha; por omisión, la última publicada
+
+        Returns:
+            float: Valor de la UDI
+        """
+        fecha = self.fecha_final if fecha is None else _fecha(fecha)
+        indice = fecha.toordinal() - self._ordinal_inicial
+        valor = float(self.valores[indice]) if 0 <= indice < self.valores.size else math.nan
+        if math.isnan(valor):
+            raise KeyError(f"No hay valor de la UDI para el {fecha.isoformat()}")
+        return valor
+
+    def valor_vigente(self, fecha=None):
+        """
+        Obtiene el último valor publicado de la UDI en una fecha o antes de ella.
+
+        Args:
+            fecha (date o str, opcional): Fecha; por omisión, la última publicada
+
+        Returns:
+            float: Valor de la UDI
+        """
+        fecha = self.fecha_final if fecha is None else _fecha(fecha)
+        indice = min(fecha.toordinal(), self.fecha_final.toordinal()) - self._ordinal_inicial
+        while indice >= 0:
+            valor = float(self.valores[indice])
+            if not math.isnan(valor):
+                return valor
+            indice -= 1
+        raise KeyError(f"No hay valores de la UDI publicados hasta el {fecha.isoformat()}")
+
+    def valores_en(self, fechas):
+        """
+        Obtiene el valor de la UDI en varias fechas.
+
+        Args:
+            fechas (list): Fechas (`date` o texto aaaa-mm-dd)
+
+        Returns:
+            numpy.ndarray: Valores de la UDI (NaN en las fechas sin valor)
+        """
+        import numpy as np
+
+        indices = np.array([_fecha(fecha).toordinal() for fecha in fechas], dtype=np.int64)
+        indices -= self._ordinal_inicial
+        validos = (indices >= 0) & (indices < self.valores.size)
+        resultado = np.full(indices.size, np.nan)
+        resultado[validos] = self.valores[indices[validos]]
+        return resultado
+
+
+def usar_serie_udi(serie):
+    """
+    Define la serie de la UDI que consulta `credito_revolvente.calcular_cat_tarjeta_credito`.
+
+    Args:
+        serie (SerieUDI o str): Serie, o ruta de un archivo creado con
+                      `guardar_serie_udi`; None deja de usar la serie
+
+    Returns:
+        SerieUDI: Serie activa
+    """
+    global _serie_activa
+    _serie_activa = SerieUDI(serie) if isinstance(serie, str) else serie
+    return _serie_activa
+
+
+def serie_udi_activa():
+    """
+    Returns:
+        SerieUDI: Serie activa, o None si no se ha definido
+    """
+    return _serie_activa
+
+
+class ActualizadorCATTarjetas:
+    """
+    Recalcula el CAT publicitado de todos los productos de tarjeta para una fecha.
+
+    Cada producto es un diccionario con los parámetros de
+    `calcular_cat_revolvente_lote` (ver `PARAMETROS_PRODUCTO`); el monto de la
+    línea de cada tipo de tarjeta sale de `MONTOS_UDIS` y del valor de la UDI.
+    Los resultados se guardan por fecha y, al exceder `max_fechas`, se
+    descartan los de la fecha usada menos recientemente.
+    """
+
+    def __init__(self, serie, productos=None, tipos=None, max_fechas=MAX_FECHAS_GUARDADAS):
+        """
+        Args:
+            serie (SerieUDI): Serie de la UDI
+            productos (dict, opcional): Parámetros de cada producto por nombre
+            tipos (list, opcional): Tipos de tarjeta; por omisión, todos los de `MONTOS_UDIS`
+            max_fechas (int, opcional): Número máximo de fechas con resultados guardados
+        """
+        if max_fechas < 1:
+            raise ValueError("Se debe conservar al menos una fecha")
+        self.serie = serie
+        self.tipos = tuple(tipos) if tipos is not None else tuple(MONTOS_UDIS)
+        self.max_fechas = max_fechas
+        self.productos = {}
+        self._resultados = OrderedDict()
+        self.calculados = 0
+        self.reutilizados = 0
+        for nombre, parametros in (productos or {}).items():
+            self.definir_producto(nombre, **parametros)
+
+    def definir_producto(self, nombre, **parametros):
+        """
+        Define o reemplaza un producto; si cambió, sus resultados guardados se descartan.
+
+        Args:
+            nombre (str): Nombre del producto
+            **parametros: Parámetros de `PARAMETROS_PRODUCTO`; `tasa_interes_anual` es obligatorio
+        """
+        desconocidos = set(parametros) - set(PARAMETROS_PRODUCTO)
+        if desconocidos:
+            raise ValueError(f"Parámetros desconocidos para '{nombre}': {sorted(desconocidos)}")
+        if "tasa_interes_anual" not in parametros:
+            raise ValueError(f"Falta la tasa de interés anual del producto '{nombre}'")
+
+        completos = {**PARAMETROS_PRODUCTO, **parametros}
+        if self.productos.get(nombre) != completos:
+            self.quitar_producto(nombre)
+            self.productos[nombre] = completos
+
+    def quitar_producto(self, nombre):
+        """Quita un producto y sus resultados guardados."""
+        self.productos.pop(nombre, None)
+        for resultados in self._resultados.values():
+            resultados.pop(nombre, None)
+
+    def actualizar(self, fecha=None):
+        """
+        Obtiene el CAT publicitado de todos los productos y tipos de tarjeta en una fecha.
+
+        Las combinaciones (fecha, producto) ya calculadas se reutilizan; las demás
+        se resuelven juntas en una sola llamada a `calcular_cat_revolvente_lote`.
+
+        Args:
+            fecha (date o str, opcional): Fecha de cálculo; por omisión, la última de la serie
+
+        Returns:
+            dict: CAT por producto y tipo de tarjeta ({producto: {tipo: cat}})
+        """
+        fecha = self.serie.fecha_final if fecha is None else _fecha(fecha)
+        resultados = self._resultados.get(fecha, {})
+        pendientes = [nombre for nombre in self.productos if nombre not in resultados]
+        self.reutilizados += len(self.productos) - len(pendientes)
+
+        if pendientes:
+            import numpy as np
+            from calculo_cat.revolvente import calcular_cat_revolvente_lote
+
+            valor_udi = self.serie.valor(fecha)
+            montos = np.array([MONTOS_UDIS[tipo] for tipo in self.tipos], dtype=float) * valor_udi
+
+            # Una fila por (producto, tipo): los productos en el primer eje, los tipos en el segundo
+            columnas = {
+                parametro: np.array([[self.productos[nombre][parametro]] for nombre in pendientes], dtype=float)
+                for parametro in PARAMETROS_PRODUCTO
+            }
+            resultado = calcular_cat_revolvente_lote(monto_linea_credito=montos[np.newaxis, :], **columnas)
+
+            for fila, nombre in enumerate(pendientes):
+                resultados[nombre] = dict(zip(self.tipos, resultado.cat[fila].tolist()))
+            self.calculados += len(pendientes)
+
+        # Guardar como la fecha más reciente y descartar las usadas menos recientemente
+        self._resultados[fecha] = resultados
+        self._resultados.move_to_end(fecha)
+        while len(self._resultados) > self.max_fechas:
+            self._resultados.popitem(last=False)
+
+        return {nombre: dict(resultados[nombre]) for nombre in self.productos}
+
+    def limpiar(self):
+        """Descarta todos los resultados guardados."""
+        self._resultados.clear()
+
+
+def _fecha(valor):
+    """Convierte un `date`, `datetime` o texto aaaa-mm-dd en `date`."""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor))
+
+
+def _leer_fecha(texto):
+    """Lee una fecha en alguno de los formatos de `_FORMATOS_FECHA`."""
+    for formato in _FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Fecha inválida: {texto}")
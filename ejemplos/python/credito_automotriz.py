@@ -8,13 +8,24 @@ para créditos automotrices con pagos fijos mensuales, considerando el enganche
 y otros costos específicos de este tipo de crédito.
 """
 
-import numpy as np
-from datetime import datetime, timedelta
+from calculo_cat.flujos import FlujosSegmentados
+from calculo_cat.garantias import GarantiaEfectivo, calcular_cat_con_garantia
+from calculo_cat.solver import anualizar_tasa, calcular_derivada_vpn, calcular_tir, calcular_vpn
+
+__all__ = [
+    "calcular_cat", "calcular_cat_lote", "ejemplo_credito_automotriz",
+    # Tipo del argumento `garantia` de calcular_cat
+    "GarantiaEfectivo",
+    # Se definían en este módulo antes de pasar a calculo_cat.solver; se
+    # reexportan por compatibilidad
+    "calcular_tir", "calcular_vpn", "calcular_derivada_vpn",
+]
 
 
 def calcular_cat(precio_vehiculo, enganche, plazo_meses, tasa_interes_anual, 
                 comision_apertura=0, comisiones_mensuales=0, seguro_auto=0, 
-                seguro_vida=0, gps=0, otros_costos=0):
+                seguro_vida=0, gps=0, otros_costos=0, tasa_inicial=None,
+                garantia=None):
     """
     Calcula el CAT para un crédito automotriz con pagos fijos mensuales.
     
@@ -29,6 +40,11 @@ def calcular_cat(precio_vehiculo, enganche, plazo_meses, tasa_interes_anual,
         seguro_vida (float, opcional): Costo del seguro de vida mensual (en pesos)
         gps (float, opcional): Costo mensual del dispositivo GPS (en pesos)
         otros_costos (float, opcional): Otros costos iniciales (en pesos)
+        tasa_inicial (float, opcional): Estimación inicial de la TIR mensual; por omisión,
+                      la tasa nominal mensual
+        garantia (GarantiaEfectivo, opcional): Garantía en efectivo; si con ella la TIR
+                      resulta negativa o indeterminada, se reduce hasta obtener el
+                      primer CAT positivo (ver `calculo_cat.garantias`)
     
     Returns:
         float: CAT expresado como porcentaje anual (ej: 16.5 para 16.5%)
@@ -39,100 +55,67 @@ def calcular_cat(precio_vehiculo, enganche, plazo_meses, tasa_interes_anual,
     # Convertir tasa anual a mensual
     tasa_mensual = tasa_interes_anual / 12
     
-    # Calcular pago mensual (amortización + intereses)
-    pago_mensual = monto_credito * (tasa_mensual * (1 + tasa_mensual) ** plazo_meses) / \
-                  ((1 + tasa_mensual) ** plazo_meses - 1)
+    # Calcular pago mensual (amortización + intereses); sin intereses se divide el monto
+    if tasa_mensual == 0:
+        pago_mensual = monto_credito / plazo_meses
+    else:
+        pago_mensual = monto_credito * (tasa_mensual * (1 + tasa_mensual) ** plazo_meses) / \
+                      ((1 + tasa_mensual) ** plazo_meses - 1)
     
     # Monto neto recibido (descontando comisiones y otros costos iniciales)
     # En un crédito automotriz, el monto neto es el valor del vehículo menos el enganche
     monto_neto = monto_credito - comision_apertura - otros_costos
     
     # Flujos de efectivo (valor negativo para salidas, positivo para entradas)
-    flujos = [monto_neto]  # Flujo inicial (dinero recibido)
+    flujos = FlujosSegmentados()
+    flujos.agregar_flujo(0, monto_neto)  # Flujo inicial (dinero recibido)
     
-    # Agregar pagos mensuales (salidas de dinero)
-    for _ in range(plazo_meses):
-        flujos.append(-(pago_mensual + comisiones_mensuales + seguro_auto + seguro_vida + gps))
+    # Agregar pagos mensuales (salidas de dinero) como un solo segmento
+    flujos.agregar(1, plazo_meses, -(pago_mensual + comisiones_mensuales + seguro_auto + seguro_vida + gps))
     
-    # Calcular el CAT usando el método de Newton-Raphson
-    cat = calcular_tir(flujos) * 12 * 100  # Convertir a porcentaje anual
+    # Calcular el CAT partiendo de la tasa nominal mensual si no hay una mejor estimación
+    if tasa_inicial is None:
+        tasa_inicial = tasa_mensual
+    if garantia is not None:
+        return calcular_cat_con_garantia(flujos, garantia, plazo_meses, tasa_inicial, signo=-1).cat
+    # Convertir la TIR mensual a CAT efectivo anual (porcentaje)
+    cat = anualizar_tasa(calcular_tir(flujos, tasa_inicial=tasa_inicial))
     
     return cat
 
 
-def calcular_tir(flujos, tolerancia=1e-10, max_iteraciones=1000):
+def calcular_cat_lote(precio_vehiculo, enganche, plazo_meses, tasa_interes_anual,
+                      comision_apertura=0, comisiones_mensuales=0, seguro_auto=0,
+                      seguro_vida=0, gps=0, otros_costos=0):
     """
-    Calcula la Tasa Interna de Retorno (TIR) mensual para una serie de flujos de efectivo.
+    Calcula el CAT para un lote de créditos automotrices con pagos fijos mensuales.
     
-    Args:
-        flujos (list): Lista de flujos de efectivo, donde el primer elemento es el monto neto recibido
-                      y los siguientes son los pagos (negativos)
-        tolerancia (float, opcional): Tolerancia para la convergencia del método
-        max_iteraciones (int, opcional): Número máximo de iteraciones
+    Acepta los mismos parámetros que `calcular_cat`, pero cada uno puede ser un
+    escalar o un arreglo de NumPy con un valor por crédito.
     
     Returns:
-        float: TIR mensual expresada como decimal
-    """
-    # Estimación inicial
-    tasa = 0.1
-    
-    for i in range(max_iteraciones):
-        # Calcular el valor presente neto con la tasa actual
-        vpn = calcular_vpn(flujos, tasa)
-        
-        # Si el VPN está dentro de la tolerancia, hemos encontrado la TIR
-        if abs(vpn) < tolerancia:
-            return tasa
-        
-        # Calcular la derivada del VPN respecto a la tasa
-        derivada = calcular_derivada_vpn(flujos, tasa)
-        
-        # Actualizar la tasa usando el método de Newton-Raphson
-        nueva_tasa = tasa - vpn / derivada
-        
-        # Si la tasa no cambia significativamente, hemos convergido
-        if abs(nueva_tasa - tasa) < tolerancia:
-            return nueva_tasa
-        
-        tasa = nueva_tasa
-    
-    # Si no converge, devolver la mejor aproximación
-    return tasa
-
-
-def calcular_vpn(flujos, tasa):
+        calculo_cat.lote.ResultadoLote: Arreglos con el CAT (porcentaje anual),
+        las iteraciones y la bandera de convergencia de cada crédito
     """
-    Calcula el Valor Presente Neto (VPN) para una serie de flujos de efectivo y una tasa dada.
+    # NumPy y el solucionador por lotes se importan sólo en la ruta por lotes
+    import numpy as np
+    from calculo_cat.lote import calcular_cat_lote as calcular_cat_lote_pagos_fijos
     
-    Args:
-        flujos (list): Lista de flujos de efectivo
-        tasa (float): Tasa de descuento mensual
-    
-    Returns:
-        float: VPN calculado
-    """
-    vpn = 0
-    for i, flujo in enumerate(flujos):
-        vpn += flujo / ((1 + tasa) ** i)
-    return vpn
-
-
-def calcular_derivada_vpn(flujos, tasa):
-    """
-    Calcula la derivada del VPN respecto a la tasa para una serie de flujos de efectivo.
+    # Calcular monto del crédito
+    monto_credito = np.asarray(precio_vehiculo, dtype=float) - np.asarray(enganche, dtype=float)
     
-    Args:
-        flujos (list): Lista de flujos de efectivo
-        tasa (float): Tasa de descuento mensual
+    # Todos los cargos mensuales se suman al pago periódico
+    cargos_mensuales = (np.asarray(comisiones_mensuales, dtype=float) + np.asarray(seguro_auto, dtype=float)
+                        + np.asarray(seguro_vida, dtype=float) + np.asarray(gps, dtype=float))
     
-    Returns:
-        float: Derivada del VPN respecto a la tasa
-    """
-    derivada = 0
-    for i, flujo in enumerate(flujos):
-        if i > 0:  # La derivada del primer flujo es cero
-            derivada -= i * flujo / ((1 + tasa) ** (i + 1))
-    return derivada
+    return calcular_cat_lote_pagos_fijos(
+        monto_credito=monto_credito,
+        plazo_meses=plazo_meses,
+        tasa_interes_anual=tasa_interes_anual,
+        comision_apertura=comision_apertura,
+        comisiones_mensuales=cargos_mensuales,
+        otros_costos=otros_costos
+    )
 
 
 def ejemplo_credito_automotriz():
@@ -8,12 +8,16 @@ para créditos revolventes (incluyendo tarjetas de crédito) siguiendo la
 metodología establecida en la Circular 9/2015 del Banco de México.
 """
 
-import numpy as np
-from datetime import datetime, timedelta
+from calculo_cat.solver import anualizar_tasa, calcular_tir
+from calculo_cat.udi import MONTOS_UDIS, serie_udi_activa
+
+
+# Valor de la UDI cuando no hay una serie cargada (`calculo_cat.udi.usar_serie_udi`)
+VALOR_UDI = 7.5  # Valor aproximado, debe obtenerse de fuentes oficiales
 
 
 def calcular_cat_revolvente(monto_linea_credito, tasa_interes_anual, comision_anual=0,
-                          pago_minimo_porcentaje=0.05, otros_cargos_mensuales=0):
+                          pago_minimo_porcentaje=0.05, otros_cargos_mensuales=0, tasa_inicial=None):
     """
     Calcula el CAT para un crédito revolvente según la Circular 9/2015.
     
@@ -23,6 +27,8 @@ def calcular_cat_revolvente(monto_linea_credito, tasa_interes_anual, comision_an
         comision_anual (float, opcional): Comisión anual (en pesos)
         pago_minimo_porcentaje (float, opcional): Porcentaje del saldo para pago mínimo (decimal)
         otros_cargos_mensuales (float, opcional): Otros cargos mensuales fijos (en pesos)
+        tasa_inicial (float, opcional): Estimación inicial de la TIR mensual; por omisión,
+                      la tasa nominal mensual
     
     Returns:
         float: CAT expresado como porcentaje anual (ej: 45.2 para 45.2%)
@@ -76,69 +82,22 @@ def calcular_cat_revolvente(monto_linea_credito, tasa_interes_anual, comision_an
             # Actualizar saldo con nueva disposición
             saldo += nueva_disposicion
         
-        # Agregar flujo positivo (pago recibido por la institución) y flujo negativo (nueva disposición)
-        flujos.append(pago_total)
-        if nueva_disposicion > 0:
-            flujos.append(-nueva_disposicion)
+        # Flujo neto del periodo: pago recibido por la institución menos la nueva
+        # disposición, ya que ambos ocurren al final del mismo periodo
+        flujos.append(pago_total - nueva_disposicion)
     
-    # Calcular el CAT usando el método de Newton-Raphson
-    cat = calcular_tir(flujos) * 12 * 100  # Convertir a porcentaje anual
+    # Calcular el CAT partiendo de la tasa nominal mensual si no hay una mejor estimación
+    if tasa_inicial is None:
+        tasa_inicial = tasa_mensual
+    # Convertir la TIR mensual a CAT efectivo anual (porcentaje)
+    cat = anualizar_tasa(calcular_tir(flujos, tasa_inicial=tasa_inicial))
     
     return cat
 
 
-def calcular_tir(flujos, tolerancia=1e-10, max_iteraciones=1000):
-    """
-    Calcula la Tasa Interna de Retorno (TIR) mensual usando el método de Newton-Raphson.
-    
-    Args:
-        flujos (list): Lista de flujos de efectivo (positivo para entradas, negativo para salidas)
-        tolerancia (float, opcional): Tolerancia para convergencia
-        max_iteraciones (int, opcional): Número máximo de iteraciones
-    
-    Returns:
-        float: TIR mensual (en decimal)
-    """
-    # Estimación inicial
-    tasa = 0.1  # 10% mensual como punto de partida
-    
-    for _ in range(max_iteraciones):
-        # Calcular VPN con la tasa actual
-        vpn = 0
-        dvpn = 0  # Derivada del VPN respecto a la tasa
-        
-        for i, flujo in enumerate(flujos):
-            factor = (1 + tasa) ** i
-            vpn += flujo / factor
-            if i > 0:  # La derivada del primer término es cero
-                dvpn -= i * flujo / ((1 + tasa) ** (i + 1))
-        
-        # Si VPN está cerca de cero, hemos encontrado la TIR
-        if abs(vpn) < tolerancia:
-            return tasa
-        
-        # Actualizar tasa usando el método de Newton-Raphson
-        nueva_tasa = tasa - vpn / dvpn if dvpn != 0 else tasa * 1.1
-        
-        # Si la tasa no cambia significativamente, hemos convergido
-        if abs(nueva_tasa - tasa) < tolerancia:
-            return nueva_tasa
-        
-        # Actualizar para la siguiente iteración
-        tasa = nueva_tasa
-        
-        # Si la tasa se vuelve negativa o muy grande, ajustar
-        if tasa <= 0:
-            tasa = 0.001  # 0.1% mensual
-        elif tasa > 1:
-            tasa = 0.9  # 90% mensual (extremadamente alto)
-    
-    # Si no converge, devolver la mejor aproximación
-    return tasa
-
-
 def calcular_cat_tarjeta_credito(tipo_tarjeta="clasica", tasa_interes_anual=0.36, 
-                               comision_anual=0, pago_minimo_porcentaje=0.05):
+                               comision_anual=0, pago_minimo_porcentaje=0.05, tasa_inicial=None,
+                               fecha=None):
     """
     Calcula el CAT para una tarjeta de crédito según la Circular 9/2015,
     utilizando los montos de línea de crédito establecidos en UDIS.
@@ -148,38 +107,90 @@ def calcular_cat_tarjeta_credito(tipo_tarjeta="clasica", tasa_interes_anual=0.36
         tasa_interes_anual (float): Tasa de interés anual (en decimal)
         comision_anual (float): Comisión anual (en pesos)
         pago_minimo_porcentaje (float): Porcentaje del saldo para pago mínimo (decimal)
+        tasa_inicial (float, opcional): Estimación inicial de la TIR mensual
+        fecha (date o str, opcional): Fecha del valor de la UDI; por omisión, la
+                      última de la serie cargada
     
     Returns:
         float: CAT expresado como porcentaje anual
     """
-    # Valor de la UDI (ejemplo, debe actualizarse con el valor real)
-    valor_udi = 7.5  # Valor aproximado, debe obtenerse de fuentes oficiales
-    
-    # Montos en UDIS según Circular 9/2015
-    montos_udis = {
-        "clasica": 3000,
-        "oro": 7000,
-        "platino": 13000
-    }
-    
     # Convertir UDIS a pesos
-    if tipo_tarjeta.lower() in montos_udis:
-        monto_linea_credito = montos_udis[tipo_tarjeta.lower()] * valor_udi
-    else:
-        # Valor predeterminado si el tipo no está definido
-        monto_linea_credito = montos_udis["clasica"] * valor_udi
+    monto_linea_credito = _monto_udis(tipo_tarjeta) * _valor_udi(fecha)
     
     # Calcular el CAT
     cat = calcular_cat_revolvente(
         monto_linea_credito=monto_linea_credito,
         tasa_interes_anual=tasa_interes_anual,
         comision_anual=comision_anual,
-        pago_minimo_porcentaje=pago_minimo_porcentaje
+        pago_minimo_porcentaje=pago_minimo_porcentaje,
+        tasa_inicial=tasa_inicial
     )
     
     return cat
 
 
+# El monto de la línea depende de la serie de la UDI activa: `CacheCAT` agrega
+# a la clave el valor de la UDI que se usará, no sólo la fecha
+calcular_cat_tarjeta_credito.contexto_cache = lambda argumentos: {"valor_udi": _valor_udi(argumentos["fecha"])}
+
+
+def calcular_cat_tarjeta_credito_lote(tipo_tarjeta, tasa_interes_anual, comision_anual=0,
+                                      pago_minimo_porcentaje=0.05, fecha=None):
+    """
+    Calcula el CAT para un lote de configuraciones de tarjetas de crédito.
+    
+    Cada argumento puede ser un escalar o un arreglo de NumPy; todos se combinan
+    con las reglas de broadcasting, de modo que se pueden barrer mallas de
+    tipo de tarjeta × tasa × pago mínimo × anualidad en una sola llamada.
+    
+    Args:
+        tipo_tarjeta (array_like): Tipo de tarjeta: "clasica", "oro" o "platino"
+        tasa_interes_anual (array_like): Tasa de interés anual (en decimal)
+        comision_anual (array_like, opcional): Comisión anual (en pesos)
+        pago_minimo_porcentaje (array_like, opcional): Porcentaje del saldo para pago mínimo (decimal)
+        fecha (date o str, opcional): Fecha del valor de la UDI; por omisión, la
+                      última de la serie cargada
+    
+    Returns:
+        calculo_cat.revolvente.ResultadoRevolvente: CAT, iteraciones, convergencia
+        y arreglos de saldo, interés y pago por periodo
+    """
+    # NumPy y el simulador por lotes se importan sólo en la ruta por lotes
+    import numpy as np
+    from calculo_cat.revolvente import calcular_cat_revolvente_lote
+    
+    # Convertir UDIS a pesos para cada tipo de tarjeta
+    tipos = np.asarray(tipo_tarjeta)
+    montos = np.vectorize(_monto_udis, otypes=[float])(tipos) * _valor_udi(fecha)
+    
+    return calcular_cat_revolvente_lote(
+        monto_linea_credito=montos,
+        tasa_interes_anual=tasa_interes_anual,
+        comision_anual=comision_anual,
+        pago_minimo_porcentaje=pago_minimo_porcentaje
+    )
+
+
+def _valor_udi(fecha=None):
+    """
+    Obtiene el valor de la UDI de la serie cargada, o `VALOR_UDI` si no hay una.
+    """
+    serie = serie_udi_activa()
+    if serie is None:
+        if fecha is not None:
+            raise ValueError("No hay una serie de la UDI cargada (calculo_cat.udi.usar_serie_udi)")
+        return VALOR_UDI
+    return serie.valor(fecha)
+
+
+def _monto_udis(tipo_tarjeta):
+    """
+    Obtiene el monto de la línea de crédito en UDIS para un tipo de tarjeta.
+    """
+    # Valor predeterminado si el tipo no está definido
+    return MONTOS_UDIS.get(str(tipo_tarjeta).lower(), MONTOS_UDIS["clasica"])
+
+
 # Ejemplo de uso
 if __name__ == "__main__":
     # Ejemplo 1: Tarjeta de crédito clásica
@@ -4,36 +4,77 @@
 Cálculo del CAT para Préstamos Personales Básicos
 
 Este módulo implementa el algoritmo para calcular el Costo Anual Total (CAT)
-para préstamos personales con pagos fijos mensuales.
+para préstamos personales con pagos fijos mensuales, o con otra periodicidad
+(semanal, catorcenal o quincenal) como los microcréditos y los préstamos de
+nómina.
 """
 
-import numpy as np
-from datetime import datetime, timedelta
+from calculo_cat.flujos import FlujosSegmentados
+from calculo_cat.garantias import GarantiaEfectivo, calcular_cat_con_garantia
+from calculo_cat.solver import (PERIODICIDADES, anualizar_tasa, calcular_derivada_vpn, calcular_tir,
+                                calcular_vpn)
+
+__all__ = [
+    "calcular_cat", "ejemplo_prestamo_personal",
+    # Tipo del argumento `garantia` de calcular_cat
+    "GarantiaEfectivo",
+    # Se definían en este módulo antes de pasar a calculo_cat.solver; se
+    # reexportan por compatibilidad
+    "calcular_tir", "calcular_vpn", "calcular_derivada_vpn",
+]
+
+
+def __getattr__(nombre):
+    # Versión por lotes de calcular_cat para carteras completas; importa NumPy
+    # sólo cuando se usa
+    if nombre == "calcular_cat_lote":
+        from calculo_cat.lote import calcular_cat_lote
+        return calcular_cat_lote
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 
 def calcular_cat(monto_credito, plazo_meses, tasa_interes_anual, comision_apertura=0, 
-                comisiones_mensuales=0, seguro=0, otros_costos=0):
+                comisiones_mensuales=0, seguro=0, otros_costos=0, tasa_inicial=None,
+                garantia=None, periodicidad=12):
     """
-    Calcula el CAT para un préstamo personal con pagos fijos mensuales.
+    Calcula el CAT para un préstamo personal con pagos fijos periódicos
+    (mensuales por omisión).
     
     Args:
         monto_credito (float): Monto del crédito en pesos
         plazo_meses (int): Plazo del crédito en meses
         tasa_interes_anual (float): Tasa de interés anual (en decimal, ej: 0.12 para 12%)
         comision_apertura (float, opcional): Comisión por apertura (en pesos)
-        comisiones_mensuales (float, opcional): Comisiones mensuales fijas (en pesos)
-        seguro (float, opcional): Costo del seguro mensual (en pesos)
+        comisiones_mensuales (float, opcional): Comisiones mensuales fijas (en pesos); con
+                      otra periodicidad se prorratean por periodo de pago
+        seguro (float, opcional): Costo del seguro mensual (en pesos), prorrateado igual
         otros_costos (float, opcional): Otros costos iniciales (en pesos)
+        tasa_inicial (float, opcional): Estimación inicial de la TIR por periodo; por
+                      omisión, la tasa nominal por periodo
+        garantia (GarantiaEfectivo, opcional): Garantía en efectivo; si con ella la TIR
+                      resulta negativa o indeterminada, se reduce hasta obtener el
+                      primer CAT positivo (ver `calculo_cat.garantias`). Sólo con
+                      pagos mensuales
+        periodicidad (int, opcional): Pagos por año: 12 mensual, 24 quincenal,
+                      26 catorcenal o 52 semanal (ver `calculo_cat.solver.PERIODICIDADES`);
+                      el número de pagos es plazo_meses · periodicidad / 12, redondeado
     
     Returns:
         float: CAT expresado como porcentaje anual (ej: 16.5 para 16.5%)
     """
-    # Convertir tasa anual a mensual
-    tasa_mensual = tasa_interes_anual / 12
+    # Número de pagos y tasa por periodo (mensual con la periodicidad por omisión)
+    periodos = round(plazo_meses * periodicidad / 12)
+    tasa_periodo = tasa_interes_anual / periodicidad
     
-    # Calcular pago mensual (amortización + intereses)
-    pago_mensual = monto_credito * (tasa_mensual * (1 + tasa_mensual) ** plazo_meses) / \
-                  ((1 + tasa_mensual) ** plazo_meses - 1)
+    # Calcular pago periódico (amortización + intereses); sin intereses se divide el monto
+    if tasa_periodo == 0:
+        pago_periodo = monto_credito / periodos
+    else:
+        pago_periodo = monto_credito * (tasa_periodo * (1 + tasa_periodo) ** periodos) / \
+                      ((1 + tasa_periodo) ** periodos - 1)
+    
+    # Cargos mensuales prorrateados por periodo de pago
+    cargos_periodo = (comisiones_mensuales + seguro) * (12 / periodicidad)
     
     # Monto neto recibido (descontando comisiones y otros costos iniciales)
     monto_neto = monto_credito - comision_apertura - otros_costos
@@ -41,93 +82,25 @@ def calcular_cat(monto_credito, plazo_meses, tasa_interes_anual, comision_apertu
     # Flujos de efectivo (desde la perspectiva de la institución financiera)
     # Valor negativo para desembolsos (dinero que sale de la institución)
     # Valor positivo para ingresos (dinero que entra a la institución)
-    flujos = [-monto_neto]  # Flujo inicial (dinero desembolsado por la institución)
-    
-    # Agregar pagos mensuales (entradas de dinero para la institución)
-    for _ in range(plazo_meses):
-        flujos.append(pago_mensual + comisiones_mensuales + seguro)
-    
-    # Calcular el CAT usando el método de Newton-Raphson
-    cat = calcular_tir(flujos) * 12 * 100  # Convertir a porcentaje anual
+    flujos = FlujosSegmentados()
+    flujos.agregar_flujo(0, -monto_neto)  # Flujo inicial (dinero desembolsado por la institución)
+    
+    # Agregar pagos periódicos (entradas de dinero para la institución) como un solo segmento
+    flujos.agregar(1, periodos, pago_periodo + cargos_periodo)
+    
+    # Calcular el CAT partiendo de la tasa nominal por periodo si no hay una mejor estimación
+    if tasa_inicial is None:
+        tasa_inicial = tasa_periodo
+    if garantia is not None:
+        if periodicidad != 12:
+            raise ValueError("Las garantías en efectivo sólo se admiten con pagos mensuales")
+        return calcular_cat_con_garantia(flujos, garantia, plazo_meses, tasa_inicial).cat
+    # Convertir la TIR por periodo a CAT efectivo anual (porcentaje)
+    cat = anualizar_tasa(calcular_tir(flujos, tasa_inicial=tasa_inicial), periodicidad)
     
     return cat
 
 
-def calcular_tir(flujos, tolerancia=1e-10, max_iteraciones=1000):
-    """
-    Calcula la Tasa Interna de Retorno (TIR) mensual para una serie de flujos de efectivo.
-    
-    Args:
-        flujos (list): Lista de flujos de efectivo, donde el primer elemento es el monto neto recibido
-                      y los siguientes son los pagos (negativos)
-        tolerancia (float, opcional): Tolerancia para la convergencia del método
-        max_iteraciones (int, opcional): Número máximo de iteraciones
-    
-    Returns:
-        float: TIR mensual expresada como decimal
-    """
-    # Estimación inicial
-    tasa = 0.1
-    
-    for i in range(max_iteraciones):
-        # Calcular el valor presente neto con la tasa actual
-        vpn = calcular_vpn(flujos, tasa)
-        
-        # Si el VPN está dentro de la tolerancia, hemos encontrado la TIR
-        if abs(vpn) < tolerancia:
-            return tasa
-        
-        # Calcular la derivada del VPN respecto a la tasa
-        derivada = calcular_derivada_vpn(flujos, tasa)
-        
-        # Actualizar la tasa usando el método de Newton-Raphson
-        nueva_tasa = tasa - vpn / derivada
-        
-        # Si la tasa no cambia significativamente, hemos convergido
-        if abs(nueva_tasa - tasa) < tolerancia:
-            return nueva_tasa
-        
-        tasa = nueva_tasa
-    
-    # Si no converge, devolver la mejor aproximación
-    return tasa
-
-
-def calcular_vpn(flujos, tasa):
-    """
-    Calcula el Valor Presente Neto (VPN) para una serie de flujos de efectivo y una tasa dada.
-    
-    Args:
-        flujos (list): Lista de flujos de efectivo
-        tasa (float): Tasa de descuento mensual
-    
-    Returns:
-        float: VPN calculado
-    """
-    vpn = 0
-    for i, flujo in enumerate(flujos):
-        vpn += flujo / ((1 + tasa) ** i)
-    return vpn
-
-
-def calcular_derivada_vpn(flujos, tasa):
-    """
-    Calcula la derivada del VPN respecto a la tasa para una serie de flujos de efectivo.
-    
-    Args:
-        flujos (list): Lista de flujos de efectivo
-        tasa (float): Tasa de descuento mensual
-    
-    Returns:
-        float: Derivada del VPN respecto a la tasa
-    """
-    derivada = 0
-    for i, flujo in enumerate(flujos):
-        if i > 0:  # La derivada del primer flujo es cero
-            derivada -= i * flujo / ((1 + tasa) ** (i + 1))
-    return derivada
-
-
 def ejemplo_prestamo_personal():
     """
     Ejemplo de uso para un préstamo personal básico.
@@ -161,6 +134,11 @@ def ejemplo_prestamo_personal():
     print(f"Seguro mensual: ${seguro:,.2f}")
     print(f"Otros costos: ${otros_costos:,.2f}")
     print(f"CAT: {cat:.2f}%")
+    
+    # Microcrédito a 6 meses con pagos semanales
+    cat_semanal = calcular_cat(10000, 6, 0.60, comision_apertura=300,
+                               periodicidad=PERIODICIDADES["semanal"])
+    print(f"CAT de un microcrédito semanal a 6 meses: {cat_semanal:.2f}%")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del procesamiento de archivos de cartera y del subcomando `lote`."""
+
+import csv
+
+import pytest
+
+from calculo_cat.__main__ import main
+from calculo_cat.archivos import procesar_archivo
+from calculo_cat.productos import calcular_cat_productos
+
+
+def _escribir_cartera(ruta, renglones):
+    with open(ruta, "w", newline="") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["id", "producto", "monto_credito", "plazo_meses", "tasa_interes_anual"])
+        escritor.writerows(renglones)
+    return str(ruta)
+
+
+def test_procesa_cartera(tmp_path):
+    entrada = _escribir_cartera(tmp_path / "cartera.csv", [
+        ["a", "personal", 50_000, 24, 0.24],
+        ["b", "Personal", 10_000, 12, ""],
+    ])
+    resumen = procesar_archivo(entrada, str(tmp_path / "salida.csv"))
+    assert resumen.filas == 2
+    # La tasa vacía de la fila "b" es NaN: no converge, pero no detiene el proceso
+    assert resumen.ejemplos_no_convergidos == ["b"]
+
+
+def test_producto_desconocido_indica_la_fila(tmp_path):
+    entrada = _escribir_cartera(tmp_path / "cartera.csv", [
+        ["a", "personal", 50_000, 24, 0.24],
+        ["b", "personal", 50_000, 24, 0.24],
+        ["c", "hipotecario", 900_000, 240, 0.11],
+    ])
+    with pytest.raises(ValueError, match="Producto desconocido 'hipotecario' en la fila 3"):
+        procesar_archivo(entrada, str(tmp_path / "salida.csv"), tamano_bloque=2)
+
+
+def test_valor_no_numerico_indica_fila_y_columna(tmp_path):
+    entrada = _escribir_cartera(tmp_path / "cartera.csv", [
+        ["a", "personal", 50_000, 24, 0.24],
+        ["b", "personal", 50_000, 24, 0.24],
+        ["c", "personal", 50_000, "24 meses", 0.24],
+    ])
+    with pytest.raises(ValueError, match="Valor no numérico '24 meses' en la fila 3, columna 'plazo_meses'"):
+        procesar_archivo(entrada, str(tmp_path / "salida.csv"), tamano_bloque=2)
+
+
+def test_fila_incompleta_indica_la_fila(tmp_path):
+    entrada = str(tmp_path / "cartera.csv")
+    with open(entrada, "w", newline="") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["id", "producto", "monto_credito", "plazo_meses", "tasa_interes_anual",
+                           "comision_apertura"])
+        escritor.writerow(["a", "personal", 50_000, 24, 0.24, 10_000])
+        escritor.writerow(["b", "personal", 50_000, 24, 0.24])
+    with pytest.raises(ValueError, match="La fila 2 tiene 5 valores; el encabezado tiene 6 columnas"):
+        procesar_archivo(entrada, str(tmp_path / "salida.csv"))
+
+
+def test_calcular_cat_productos_rechaza_desconocidos():
+    with pytest.raises(ValueError, match="en la fila 2"):
+        calcular_cat_productos(["personal", "tarjeta"], {
+            "monto_credito": [50_000, 0], "plazo_meses": [24, 0], "tasa_interes_anual": [0.24, 0]})
+
+
+@pytest.mark.parametrize("renglon, mensaje", [
+    (["a", "hipotecario", 900_000, 240, 0.11], "Producto desconocido 'hipotecario' en la fila 1"),
+    (["a", "personal", "cincuenta mil", 24, 0.24], "fila 1, columna 'monto_credito'"),
+])
+def test_lote_reporta_errores_sin_traza(tmp_path, capsys, renglon, mensaje):
+    entrada = _escribir_cartera(tmp_path / "cartera.csv", [renglon])
+    with pytest.raises(SystemExit) as salida:
+        main(["lote", entrada, str(tmp_path / "salida.csv")])
+    assert salida.value.code == 2
+    error = capsys.readouterr().err
+    assert mensaje in error
+    assert "Traceback" not in error
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la caché de cotizaciones con la firma completa de cada producto."""
+
+import math
+from datetime import date
+
+import pytest
+
+import credito_automotriz
+import credito_revolvente
+import prestamo_personal_basico
+from calculo_cat import udi
+from calculo_cat.cache import CacheCAT
+from calculo_cat.garantias import GarantiaEfectivo
+
+
+@pytest.fixture
+def serie_udi(tmp_path):
+    """Serie de la UDI de enero de 2024 activa durante la prueba."""
+    fechas = [date(2024, 1, dia) for dia in range(1, 32)]
+    ruta = str(tmp_path / "udis.serie")
+    udi.guardar_serie_udi(ruta, fechas, [7.98 + 0.001 * dia for dia in range(31)])
+    anterior = udi.serie_udi_activa()
+    udi.usar_serie_udi(ruta)
+    yield
+    udi.usar_serie_udi(anterior)
+
+
+def _cotizar_dos_veces(funcion, *args, **kwargs):
+    """Cotiza dos veces con la caché y compara contra la función sin caché."""
+    cache = CacheCAT(funcion)
+    primero = cache(*args, **kwargs)
+    segundo = cache(*args, **kwargs)
+    esperado = funcion(*args, **kwargs)
+    assert primero == segundo
+    assert math.isclose(primero, esperado, rel_tol=1e-9)
+    return cache.estadisticas()
+
+
+def test_prestamo_personal_firma_completa():
+    estadisticas = _cotizar_dos_veces(
+        prestamo_personal_basico.calcular_cat, 50000, 24, 0.24, comision_apertura=1000,
+        comisiones_mensuales=50, seguro=200, otros_costos=300, periodicidad=12,
+        garantia=GarantiaEfectivo(5000, 0.02, liberaciones=[(12, 0.5)]))
+    assert estadisticas["aciertos"] == 1
+    assert estadisticas["omitidos"] == 0
+
+
+def test_prestamo_personal_semanal():
+    estadisticas = _cotizar_dos_veces(prestamo_personal_basico.calcular_cat, 8000, 4, 0.9,
+                                      comision_apertura=200, periodicidad=52)
+    assert estadisticas["aciertos"] == 1
+
+
+def test_credito_automotriz_firma_completa():
+    estadisticas = _cotizar_dos_veces(
+        credito_automotriz.calcular_cat, 350000, 70000, 48, 0.13, comision_apertura=5000,
+        comisiones_mensuales=100, seguro_auto=1200, seguro_vida=150, gps=200, otros_costos=1000,
+        garantia=GarantiaEfectivo(10000, [0.03, 0.04]))
+    assert estadisticas["aciertos"] == 1
+
+
+def test_credito_revolvente_firma_completa():
+    estadisticas = _cotizar_dos_veces(credito_revolvente.calcular_cat_revolvente, 50000, 0.36,
+                                      comision_anual=600, pago_minimo_porcentaje=0.08,
+                                      otros_cargos_mensuales=20)
+    assert estadisticas["aciertos"] == 1
+
+
+def test_tarjeta_credito_con_fecha(serie_udi):
+    estadisticas = _cotizar_dos_veces(credito_revolvente.calcular_cat_tarjeta_credito, "oro", 0.30,
+                                      comision_anual=1200, pago_minimo_porcentaje=0.08,
+                                      fecha=date(2024, 1, 15))
+    assert estadisticas["aciertos"] == 1
+
+    # La misma fecha como texto y como `date` comparten la clave
+    cache = CacheCAT(credito_revolvente.calcular_cat_tarjeta_credito)
+    assert cache.clave("oro", fecha=date(2024, 1, 15))[0] == cache.clave("oro", fecha="2024-01-15")[0]
+
+
+def test_garantias_distintas_no_comparten_clave():
+    cache = CacheCAT(prestamo_personal_basico.calcular_cat)
+    con_garantia = cache(100000, 24, 0.18, garantia=GarantiaEfectivo(10000, 0.02))
+    otra_garantia = cache(100000, 24, 0.18, garantia=GarantiaEfectivo(10000, 0.02, liberaciones=[(12, 0.5)]))
+    sin_garantia = cache(100000, 24, 0.18)
+    assert len({con_garantia, otra_garantia, sin_garantia}) == 3
+    assert cache.estadisticas()["fallos"] == 3
+
+
+def test_parametro_sin_clave_se_calcula_sin_cache():
+    llamadas = []
+
+    def calcular(monto_credito, plazo_meses=12):
+        llamadas.append(monto_credito)
+        return 10.0
+
+    cache = CacheCAT(calcular)
+    assert cache(object()) == 10.0
+    assert cache(object()) == 10.0
+    assert len(llamadas) == 2
+    assert cache.estadisticas()["omitidos"] == 2
+    assert cache.estadisticas()["tamano"] == 0
+
+
+@pytest.mark.parametrize("fecha", [None, "2024-01-15"])
+def test_tarjeta_credito_sigue_a_la_serie_udi(tmp_path, serie_udi, fecha):
+    ruta_cache = str(tmp_path / "cache.db")
+    with CacheCAT(credito_revolvente.calcular_cat_tarjeta_credito, ruta_persistente=ruta_cache) as cache:
+        anterior = cache("oro", 0.30, 1200, fecha=fecha)
+
+        # Serie corregida: mismas fechas, otros valores
+        ruta = str(tmp_path / "udis_corregida.serie")
+        udi.guardar_serie_udi(ruta, [date(2024, 1, dia) for dia in range(1, 32)], [8.5] * 31)
+        udi.usar_serie_udi(ruta)
+        esperado = credito_revolvente.calcular_cat_tarjeta_credito("oro", 0.30, 1200, fecha=fecha)
+        assert esperado != anterior
+        assert cache("oro", 0.30, 1200, fecha=fecha) == esperado
+
+    # La capa persistente tampoco devuelve el CAT de la serie anterior
+    with CacheCAT(credito_revolvente.calcular_cat_tarjeta_credito, ruta_persistente=ruta_cache) as cache:
+        assert cache("oro", 0.30, 1200, fecha=fecha) == esperado
+        assert cache.estadisticas()["aciertos_persistentes"] == 1
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la cartera en SQLite y del subcomando `recalcular`."""
+
+import csv
+import sqlite3
+from datetime import date
+
+import pytest
+
+from calculo_cat import udi
+from calculo_cat.__main__ import main
+from calculo_cat.cartera import CarteraCAT
+from credito_revolvente import calcular_cat_revolvente
+
+
+@pytest.fixture
+def serie(tmp_path):
+    """Serie con valores el 1 y el 4 de marzo de 2024 (sin los días intermedios)."""
+    ruta = str(tmp_path / "udis.serie")
+    udi.guardar_serie_udi(ruta, [date(2024, 3, 1), date(2024, 3, 4)], [8.0, 8.1])
+    anterior = udi.serie_udi_activa()
+    yield ruta
+    udi.usar_serie_udi(anterior)
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    ruta = str(tmp_path / "cartera.csv")
+    with open(ruta, "w", newline="") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["id", "producto", "tipo_tarjeta", "tasa_interes_anual"])
+        escritor.writerow(["t1", "revolvente", "oro", 0.36])
+    return ruta
+
+
+def test_valor_vigente(serie):
+    serie_udi = udi.SerieUDI(serie)
+    assert serie_udi.valor_vigente("2024-03-03") == 8.0
+    assert serie_udi.valor_vigente("2024-03-04") == 8.1
+    assert serie_udi.valor_vigente("2024-03-20") == 8.1
+    with pytest.raises(KeyError):
+        serie_udi.valor_vigente("2024-02-28")
+
+
+def test_recalcular_fecha_sin_publicacion(tmp_path, serie, entrada, capsys):
+    ruta = str(tmp_path / "cartera.db")
+    codigo = main(["recalcular", ruta, "--entrada", entrada, "--serie-udi", serie, "--fecha", "2024-03-03"])
+    assert codigo == 0
+    with CarteraCAT(ruta) as cartera:
+        cat = cartera.consultar("t1")[0]
+    assert cat == pytest.approx(calcular_cat_revolvente(7000 * 8.0, 0.36))
+
+
+def test_recalcular_fecha_anterior_a_la_serie(tmp_path, serie, entrada, capsys):
+    with pytest.raises(SystemExit) as salida:
+        main(["recalcular", str(tmp_path / "cartera.db"), "--entrada", entrada,
+              "--serie-udi", serie, "--fecha", "2024-02-01"])
+    assert salida.value.code == 2
+    error = capsys.readouterr().err
+    assert "No hay valores de la UDI publicados hasta el 2024-02-01" in error
+    assert "Traceback" not in error
+
+
+def test_recalcular_producto_desconocido(tmp_path, capsys):
+    entrada = str(tmp_path / "cartera.csv")
+    with open(entrada, "w", newline="") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["id", "producto", "monto_linea_credito", "tasa_interes_anual"])
+        escritor.writerow(["t1", "revolvente", 50_000, 0.36])
+        escritor.writerow(["t2", "departamental", 10_000, 0.6])
+    with pytest.raises(SystemExit) as salida:
+        main(["recalcular", str(tmp_path / "cartera.db"), "--entrada", entrada])
+    assert salida.value.code == 2
+    error = capsys.readouterr().err
+    assert "Producto desconocido 'departamental' en la fila 2" in error
+    assert "Traceback" not in error
+
+
+@pytest.mark.parametrize("encabezado, renglones, mensaje", [
+    (["id", "producto", "monto_credito", "tasa_interes_anual"],
+     [["p1", "personal", 50_000, 0.24]],
+     "Falta la columna 'plazo_meses' para el producto 'personal' (fila 1)"),
+    (["id", "producto", "monto_credito", "plazo_meses", "tasa_interes_anual"],
+     [["p1", "personal", 50_000, 24, 0.24], ["p2", "personal", 50_000, "", 0.24]],
+     "Falta el valor de 'plazo_meses' para el producto 'personal' en la fila 2"),
+])
+def test_importar_rechaza_parametros_obligatorios_faltantes(tmp_path, capsys, encabezado, renglones, mensaje):
+    entrada = str(tmp_path / "cartera.csv")
+    with open(entrada, "w", newline="") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(encabezado)
+        escritor.writerows(renglones)
+    ruta = str(tmp_path / "cartera.db")
+    with pytest.raises(SystemExit) as salida:
+        main(["recalcular", ruta, "--entrada", entrada])
+    assert salida.value.code == 2
+    assert mensaje in capsys.readouterr().err
+    # El bloque con el crédito inválido no se guarda
+    with sqlite3.connect(ruta) as conexion:
+        assert conexion.execute("SELECT COUNT(*) FROM creditos").fetchone()[0] == 0
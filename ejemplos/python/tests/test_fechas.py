@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del cálculo del CAT con fechas exactas."""
+
+import math
+
+import numpy as np
+import pytest
+
+from calculo_cat.fechas import CalendarioFlujos, calcular_cat_fechas, fechas_mensuales
+
+
+def test_cat_de_flujos_anuales():
+    # $1,000 otorgados y $1,100 pagados a los 365 días: 10% efectivo anual
+    cat = calcular_cat_fechas([("2023-01-01", -1_000), ("2024-01-01", 1_100)])
+    assert cat == pytest.approx(10.0, rel=1e-9)
+
+
+def test_sin_solucion_devuelve_nan():
+    # Sólo flujos positivos: el VPN no tiene raíz
+    assert math.isnan(calcular_cat_fechas([("2024-01-01", 100), ("2024-06-01", 100)]))
+
+
+def test_sin_convergencia_devuelve_nan():
+    flujos = [("2024-01-01", -1_000), ("2024-02-01", 100), ("2025-01-01", 1_000)]
+    assert math.isnan(calcular_cat_fechas(flujos, max_iteraciones=2))
+    assert math.isfinite(calcular_cat_fechas(flujos))
+
+
+def test_lote_marca_los_creditos_no_convergidos():
+    calendario = CalendarioFlujos(fechas_mensuales("2024-01-15", 2))
+    resultado = calendario.calcular_cat(np.array([[-100.0, 60.0, 60.0], [100.0, 1.0, 1.0]]))
+
+    assert resultado.convergido.tolist() == [True, False]
+    assert np.isfinite(resultado.cat[0])
+    assert np.isnan(resultado.cat[1])
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de las garantías en efectivo."""
+
+import pytest
+
+from calculo_cat.flujos import FlujosSegmentados
+from calculo_cat.garantias import CAT_MINIMO, GarantiaEfectivo, calcular_cat_con_garantia
+import credito_automotriz
+from prestamo_personal_basico import calcular_cat
+
+
+def test_liberacion_posterior_al_plazo():
+    garantia = GarantiaEfectivo(10000, 0.02, liberaciones=[(12, 0.5), (36, 0.5)])
+    with pytest.raises(ValueError, match="posterior al plazo"):
+        garantia.flujos(24)
+    with pytest.raises(ValueError, match="posterior al plazo"):
+        calcular_cat(100000, 24, 0.18, garantia=garantia)
+
+
+def test_liberacion_al_final_del_plazo():
+    garantia = GarantiaEfectivo(10000, 0.02, liberaciones=[(24, 1.0)])
+    assert garantia.flujos(24)[-1][0] == 24
+    assert calcular_cat(100000, 24, 0.18, garantia=garantia) == calcular_cat(
+        100000, 24, 0.18, garantia=GarantiaEfectivo(10000, 0.02))
+
+
+def test_reduccion_alcanza_cat_minimo():
+    flujos = FlujosSegmentados([(0, 1, -20000), (1, 12, 1667)])
+    resultado = calcular_cat_con_garantia(flujos, GarantiaEfectivo(20000, 0.0), 12)
+    assert 0 < resultado.fraccion_garantia < 1
+    assert resultado.cat == pytest.approx(CAT_MINIMO, abs=1e-6)
+
+
+@pytest.mark.parametrize("tasa", [0.02, 0.18])
+@pytest.mark.parametrize("monto_garantia", [10_000, 90_000])
+def test_automotriz_equivale_a_personal(tasa, monto_garantia):
+    # El automotriz calcula con los flujos del cliente (signo=-1): mismos flujos, mismo CAT
+    garantia = GarantiaEfectivo(monto_garantia, 0.0)
+    esperado = calcular_cat(100_000, 24, tasa, garantia=garantia)
+    cat = credito_automotriz.calcular_cat(100_000, 0, 24, tasa, garantia=garantia)
+    assert cat == pytest.approx(esperado, rel=1e-9)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del CAT inverso."""
+
+import numpy as np
+import pytest
+
+from calculo_cat.inversa import resolver_parametro
+from prestamo_personal_basico import calcular_cat
+
+
+@pytest.mark.parametrize("parametro, argumentos", [
+    ("tasa_interes_anual", {"comision_apertura": 1000, "seguro": 200}),
+    ("comision_apertura", {"tasa_interes_anual": 0.2, "seguro": 50}),
+    ("seguro", {"tasa_interes_anual": 0.2, "comision_apertura": 1000}),
+])
+def test_ida_y_vuelta(parametro, argumentos):
+    resultado = resolver_parametro(30.0, parametro, 50000, 24, **argumentos)
+    assert resultado.convergido
+    argumentos[parametro] = float(resultado.valor)
+    assert calcular_cat(50000, 24, **argumentos) == pytest.approx(30.0, abs=1e-8)
+
+
+@pytest.mark.parametrize("parametro, argumentos", [
+    ("comision_apertura", {"tasa_interes_anual": 0.3, "seguro": 500}),
+    ("seguro", {"tasa_interes_anual": 0.3, "comision_apertura": 1000}),
+    ("tasa_interes_anual", {"comision_apertura": 5000}),
+])
+def test_fuera_del_dominio(parametro, argumentos):
+    # El CAT objetivo sólo se alcanza con un valor negativo del parámetro
+    objetivo = 0.5 if parametro == "tasa_interes_anual" else 35.0
+    resultado = resolver_parametro(objetivo, parametro, 50000, 24, **argumentos)
+    assert not resultado.convergido
+    assert np.isnan(resultado.valor)
+
+
+def test_limite_del_dominio():
+    objetivo = calcular_cat(50000, 24, 0.24)
+    resultado = resolver_parametro(objetivo, "comision_apertura", 50000, 24, 0.24)
+    assert resultado.convergido
+    assert float(resultado.valor) == pytest.approx(0.0, abs=1e-6)
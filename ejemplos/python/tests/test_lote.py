@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del cálculo del CAT por lotes contra el cálculo escalar."""
+
+import inspect
+
+import numpy as np
+import pytest
+
+from calculo_cat.escenarios import simular_cat_tasa_variable
+from calculo_cat.fechas import calcular_cat_fechas
+from calculo_cat.flujos import FlujosSegmentados
+from calculo_cat.inversa import resolver_parametro
+from calculo_cat.lote import calcular_cat_lote, calcular_tir_lote, calcular_tir_matriz
+from calculo_cat.revolvente import calcular_cat_revolvente_lote
+from calculo_cat.solver import calcular_tir
+from prestamo_personal_basico import calcular_cat
+
+
+def _lote_mixto(n=600, semilla=3):
+    """Préstamos con tasa cero, plazos de 1 a 600 meses, comisiones altas y las cuatro periodicidades."""
+    generador = np.random.default_rng(semilla)
+    monto = generador.uniform(1_000, 1_000_000, n)
+    return {
+        "monto_credito": monto,
+        "plazo_meses": generador.choice([1, 3, 12, 24, 60, 120, 360, 480, 600], n).astype(float),
+        "tasa_interes_anual": generador.choice([0.0, 0.0001, 0.05, 0.24, 0.6, 1.5, 3.0], n),
+        "comision_apertura": monto * generador.choice([0.0, 0.01, 0.1, 0.5, 0.9], n),
+        "comisiones_mensuales": generador.choice([0.0, 50.0, 5_000.0], n),
+        "seguro": generador.choice([0.0, 200.0], n),
+        "otros_costos": generador.choice([0.0, 300.0], n),
+        "periodicidad": generador.choice([12, 24, 26, 52], n).astype(float),
+    }
+
+
+def test_lote_coincide_con_calculo_escalar():
+    columnas = _lote_mixto()
+    resultado = calcular_cat_lote(**columnas)
+    assert resultado.convergido.all()
+
+    for i in range(resultado.cat.size):
+        fila = {nombre: valores[i].item() for nombre, valores in columnas.items()}
+        fila["periodicidad"] = int(fila["periodicidad"])
+        esperado = calcular_cat(**fila)
+        assert resultado.cat[i] == pytest.approx(esperado, rel=1e-9, abs=1e-6), fila
+
+
+def test_tasa_cero_sin_costos():
+    resultado = calcular_cat_lote([10_000, 10_000], [12, 360], [0.0, 0.0])
+    assert resultado.convergido.all()
+    np.testing.assert_allclose(resultado.cat, 0.0, atol=1e-8)
+    assert calcular_cat(10_000, 360, 0.0) == pytest.approx(0.0, abs=1e-8)
+
+
+@pytest.mark.parametrize("tasa_inicial", [0.1, 3.0, 50.0])
+def test_estimacion_inicial_lejana(tasa_inicial):
+    # Newton sin intervalo diverge desde estimaciones lejanas; la bisección lo evita
+    generador = np.random.default_rng(1)
+    neto = generador.uniform(100, 1_000, 500)
+    cuota = generador.uniform(20, 200, 500)
+    plazo = generador.choice([1, 3, 12, 60], 500).astype(float)
+    tasa, _, convergido = calcular_tir_lote(neto, cuota, plazo, tasa_inicial=tasa_inicial)
+    assert convergido.all()
+    esperado = [calcular_tir(FlujosSegmentados([(0, 1, -a), (1, int(n), c)]), tasa_inicial=tasa_inicial)
+                for a, c, n in zip(neto, cuota, plazo)]
+    np.testing.assert_allclose(tasa, esperado, rtol=1e-7, atol=1e-9)
+
+
+def test_matriz_con_flujos_no_convencionales():
+    generador = np.random.default_rng(1)
+    flujos = np.abs(generador.normal(0, 1, (300, 25)))
+    flujos[:, 0] *= -10
+    flujos[:150, 12] -= generador.uniform(0, 5, 150)
+    tasa, _, convergido = calcular_tir_matriz(flujos, tasa_inicial=0.5)
+    assert convergido.all()
+    esperado = [calcular_tir(list(fila), tasa_inicial=0.5) for fila in flujos]
+    np.testing.assert_allclose(tasa, esperado, rtol=1e-7, atol=1e-9)
+
+
+@pytest.mark.parametrize("funcion", [calcular_cat_lote, calcular_tir_lote, calcular_tir_matriz,
+                                     calcular_cat_revolvente_lote, simular_cat_tasa_variable,
+                                     calcular_cat_fechas, resolver_parametro])
+def test_maximo_de_iteraciones_del_solucionador_escalar(funcion):
+    # Con menos iteraciones, un lote podría no converger donde el cálculo escalar sí
+    esperado = inspect.signature(calcular_tir).parameters["max_iteraciones"].default
+    assert inspect.signature(funcion).parameters["max_iteraciones"].default == esperado
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la malla precalculada del CAT."""
+
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from calculo_cat.malla import MallaCAT, _cat_exacto, construir_malla
+
+
+@pytest.fixture(scope="module")
+def malla(tmp_path_factory):
+    ruta = str(tmp_path_factory.mktemp("malla") / "cat.malla")
+    construir_malla(ruta, range(6, 61), np.linspace(0.1, 0.6, 51), np.linspace(0, 0.03, 7))
+    return MallaCAT(ruta)
+
+
+def test_ejemplo_interpola(malla):
+    cat = malla.consultar(24, 0.245, 0.0125)
+    assert malla.interpoladas == 1 and malla.exactas == 0
+    assert cat == pytest.approx(float(_cat_exacto(24, 0.245, 0.0125)), abs=0.01)
+
+
+@pytest.mark.parametrize("error_maximo", [0.001, 0.01, 0.05])
+def test_cota_de_error(malla, error_maximo):
+    generador = np.random.default_rng(5)
+    plazos = generador.integers(6, 61, 3000).astype(float)
+    tasas = generador.uniform(0.1, 0.6, 3000)
+    comisiones = generador.uniform(0, 0.03, 3000)
+    consultados = np.array([malla.consultar(*punto, error_maximo=error_maximo)
+                            for punto in zip(plazos, tasas, comisiones)])
+    assert np.all(np.abs(consultados - _cat_exacto(plazos, tasas, comisiones)) <= error_maximo)
+
+
+def test_plazos_enteros(tmp_path):
+    with pytest.raises(ValueError, match="meses enteros"):
+        construir_malla(str(tmp_path / "cat.malla"), [6, 12.5], [0.1, 0.2])
+
+
+def test_rechaza_otra_version(tmp_path):
+    ruta = str(tmp_path / "cat.malla")
+    construir_malla(ruta, [12, 24], [0.1, 0.2])
+    with open(ruta, "r+b") as archivo:
+        archivo.seek(8)
+        (longitud,) = struct.unpack("<I", archivo.read(4))
+        encabezado = json.loads(archivo.read(longitud))
+        del encabezado["version"]  # malla anterior a la anualización efectiva
+        archivo.seek(12)
+        archivo.write(json.dumps(encabezado).encode("utf-8").ljust(longitud))
+    with pytest.raises(ValueError, match="otra versión"):
+        MallaCAT(ruta)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la serie de la UDI y del actualizador del CAT de tarjetas."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from calculo_cat.udi import ActualizadorCATTarjetas, SerieUDI, guardar_serie_udi
+from credito_revolvente import calcular_cat_revolvente
+
+
+@pytest.fixture
+def serie(tmp_path):
+    fechas = [date(2024, 1, 1) + timedelta(days=dia) for dia in range(90)]
+    ruta = str(tmp_path / "udis.serie")
+    guardar_serie_udi(ruta, fechas, [8.0 + 0.001 * dia for dia in range(90)])
+    return SerieUDI(ruta)
+
+
+def test_actualizar_coincide_con_calculo_escalar(serie):
+    actualizador = ActualizadorCATTarjetas(serie, {"basica": {"tasa_interes_anual": 0.42, "comision_anual": 700}})
+    cat = actualizador.actualizar("2024-02-01")["basica"]["oro"]
+    esperado = calcular_cat_revolvente(7000 * serie.valor("2024-02-01"), 0.42, comision_anual=700)
+    assert cat == pytest.approx(esperado, rel=1e-9)
+
+
+def test_resultados_acotados_por_fecha(serie):
+    actualizador = ActualizadorCATTarjetas(serie, {"basica": {"tasa_interes_anual": 0.42}}, max_fechas=3)
+    for dia in range(10):
+        actualizador.actualizar(date(2024, 1, 1) + timedelta(days=dia))
+    assert len(actualizador._resultados) == 3
+    assert actualizador.calculados == 10
+
+    # La fecha usada más recientemente se conserva; la más antigua se recalcula
+    actualizador.actualizar(date(2024, 1, 10))
+    assert actualizador.reutilizados == 1
+    actualizador.actualizar(date(2024, 1, 1))
+    assert actualizador.calculados == 11
+
+
+def test_quitar_producto_descarta_resultados(serie):
+    actualizador = ActualizadorCATTarjetas(serie, {"a": {"tasa_interes_anual": 0.4}, "b": {"tasa_interes_anual": 0.3}})
+    actualizador.actualizar("2024-01-15")
+    actualizador.definir_producto("a", tasa_interes_anual=0.5)
+    actualizador.actualizar("2024-01-15")
+    assert actualizador.calculados == 3
+    assert actualizador.reutilizados == 1